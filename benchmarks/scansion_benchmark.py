@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+"""Benchmarks scansion, stage by stage.
+
+Each text is scanned twice with `Scanner.scan`. The first pass records the
+wall time of each call to each stage of scansion, using the timers that
+`ScanStats` places around the stages (see stats.py). For stepwise scansion
+these are:
+
+*   normalize: the table-driven normalizer
+*   pronounce: rewriting the normalization with the pronunciation rule
+*   prefilter: ruling out verses which cannot be hexameters
+*   variable: composing the pronunciation with the variable rule
+*   syllable: composing with the syllabification rule
+*   weight: composing with the weight rule
+*   hexameter: composing with the hexameter rule
+*   shortestpath: the backwards shortest path computations
+*   align: recovering the alignment from the shortest paths
+*   proto: populating the Verse message
+
+With `--cascade`, "cascade" replaces the four compositions, except for
+tied verses (counted as "cascade_ties"), which are scanned stepwise. The
+time of each verse as a whole is reported as "verse". The second pass scans
+each text end to end without instrumentation.
+
+Results are printed as a table and, optionally, written as JSON; a previous
+JSON result (e.g., from another commit) can be given with `--baseline` to
+report relative changes.
+"""
+
+import argparse
+import collections
+import datetime
+import glob
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import latin_scansion
+
+
+_THIS_DIR = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIR = os.path.dirname(_THIS_DIR)
+
+# The stages, in the order in which they are reported; stages which are not
+# listed here (e.g., other meters) are reported after them.
+STAGES = (
+    "normalize",
+    "pronounce",
+    "prefilter",
+    "variable",
+    "syllable",
+    "weight",
+    "cascade",
+    "hexameter",
+    "shortestpath",
+    "nbest",
+    "align",
+    "proto",
+)
+
+# The stage which encloses all the others.
+TOTAL_STAGE = "verse"
+
+PERCENTILES = (50, 90, 99)
+
+
+class _StageTimings(latin_scansion.ScanStats):
+    """Also keeps the wall time of every call to each stage."""
+
+    def __init__(self):
+        super().__init__()
+        self.timings: Dict[str, List[float]] = collections.defaultdict(list)
+
+    def record_time(self, stage: str, seconds: float) -> None:
+        super().record_time(stage, seconds)
+        self.timings[stage].append(seconds)
+
+
+def _percentile(values: List[float], percentile: int) -> float:
+    """Computes a nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(0, -(-percentile * len(values) // 100) - 1)
+    return values[rank]
+
+
+def _summarize(timings: List[float]) -> Dict[str, float]:
+    """Summarizes a list of timings, in microseconds."""
+    values = sorted(timing * 1e6 for timing in timings)
+    summary = {
+        "count": len(values),
+        "total_us": sum(values),
+        "mean_us": sum(values) / len(values) if values else 0.0,
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_us"] = _percentile(values, percentile)
+    return summary
+
+
+def _stage_order(stage: str) -> Tuple[int, str]:
+    """Sorts stages as listed in STAGES, then others, then the total."""
+    if stage == TOTAL_STAGE:
+        return len(STAGES) + 1, stage
+    if stage in STAGES:
+        return STAGES.index(stage), stage
+    return len(STAGES), stage
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the current commit hash, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=_ROOT_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _read_verses(path: str, limit: Optional[int]) -> List[str]:
+    with open(path, "r") as source:
+        verses = [line.rstrip() for line in source]
+    return verses[:limit] if limit else verses
+
+
+def run(
+    far: str,
+    paths: List[str],
+    limit: Optional[int],
+    use_cascade: bool = False,
+) -> Dict[str, Any]:
+    """Runs the benchmark.
+
+    Args:
+      far: path to the grammar FAR.
+      paths: paths to the input texts.
+      limit: if set, only the first `limit` verses of each text are used.
+      use_cascade: if set, the pre-composed cascade is used.
+
+    Returns:
+      A JSON-serializable dictionary of results.
+    """
+    start = time.perf_counter()
+    scanner = latin_scansion.Scanner(far, use_cascade=use_cascade)
+    load_seconds = time.perf_counter() - start
+    stats = _StageTimings()
+    instrumented = latin_scansion.Scanner(
+        far, stats=stats, use_cascade=use_cascade
+    )
+    books = []
+    for path in paths:
+        verses = _read_verses(path, limit)
+        for number, text in enumerate(verses, 1):
+            instrumented.scan(text, number)
+        # Times end-to-end scansion without instrumentation.
+        start = time.perf_counter()
+        defective = sum(
+            scanner.scan(text, number).defective
+            for number, text in enumerate(verses, 1)
+        )
+        seconds = time.perf_counter() - start
+        books.append(
+            {
+                "path": os.path.relpath(path, _ROOT_DIR),
+                "verses": len(verses),
+                "defective": defective,
+                "seconds": seconds,
+                "verses_per_second": len(verses) / seconds,
+            }
+        )
+    verses = sum(book["verses"] for book in books)
+    seconds = sum(book["seconds"] for book in books)
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "far": os.path.relpath(far, _ROOT_DIR),
+        "cascade": use_cascade,
+        "cascade_ties": stats.counters["cascade_ties"],
+        "load_seconds": load_seconds,
+        "verses": verses,
+        "seconds": seconds,
+        "verses_per_second": verses / seconds if seconds else 0.0,
+        "books": books,
+        "stages": {
+            stage: _summarize(stats.timings[stage])
+            for stage in sorted(stats.timings, key=_stage_order)
+        },
+    }
+
+
+def _report(
+    results: Dict[str, Any], baseline: Optional[Dict[str, Any]]
+) -> None:
+    """Prints a human-readable report, optionally relative to a baseline."""
+
+    def change(new: float, old: Optional[float]) -> str:
+        return f"{(new - old) / old:+7.1%}" if old else ""
+
+    print(f"Commit: {results['commit']}")
+    if baseline is not None:
+        print(f"Baseline: {baseline['commit']}")
+    print(f"Grammar load: {results['load_seconds']:.2f}s")
+    print()
+    print(f"{'book':<28} {'verses':>7} {'seconds':>8} {'verses/s':>9}")
+    old_books = (
+        {book["path"]: book for book in baseline["books"]} if baseline else {}
+    )
+    for book in results["books"]:
+        old = old_books.get(book["path"], {}).get("verses_per_second")
+        print(
+            f"{book['path']:<28} {book['verses']:>7} "
+            f"{book['seconds']:>8.2f} {book['verses_per_second']:>9.1f} "
+            f"{change(book['verses_per_second'], old)}"
+        )
+    old = baseline["verses_per_second"] if baseline else None
+    print(
+        f"{'total':<28} {results['verses']:>7} {results['seconds']:>8.2f} "
+        f"{results['verses_per_second']:>9.1f} "
+        f"{change(results['verses_per_second'], old)}"
+    )
+    print()
+    header = " ".join(f"{f'p{p} (us)':>10}" for p in PERCENTILES)
+    print(f"{'stage':<14} {'mean (us)':>10} {header} {'share':>6}")
+    stages = results["stages"]
+    total = stages[TOTAL_STAGE]["total_us"] if TOTAL_STAGE in stages else 0.0
+    for name, stage in stages.items():
+        percentiles = " ".join(
+            f"{stage[f'p{p}_us']:>10.1f}" for p in PERCENTILES
+        )
+        old = (
+            baseline["stages"].get(name, {}).get("mean_us")
+            if baseline
+            else None
+        )
+        print(
+            f"{name:<14} {stage['mean_us']:>10.1f} {percentiles} "
+            f"{stage['total_us'] / total if total else 0.0:>6.1%} "
+            f"{change(stage['mean_us'], old)}"
+        )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "input",
+        nargs="*",
+        default=sorted(
+            glob.glob(os.path.join(_ROOT_DIR, "data", "Aeneid", "*.txt"))
+        ),
+        help="paths to input texts (default: the six books of the Aeneid)",
+    )
+    parser.add_argument(
+        "--far",
+        default=os.path.join(_ROOT_DIR, "grammars", "all.far"),
+        help="path to the grammar FAR (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="scan with the pre-composed cascade, which the FAR must contain",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="only use the first LIMIT verses of each text",
+    )
+    parser.add_argument("--output", help="path for output JSON results")
+    parser.add_argument(
+        "--baseline", help="path to JSON results to compare against"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    # Defective verses and rewrite failures would otherwise be logged.
+    logging.disable(logging.ERROR)
+    results = run(args.far, args.input, args.limit, args.cascade)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as source:
+            baseline = json.load(source)
+    _report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as sink:
+            json.dump(results, sink, indent=2)
+
+
+if __name__ == "__main__":
+    main()
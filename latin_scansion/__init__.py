@@ -1,24 +1,60 @@
-import pkg_resources
+from typing import Any
 
+from .cache import ScansionCache
+from .limits import LatticeLimitError
+from .limits import ScanLimits
+from .meters import Meter
 from .scansion import scan_document
 from .scansion import scan_verse
+from .scanner import Scanner
+from .stats import ScanStats
 from .scansion_pb2 import Document
 from .scansion_pb2 import Foot
+from .scansion_pb2 import Scansion
 from .scansion_pb2 import Syllable
 from .scansion_pb2 import Verse
-from .textproto import read_document
-from .textproto import write_document
+from .formats import DocumentReader
+from .formats import read_document
+from .formats import stream_document
+from .formats import write_document
 
 
-__version__ = pkg_resources.get_distribution("latin_scansion").version
 __all__ = [
     "__version__",
     "read_document",
     "scan_document",
     "scan_verse",
+    "stream_document",
     "write_document",
     "Document",
+    "DocumentReader",
     "Foot",
+    "LatticeLimitError",
+    "Meter",
+    "Scansion",
+    "ScansionCache",
+    "ScanLimits",
+    "ScanStats",
+    "Scanner",
     "Syllable",
     "Verse",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The version is only looked up when first requested, since reading the
+    # package metadata takes longer than the rest of the import.
+    if name == "__version__":
+        global __version__
+        try:
+            from importlib.metadata import version
+        except ImportError:  # Python 3.7.
+            import pkg_resources
+
+            __version__ = pkg_resources.get_distribution(
+                "latin_scansion"
+            ).version
+        else:
+            __version__ = version("latin_scansion")
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
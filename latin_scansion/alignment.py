@@ -0,0 +1,262 @@
+"""Compact alignments of pronunciations to metrical structure.
+
+An alignment records the structure of a scanned verse (its pronunciation
+after poetic variation, its feet, and their syllables) in flat arrays rather
+than as a tree of messages. It is built in a single pass over the arcs of
+each of the shortest paths, and can be inspected directly (e.g., to obtain
+the pattern of feet) or used to populate a Verse message.
+"""
+
+import array
+
+from typing import Iterator, Tuple, Union
+
+import pynini
+
+from . import cascade
+from . import scansion_pb2
+
+
+# Names of the Syllable fields, in the order their spans are stored.
+FIELDS = ("onset", "nucleus", "coda")
+
+# Maps syllable codes onto the indices of the fields they populate.
+_SYLLABLE_FIELDS = {ord("O"): 0, ord("-"): 1, ord("U"): 1, ord("C"): 2}
+
+# Number of span offsets stored per syllable: a start and an end per field.
+_SPAN_SIZE = 2 * len(FIELDS)
+
+_SPACE = ord(" ")
+
+
+class Alignment:
+    """The metrical structure of a scanned verse.
+
+    Attributes:
+      var_pron: the UTF-8 encoded pronunciation after poetic variation.
+      foot_types: the foot codes (see scansion.proto), one per foot.
+      foot_ends: for each foot, the index of the syllable following its last
+        syllable.
+      weights: the weight codes (see scansion.proto), one per syllable.
+      spans: for each syllable, the start and end byte offsets into
+        `var_pron` of its onset, nucleus, and coda, or -1 if absent.
+    """
+
+    __slots__ = ("var_pron", "foot_types", "foot_ends", "weights", "spans")
+
+    def __init__(self):
+        self.var_pron = b""
+        self.foot_types = bytearray()
+        self.foot_ends = array.array("i")
+        self.weights = bytearray()
+        self.spans = array.array("i")
+
+    def _add_syllable(self, weight: int) -> int:
+        """Adds a syllable, returning the offset of its spans."""
+        self.weights.append(weight)
+        offset = len(self.spans)
+        self.spans.extend((-1,) * _SPAN_SIZE)
+        return offset
+
+    @property
+    def pattern(self) -> str:
+        """The pattern of feet (e.g., "DSSSDS")."""
+        return self.foot_types.decode("ascii")
+
+    def populate(
+        self, verse: Union[scansion_pb2.Verse, scansion_pb2.Scansion]
+    ) -> None:
+        """Populates the scansion of a verse message.
+
+        Args:
+          verse: the Verse message, or a Scansion message for one of its
+            alternative scansions.
+        """
+        var_pron = self.var_pron
+        spans = self.spans
+        verse.var_pron = var_pron.decode("utf8")
+        start = 0
+        for foot_type, end in zip(self.foot_types, self.foot_ends):
+            # The foot type enum uses the ASCII decimals; see scansion.proto.
+            foot = verse.foot.add(type=foot_type)
+            for index in range(start, end):
+                syllable = foot.syllable.add(weight=self.weights[index])
+                offset = index * _SPAN_SIZE
+                for field, name in enumerate(FIELDS):
+                    span_start = spans[offset + 2 * field]
+                    if span_start >= 0:
+                        span_end = spans[offset + 2 * field + 1]
+                        setattr(
+                            syllable,
+                            name,
+                            var_pron[span_start:span_end].decode("utf8"),
+                        )
+            start = end
+
+
+def _field(syllable_code: int) -> int:
+    """Looks up the index of the field populated by a syllable code."""
+    field = _SYLLABLE_FIELDS.get(syllable_code)
+    if field is None:
+        raise AssertionError(f"Unknown syllable code: {chr(syllable_code)}")
+    return field
+
+
+def from_paths(
+    foot: pynini.Fst, weight: pynini.Fst, syllable: pynini.Fst
+) -> Alignment:
+    """Builds an alignment from the stepwise shortest paths.
+
+    Each path is a string transducer of the form:
+
+        il1 il2 il3 il4 il5 il6
+        ol1 eps eps ol2 eps ol3
+
+    where each non-epsilon output label begins a new chunk, so that it
+    aligns ol1 to il1 il2 il3, ol2 to il4 il5, and ol3 to il6.
+
+    Args:
+      foot: the shortest path from weight codes to foot codes.
+      weight: the shortest path from syllable codes to weight codes.
+      syllable: the shortest path from the pronunciation after poetic
+        variation to syllable codes.
+
+    Returns:
+      The alignment.
+    """
+    # Reads the syllable chunks, recording their codes and start offsets.
+    var_pron = bytearray()
+    syllable_codes = bytearray()
+    syllable_starts = array.array("i")
+    for ilabel, olabel in _labels(syllable):
+        if olabel:
+            syllable_codes.append(olabel)
+            syllable_starts.append(len(var_pron))
+        if ilabel:
+            assert syllable_codes, "Input label precedes first syllable code"
+            var_pron.append(ilabel)
+    syllable_starts.append(len(var_pron))
+    # Reads the weight and foot chunks, recording their codes and lengths.
+    weight_codes, weight_lengths = _read_chunks(weight, syllable_codes)
+    foot_codes, foot_lengths = _read_chunks(foot, weight_codes)
+    # Writes the structure.
+    alignment = Alignment()
+    alignment.var_pron = bytes(var_pron)
+    spans = alignment.spans
+    weight_index = 0
+    syllable_index = 0
+    for foot_code, foot_length in zip(foot_codes, foot_lengths):
+        for _ in range(foot_length):
+            weight_code = weight_codes[weight_index]
+            weight_length = weight_lengths[weight_index]
+            weight_index += 1
+            # Skips over whitespace between words, which is also a single
+            # syllable chunk.
+            if weight_code == _SPACE:
+                syllable_index += 1
+                continue
+            offset = alignment._add_syllable(weight_code)
+            for _ in range(weight_length):
+                syllable_code = syllable_codes[syllable_index]
+                if syllable_code != _SPACE:
+                    field = offset + 2 * _field(syllable_code)
+                    spans[field] = syllable_starts[syllable_index]
+                    spans[field + 1] = syllable_starts[syllable_index + 1]
+                syllable_index += 1
+        alignment.foot_types.append(foot_code)
+        alignment.foot_ends.append(len(alignment.weights))
+    return alignment
+
+
+def _labels(fst: pynini.Fst) -> Iterator[Tuple[int, int]]:
+    """Returns the (input label, output label) pairs along a single path."""
+    # Reading the labels off in one call is much faster than visiting each
+    # state's arcs from Python.
+    path = fst.paths()
+    return zip(path.ilabels(), path.olabels())
+
+
+def _read_chunks(
+    fst: pynini.Fst, expected: bytearray
+) -> Tuple[bytearray, array.array]:
+    """Reads the chunks of a path whose input labels are lower-level codes.
+
+    Args:
+      fst: the shortest path.
+      expected: the lower-level codes, which the input labels must match.
+
+    Returns:
+      A tuple of the chunk codes and the number of input labels per chunk.
+    """
+    codes = bytearray()
+    lengths = array.array("i")
+    index = 0
+    for ilabel, olabel in _labels(fst):
+        if olabel:
+            codes.append(olabel)
+            lengths.append(0)
+        if ilabel:
+            assert lengths, "Input label precedes first code"
+            assert ilabel == expected[index], (
+                "Code mismatch: "
+                f"{chr(ilabel)!r} != {chr(expected[index])!r}"
+            )
+            lengths[-1] += 1
+            index += 1
+    return codes, lengths
+
+
+def from_tape(tape: pynini.Fst) -> Alignment:
+    """Builds an alignment from the shortest path through the cascade.
+
+    See cascade.py for the layout of the tape.
+
+    Args:
+      tape: the shortest path through the cascade lattice.
+
+    Returns:
+      The alignment.
+    """
+    alignment = Alignment()
+    var_pron = bytearray()
+    spans = alignment.spans
+    offset = -1
+    # Index of the end offset of the open span, if any.
+    span_end = -1
+    for _, label in _labels(tape):
+        if not label:
+            continue
+        if label < cascade.SYLLABLE_OFFSET:
+            var_pron.append(label)
+            continue
+        # Any other label closes the open span.
+        if span_end >= 0:
+            spans[span_end] = len(var_pron)
+            span_end = -1
+        if label >= cascade.FOOT_OFFSET:
+            if alignment.foot_types:
+                alignment.foot_ends.append(len(alignment.weights))
+            alignment.foot_types.append(label - cascade.FOOT_OFFSET)
+        elif label >= cascade.WEIGHT_OFFSET:
+            assert alignment.foot_types, "Weight code outside of foot"
+            weight_code = label - cascade.WEIGHT_OFFSET
+            # Skips over whitespace between words.
+            offset = (
+                -1
+                if weight_code == _SPACE
+                else alignment._add_syllable(weight_code)
+            )
+        else:
+            syllable_code = label - cascade.SYLLABLE_OFFSET
+            # Whitespace between words belongs to no field.
+            if syllable_code != _SPACE:
+                assert offset >= 0, "Syllable code outside of syllable"
+                field = offset + 2 * _field(syllable_code)
+                spans[field] = len(var_pron)
+                span_end = field + 1
+    if span_end >= 0:
+        spans[span_end] = len(var_pron)
+    if alignment.foot_types:
+        alignment.foot_ends.append(len(alignment.weights))
+    alignment.var_pron = bytes(var_pron)
+    return alignment
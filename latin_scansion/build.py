@@ -0,0 +1,361 @@
+"""Builds the grammar FARs, in parallel, with a content-addressed cache.
+
+Each Thrax grammar is compiled into a FAR of the same name alongside it, as
+by `grammars/Makefile`, after the grammars it imports. Each compiled FAR is
+also cached under a key which hashes the grammar's source, any files it
+reads with `StringFile`, the keys of the grammars it imports, and the
+compiler. A grammar whose key is already cached is copied from the cache
+rather than compiled, so after an edit only the edited grammar and the
+grammars which (transitively) import it are recompiled, and a fresh checkout
+can reuse FARs compiled in any other checkout. Grammars which do not depend
+on one another are compiled in parallel.
+
+The compile time of each grammar, and the size of each rule it exports, is
+logged.
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from typing import Any, Dict, List, Optional, Set
+
+import pynini
+
+
+# Default compiler command.
+THRAXCOMPILER = "thraxcompiler"
+
+# Default cache directory.
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "latin_scansion",
+    "grammars",
+)
+
+# Size in bytes of the hashes.
+DIGEST_SIZE = 16
+
+_IMPORT = re.compile(r"^\s*import\s+'([^']+)'\s+as\s+\w+\s*;", re.MULTILINE)
+_STRING_FILE = re.compile(r"StringFile\[\s*['\"]([^'\"]+)['\"]")
+
+
+class BuildError(Exception):
+    """Raised when a grammar cannot be built."""
+
+
+class Grammar:
+    """A grammar and its dependencies.
+
+    Args:
+      path: path to the grammar source.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "r") as source:
+            text = source.read()
+        directory = os.path.dirname(path)
+        self.imports = [
+            os.path.normpath(os.path.join(directory, name))
+            for name in _IMPORT.findall(text)
+        ]
+        self.files = [
+            os.path.normpath(os.path.join(directory, name))
+            for name in _STRING_FILE.findall(text)
+        ]
+
+    @property
+    def name(self) -> str:
+        """The file name of the grammar."""
+        return os.path.basename(self.path)
+
+    @property
+    def far_path(self) -> str:
+        """Path to the compiled FAR."""
+        return os.path.splitext(self.path)[0] + ".far"
+
+
+def load_grammars(paths: List[str]) -> Dict[str, Grammar]:
+    """Loads grammars and, transitively, the grammars they import.
+
+    Args:
+      paths: paths to the grammars to build.
+
+    Returns:
+      A dictionary mapping paths onto grammars.
+
+    Raises:
+      BuildError: a grammar is missing.
+    """
+    grammars: Dict[str, Grammar] = {}
+    pending = [os.path.normpath(path) for path in paths]
+    while pending:
+        path = pending.pop()
+        if path in grammars:
+            continue
+        if not os.path.exists(path):
+            raise BuildError(f"Grammar not found: {path}")
+        grammar = Grammar(path)
+        grammars[path] = grammar
+        pending.extend(grammar.imports)
+    return grammars
+
+
+def _hash_file(digest: Any, path: str) -> None:
+    """Adds a file's path and contents to a hash."""
+    digest.update(os.path.basename(path).encode("utf8"))
+    digest.update(b"\0")
+    with open(path, "rb") as source:
+        digest.update(source.read())
+    digest.update(b"\0")
+
+
+def compiler_fingerprint(compiler: str) -> str:
+    """Identifies the compiler, by its resolved path, size, and mtime.
+
+    Args:
+      compiler: the compiler command.
+
+    Returns:
+      The fingerprint.
+    """
+    path = shutil.which(compiler)
+    if path is None:
+        return compiler
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def cache_keys(
+    grammars: Dict[str, Grammar], compiler: str = THRAXCOMPILER
+) -> Dict[str, str]:
+    """Computes the cache key of each grammar.
+
+    Args:
+      grammars: a dictionary mapping paths onto grammars, closed under
+        imports.
+      compiler: the compiler command.
+
+    Returns:
+      A dictionary mapping paths onto keys.
+
+    Raises:
+      BuildError: the grammars import one another cyclically, or a file
+        read by a grammar is missing.
+    """
+    compiler_id = compiler_fingerprint(compiler).encode("utf8")
+    keys: Dict[str, str] = {}
+    visiting: Set[str] = set()
+
+    def key(path: str) -> str:
+        if path in keys:
+            return keys[path]
+        if path in visiting:
+            raise BuildError(f"Cyclic import of {path}")
+        visiting.add(path)
+        grammar = grammars[path]
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        digest.update(compiler_id)
+        digest.update(b"\0")
+        _hash_file(digest, path)
+        for file_path in grammar.files:
+            if not os.path.exists(file_path):
+                raise BuildError(f"File not found: {file_path}")
+            _hash_file(digest, file_path)
+        for imported in sorted(grammar.imports):
+            digest.update(key(imported).encode("ascii"))
+        visiting.discard(path)
+        keys[path] = digest.hexdigest()
+        return keys[path]
+
+    for path in grammars:
+        key(path)
+    return keys
+
+
+def _copy(source: str, sink: str) -> None:
+    """Copies a file, atomically replacing any existing file."""
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(sink) or ".", delete=False
+    ) as temp:
+        temp_path = temp.name
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, sink)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _compile(grammar: Grammar, compiler: str) -> float:
+    """Compiles a grammar, returning the wall time in seconds.
+
+    Raises:
+      BuildError: the compiler failed.
+    """
+    directory = os.path.dirname(grammar.path) or "."
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [
+                compiler,
+                f"--input_grammar={grammar.name}",
+                f"--output_far={os.path.basename(grammar.far_path)}",
+            ],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+        )
+    except OSError as error:
+        raise BuildError(f"Cannot run {compiler}: {error}") from error
+    if result.returncode:
+        raise BuildError(
+            f"Compiling {grammar.path} failed:\n{result.stderr.strip()}"
+        )
+    return time.perf_counter() - start
+
+
+def _describe_rules(grammar: Grammar) -> str:
+    """Describes the size of each rule exported by a compiled grammar."""
+    lines = []
+    with pynini.Far(grammar.far_path, "r") as far:
+        for key, fst in far:
+            arcs = sum(fst.num_arcs(state) for state in fst.states())
+            lines.append(f"\n  {key}: {fst.num_states()} states, {arcs} arcs")
+    return "".join(lines)
+
+
+def build(
+    paths: List[str],
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    jobs: int = 1,
+    compiler: str = THRAXCOMPILER,
+) -> Dict[str, str]:
+    """Builds grammars and, first, the grammars they import.
+
+    Args:
+      paths: paths to the grammars to build.
+      cache_dir: the cache directory, or None to compile every grammar.
+      jobs: the maximum number of grammars compiled at once.
+      compiler: the compiler command.
+
+    Returns:
+      A dictionary mapping the path of each grammar built onto "cached" or
+      "compiled".
+
+    Raises:
+      BuildError: a grammar could not be built.
+    """
+    grammars = load_grammars(paths)
+    keys = cache_keys(grammars, compiler)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    results: Dict[str, str] = {}
+    remaining = dict(grammars)
+
+    def run(grammar: Grammar) -> str:
+        cached = (
+            os.path.join(cache_dir, f"{keys[grammar.path]}.far")
+            if cache_dir is not None
+            else None
+        )
+        if cached is not None and os.path.exists(cached):
+            _copy(cached, grammar.far_path)
+            result = "cached"
+            description = result
+        else:
+            seconds = _compile(grammar, compiler)
+            if cached is not None:
+                _copy(grammar.far_path, cached)
+            result = "compiled"
+            description = f"{result} in {seconds:.2f}s"
+        # Logs each grammar in a single message, so that messages from
+        # parallel builds are not interleaved.
+        logging.info(
+            "%s: %s%s", grammar.path, description, _describe_rules(grammar)
+        )
+        return result
+
+    with concurrent.futures.ThreadPoolExecutor(max(1, jobs)) as executor:
+        running: Dict[concurrent.futures.Future, str] = {}
+        while remaining or running:
+            # Starts every grammar whose imports have all been built.
+            for path, grammar in list(remaining.items()):
+                if all(i in results for i in grammar.imports):
+                    running[executor.submit(run, grammar)] = path
+                    del remaining[path]
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "grammars",
+        nargs="*",
+        default=[os.path.join("grammars", "all.grm")],
+        help="paths to the grammars to build (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="maximum number of grammars compiled at once "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="directory for cached FARs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="compile every grammar, without reading or writing the cache",
+    )
+    parser.add_argument(
+        "--thraxcompiler",
+        default=THRAXCOMPILER,
+        help="compiler command (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
+    args = _parse_args()
+    start = time.perf_counter()
+    try:
+        results = build(
+            args.grammars,
+            None if args.no_cache else args.cache_dir,
+            args.jobs,
+            args.thraxcompiler,
+        )
+    except BuildError as error:
+        logging.error("%s", error)
+        raise SystemExit(1)
+    compiled = sum(result == "compiled" for result in results.values())
+    logging.info(
+        "%d grammars compiled, %d cached, in %.2fs",
+        compiled,
+        len(results) - compiled,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Writes a startup-optimized grammar bundle."""
+
+import argparse
+import logging
+
+from latin_scansion import bundle
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", help="path for input grammar FAR")
+    parser.add_argument("output", help="path for output grammar bundle")
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="also add the pre-composed cascade, for latin_scan --cascade",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
+    args = _parse_args()
+    bundle.write_far(args.input, args.output, args.cascade)
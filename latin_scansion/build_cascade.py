@@ -0,0 +1,19 @@
+"""Adds the pre-composed cascade to a grammar FAR."""
+
+import argparse
+import logging
+
+from latin_scansion import cascade
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", help="path for input grammar FAR")
+    parser.add_argument("output", help="path for output grammar FAR")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
+    args = _parse_args()
+    cascade.write_far(args.input, args.output)
@@ -0,0 +1,95 @@
+"""Bounded caches for memoizing scansion."""
+
+import collections
+import logging
+
+from typing import Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from . import scansion_pb2
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded mapping which evicts its least recently used entries.
+
+    Args:
+      maxsize: the maximum number of entries.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "collections.OrderedDict[K, V]" = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Looks up a key, marking it as recently used.
+
+        Args:
+          key: the key to look up.
+
+        Returns:
+          The cached value, or None if the key is not cached.
+        """
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Caches a value, evicting the least recently used entry if full.
+
+        Args:
+          key: the key to cache under.
+          value: the value to cache.
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class ScansionCache:
+    """Caches for the stages of scansion.
+
+    The first maps verse texts onto their normalizations and pronunciations;
+    the second maps pronunciations onto their scansions, stored as partial
+    Verse messages. Since distinct texts may share a pronunciation, the
+    latter may hit even when the former misses. Optionally, a third maps
+    individual normalized words onto their pronunciations, so that verses
+    whose text is not cached are pronounced word by word.
+
+    Args:
+      maxsize: the maximum number of entries in each of the first two caches.
+      word_maxsize: if positive, the maximum number of entries in the word
+        cache.
+    """
+
+    def __init__(self, maxsize: int, word_maxsize: int = 0):
+        self.pronunciations: LRUCache[str, Tuple[str, str]] = LRUCache(maxsize)
+        self.scansions: LRUCache[str, scansion_pb2.Verse] = LRUCache(maxsize)
+        self.words: Optional[LRUCache[str, str]] = (
+            LRUCache(word_maxsize) if word_maxsize > 0 else None
+        )
+
+    def log_stats(self) -> None:
+        """Logs hit and miss counts."""
+        caches: List[Tuple[str, LRUCache]] = [
+            ("Pronunciation", self.pronunciations),
+            ("Scansion", self.scansions),
+        ]
+        if self.words is not None:
+            caches.append(("Word", self.words))
+        for name, cache in caches:
+            logging.info(
+                "%s cache: %d hits, %d misses", name, cache.hits, cache.misses
+            )
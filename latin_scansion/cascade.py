@@ -0,0 +1,158 @@
+"""Pre-composed variable-syllable-weight-hexameter cascade.
+
+At scan time, `scan_verse` composes the variable, syllable, weight, and
+hexameter rules one after another, then works backwards through three more
+shortest path computations to recover the intermediate structure. The
+pre-composed cascade instead maps a raw pronunciation directly onto a single
+"tape" which interleaves all four levels of structure, so that one
+composition and one shortest path suffice to recover the full alignment.
+
+On the tape, labels below SYLLABLE_OFFSET are the bytes of the pronunciation
+after poetic variation, and the syllable, weight, and foot codes are
+represented by adding SYLLABLE_OFFSET, WEIGHT_OFFSET, and FOOT_OFFSET,
+respectively, to their ASCII decimals. Each code immediately precedes the
+first lower-level label in its chunk. For instance, the tape for a single
+heavy closed syllable "tas" heading a spondee is (schematically):
+
+    FOOT:S WEIGHT:H SYLLABLE:O t SYLLABLE:U a SYLLABLE:C s ...
+"""
+
+import logging
+
+from typing import Iterable, Set
+
+import pynini
+
+
+# Name of the cascade in grammar FARs.
+CASCADE = "CASCADE"
+
+SYLLABLE_OFFSET = 256
+WEIGHT_OFFSET = 512
+FOOT_OFFSET = 768
+
+
+def _output_labels(fst: pynini.Fst) -> Set[int]:
+    """Collects the non-epsilon output labels of an FST."""
+    return {
+        arc.olabel
+        for state in fst.states()
+        for arc in fst.arcs(state)
+        if arc.olabel
+    }
+
+
+def _tag(
+    rule: pynini.Fst,
+    input_offset: int,
+    output_offset: int,
+    passthrough: Iterable[int],
+) -> pynini.Fst:
+    """Lifts a rule so that it writes onto, rather than consumes, the tape.
+
+    Each non-epsilon input label of the rule, shifted by `input_offset`, is
+    copied to the output, preceded by its output label (if any) shifted by
+    `output_offset`. Labels from lower levels of the tape are passed through
+    unchanged.
+
+    Args:
+      rule: the rule to lift.
+      input_offset: the tape offset for the rule's input labels.
+      output_offset: the tape offset for the rule's output labels.
+      passthrough: tape labels to pass through unchanged.
+
+    Returns:
+      The lifted rule.
+    """
+    passthrough_labels = sorted(passthrough)
+    one = pynini.Weight.one(rule.weight_type())
+    tagged = pynini.Fst(rule.arc_type())
+    tagged.add_states(rule.num_states())
+    tagged.set_start(rule.start())
+    for state in rule.states():
+        tagged.set_final(state, rule.final(state))
+        for label in passthrough_labels:
+            tagged.add_arc(state, pynini.Arc(label, label, one, state))
+        for arc in rule.arcs(state):
+            ilabel = arc.ilabel + input_offset if arc.ilabel else 0
+            if not arc.olabel:
+                tagged.add_arc(
+                    state,
+                    pynini.Arc(ilabel, ilabel, arc.weight, arc.nextstate),
+                )
+                continue
+            olabel = arc.olabel + output_offset
+            if not ilabel:
+                tagged.add_arc(
+                    state, pynini.Arc(0, olabel, arc.weight, arc.nextstate)
+                )
+                continue
+            # The code is written first so that it precedes its chunk.
+            medial = tagged.add_state()
+            tagged.add_arc(state, pynini.Arc(0, olabel, arc.weight, medial))
+            tagged.add_arc(
+                medial, pynini.Arc(ilabel, ilabel, one, arc.nextstate)
+            )
+    return tagged.arcsort("ilabel")
+
+
+def build_cascade(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+) -> pynini.Fst:
+    """Builds the pre-composed cascade.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+
+    Returns:
+      A transducer from raw pronunciations to tapes, optimized (i.e.,
+      determinized and minimized) as an encoded acceptor.
+    """
+    var_labels = _output_labels(variable_rule)
+    syllable_labels = {
+        label + SYLLABLE_OFFSET for label in _output_labels(syllable_rule)
+    }
+    syllable = _tag(syllable_rule, 0, SYLLABLE_OFFSET, ())
+    weight = _tag(weight_rule, SYLLABLE_OFFSET, WEIGHT_OFFSET, var_labels)
+    hexameter = _tag(
+        hexameter_rule,
+        WEIGHT_OFFSET,
+        FOOT_OFFSET,
+        var_labels | syllable_labels,
+    )
+    # The metrical part of the cascade is composed and optimized first, which
+    # keeps the final composition with the variable rule small.
+    meter = pynini.compose(pynini.compose(syllable, weight), hexameter)
+    meter.optimize().arcsort("ilabel")
+    cascade = pynini.compose(variable_rule, meter)
+    return cascade.optimize().arcsort("ilabel")
+
+
+def write_far(input_path: str, output_path: str) -> None:
+    """Copies a grammar FAR, adding the pre-composed cascade.
+
+    Args:
+      input_path: path for the input grammar FAR.
+      output_path: path for the output grammar FAR.
+    """
+    with pynini.Far(input_path, "r") as far:
+        rules = {key: fst.copy() for key, fst in far}
+    rules[CASCADE] = build_cascade(
+        rules["VARIABLE"],
+        rules["SYLLABLE"],
+        rules["WEIGHT"],
+        rules["HEXAMETER"],
+    )
+    logging.info("Cascade has %d states", rules[CASCADE].num_states())
+    with pynini.Far(
+        output_path, "w", arc_type=rules[CASCADE].arc_type()
+    ) as far:
+        # FAR keys must be written in lexicographic order.
+        for key in sorted(rules):
+            far[key] = rules[key]
@@ -0,0 +1,40 @@
+"""Converts Document messages between formats.
+
+Verses are converted one at a time, so textproto input must be in canonical
+form (see `latin_validate --canonicalize`).
+"""
+
+import argparse
+import logging
+
+import latin_scansion
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", help="path for input document")
+    parser.add_argument(
+        "output", help="path for output document (or - for stdout)"
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=latin_scansion.formats.FORMATS,
+        help="input format (default: guessed from the input path)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=latin_scansion.formats.FORMATS,
+        help="output format (default: guessed from the output path)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
+    args = _parse_args()
+    # Verses are converted one at a time, so that memory usage does not
+    # depend on the size of the document.
+    reader = latin_scansion.DocumentReader(args.input, args.input_format)
+    latin_scansion.stream_document(
+        reader, args.output, reader.name or None, args.output_format
+    )
@@ -0,0 +1,251 @@
+"""Persistent on-disk scansion cache.
+
+Unlike `ScansionCache`, which lasts only as long as the process, this cache
+stores scansions in an SQLite database, so that they can be shared by
+parallel workers, by concurrent invocations of `latin_scan`, and by later
+runs over (mostly) the same texts. Each entry is a serialized Verse message,
+without its number, keyed by a hash of the verse text and of the grammar FAR
+and scanning options (see `incremental.scan_key`), so that entries written
+with a different grammar or options are never used.
+
+The database is opened in write-ahead logging mode, so that readers do not
+block, and are not blocked by, a writer; concurrent writers wait for one
+another. (This requires a local filesystem.) Once the number of entries
+exceeds the limit, the least recently used entries are evicted.
+
+Lookups never write to the database, so that any number of processes can
+read it at once. Instead, the access times of entries found to be older
+than ACCESS_RESOLUTION are kept in memory and written in a single
+transaction by the next insertion, eviction, or close. Recency is thus only
+tracked to within that resolution, and is not recorded at all by a process
+which never writes to or closes its cache.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+
+from typing import Any, Callable, Dict, Optional
+
+from . import incremental
+from . import scansion_pb2
+from .stats import ScanStats
+
+
+# Name of the database file within the cache directory.
+FILENAME = "scansions.sqlite"
+
+# Default maximum number of entries.
+DEFAULT_MAX_ENTRIES = 1000000
+
+# Number of insertions after which a process checks the size of the cache.
+EVICT_INTERVAL = 1000
+
+# Seconds to wait for another process to release a lock.
+TIMEOUT = 30.0
+
+# Seconds by which an entry's recorded access time may lag behind its last
+# use.
+ACCESS_RESOLUTION = 3600.0
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS verses ("
+    "key TEXT PRIMARY KEY, verse BLOB NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS verses_accessed ON verses (accessed)",
+)
+
+
+class DiskCache:
+    """A persistent cache of scansions, shared across processes.
+
+    Each process (e.g., each parallel worker) opens its own connection to
+    the database when it first uses the cache.
+
+    Args:
+      cache_dir: path to the cache directory, which is created if needed.
+      max_entries: if positive, the maximum number of entries; the least
+        recently used entries beyond this are evicted.
+      access_resolution: seconds by which an entry's recorded access time
+        may lag behind its last use.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        access_resolution: float = ACCESS_RESOLUTION,
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, FILENAME)
+        self.max_entries = max_entries
+        self.access_resolution = access_resolution
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        # Access times not yet written, by key.
+        self._accessed: Dict[str, float] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+        # Creates the database, if needed, before any workers are started.
+        self._connect()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections cannot be shared across processes.
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_accessed"] = {}
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the connection for this process, if it is not yet open."""
+        if self._connection is None:
+            # Each statement is committed immediately.
+            connection = sqlite3.connect(
+                self.path, timeout=TIMEOUT, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    def __len__(self) -> int:
+        (count,) = (
+            self._connect().execute("SELECT COUNT(*) FROM verses").fetchone()
+        )
+        return count
+
+    def get(self, key: str) -> Optional[scansion_pb2.Verse]:
+        """Looks up a scansion, without writing to the database.
+
+        If the entry's access time is out of date, the new access time is
+        written later (see `flush`).
+
+        Args:
+          key: the key to look up.
+
+        Returns:
+          The cached Verse message, or None if the key is not cached.
+        """
+        row = (
+            self._connect()
+            .execute(
+                "SELECT verse, accessed FROM verses WHERE key = ?", (key,)
+            )
+            .fetchone()
+        )
+        if row is None:
+            self.misses += 1
+            return None
+        now = time.time()
+        if now - row[1] > self.access_resolution:
+            self._accessed[key] = now
+        self.hits += 1
+        return scansion_pb2.Verse.FromString(row[0])
+
+    def flush(self) -> None:
+        """Writes pending access times, in a single transaction."""
+        if not self._accessed:
+            return
+        connection = self._connect()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "UPDATE verses SET accessed = ? WHERE key = ?",
+                ((accessed, key) for key, accessed in self._accessed.items()),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        self._accessed.clear()
+
+    def put(self, key: str, verse: scansion_pb2.Verse) -> None:
+        """Caches a scansion, periodically evicting old entries.
+
+        Pending access times are written first.
+
+        Args:
+          key: the key to cache under.
+          verse: the Verse message to cache.
+        """
+        self.flush()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO verses VALUES (?, ?, ?)",
+            (key, verse.SerializeToString(), time.time()),
+        )
+        self._puts += 1
+        if self._puts % EVICT_INTERVAL == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Evicts the least recently used entries beyond the limit.
+
+        Pending access times are written first.
+        """
+        self.flush()
+        if self.max_entries <= 0:
+            return
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._connect().execute(
+                "DELETE FROM verses WHERE key IN "
+                "(SELECT key FROM verses ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        """Evicts old entries, then closes the connection."""
+        if self._connection is not None:
+            self.evict()
+            self._connection.close()
+            self._connection = None
+
+    def log_stats(self) -> None:
+        """Logs hit and miss counts."""
+        logging.info("Disk cache: %d hits, %d misses", self.hits, self.misses)
+
+
+class CachedScan:
+    """Wraps a scanning function with a disk cache.
+
+    Instances can be pickled (e.g., sent to parallel workers) whenever the
+    scanning function can.
+
+    Args:
+      scan: a function which scans a verse given its text and number, such
+        as `scan_verse` with its rules bound.
+      cache: the disk cache.
+      far_fingerprint: the fingerprint of the grammar and options.
+      stats: optional statistics.
+    """
+
+    def __init__(
+        self,
+        scan: Callable[[str, int], scansion_pb2.Verse],
+        cache: DiskCache,
+        far_fingerprint: str,
+        stats: Optional[ScanStats] = None,
+    ):
+        self._scan = scan
+        self._cache = cache
+        self._fingerprint = far_fingerprint
+        self._stats = stats
+
+    def __call__(self, text: str, number: int = 0) -> scansion_pb2.Verse:
+        key = incremental.scan_key(self._fingerprint, text)
+        verse = self._cache.get(key)
+        if self._stats is not None:
+            self._stats.count(
+                "disk_cache_hits" if verse is not None else "disk_cache_misses"
+            )
+        if verse is not None:
+            verse.number = number
+            return verse
+        verse = self._scan(text, number)
+        cached = scansion_pb2.Verse()
+        cached.CopyFrom(verse)
+        cached.ClearField("number")
+        self._cache.put(key, cached)
+        return verse
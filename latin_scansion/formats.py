@@ -0,0 +1,479 @@
+"""Code for reading and writing scansion documents in several formats.
+
+Three formats are supported:
+
+* "textproto": the human-readable text format (see textproto.py).
+* "binary": the protocol buffer binary wire format for a Document message.
+* "delimited": a stream of Verse messages in the binary wire format, each
+  preceded by its length as a varint. Since each record is self-contained,
+  such streams can be appended to or read incrementally. They do not record
+  the document name.
+
+Unless a format is specified explicitly, it is guessed from the file
+extension, defaulting to textproto.
+
+For large documents, `DocumentReader` yields verses one at a time, and
+supports random access to individual verses through an index of their byte
+offsets.
+"""
+
+import array
+import contextlib
+import os
+import os.path
+import sys
+
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+from google.protobuf import text_format  # type: ignore
+
+from . import scansion_pb2  # type: ignore
+from . import textproto
+
+
+TEXTPROTO = "textproto"
+BINARY = "binary"
+DELIMITED = "delimited"
+FORMATS = (TEXTPROTO, BINARY, DELIMITED)
+
+_EXTENSIONS = {
+    ".textproto": TEXTPROTO,
+    ".txtpb": TEXTPROTO,
+    ".binpb": BINARY,
+    ".pb": BINARY,
+    ".delimited": DELIMITED,
+}
+
+# Extensions of document files.
+EXTENSIONS = tuple(_EXTENSIONS)
+
+# Tag for field 2 (`verse`) of the Document message, with wire type 2
+# (length-delimited).
+_VERSE_TAG = b"\x12"
+_VERSE_FIELD = 2
+
+# Extension for offset index files, which are stored alongside documents.
+INDEX_EXTENSION = ".idx"
+
+
+def guess_format(path: str) -> str:
+    """Guesses the format of a file from its extension.
+
+    Args:
+      path: file path.
+
+    Returns:
+      The name of the format.
+    """
+    return _EXTENSIONS.get(os.path.splitext(path)[1], TEXTPROTO)
+
+
+def _encode_varint(value: int) -> bytes:
+    """Encodes a non-negative integer as a varint."""
+    buf = bytearray()
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def _decode_varint(source: BinaryIO) -> Optional[int]:
+    """Decodes a varint from a binary file object.
+
+    Args:
+      source: binary file object to read from.
+
+    Returns:
+      The decoded integer, or None at end of file.
+
+    Raises:
+      EOFError: the file ended in the middle of a varint.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = source.read(1)
+        if not byte:
+            if shift:
+                raise EOFError("Truncated varint")
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+
+
+def write_delimited(verse: scansion_pb2.Verse, sink: BinaryIO) -> None:
+    """Writes a single length-delimited verse message.
+
+    Args:
+      verse: the verse message to write.
+      sink: binary file object to write to.
+    """
+    serialized = verse.SerializeToString()
+    sink.write(_encode_varint(len(serialized)))
+    sink.write(serialized)
+
+
+def read_delimited(source: BinaryIO) -> Iterator[scansion_pb2.Verse]:
+    """Lazily reads length-delimited verse messages.
+
+    Args:
+      source: binary file object to read from.
+
+    Yields:
+      Parsed verse messages.
+
+    Raises:
+      EOFError: the file ended in the middle of a message.
+    """
+    for _, serialized in _delimited_records(source):
+        yield scansion_pb2.Verse.FromString(serialized)
+
+
+def read_document(
+    path: str, fmt: Optional[str] = None
+) -> scansion_pb2.Document:
+    """Reads document message from file.
+
+    Args:
+      path: file path to read from.
+      fmt: the format; if not specified, it is guessed from the path.
+
+    Returns:
+      A parsed document message.
+    """
+    fmt = fmt or guess_format(path)
+    if fmt == TEXTPROTO:
+        return textproto.read_document(path)
+    with open(path, "rb") as source:
+        if fmt == BINARY:
+            return scansion_pb2.Document.FromString(source.read())
+        elif fmt == DELIMITED:
+            document = scansion_pb2.Document()
+            document.verse.extend(read_delimited(source))
+            return document
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def write_document(
+    document: scansion_pb2.Document, path: str, fmt: Optional[str] = None
+) -> None:
+    """Writes document message to file.
+
+    Args:
+      document: the document message to write.
+      path: file path to write to.
+      fmt: the format; if not specified, it is guessed from the path.
+    """
+    stream_document(document.verse, path, document.name or None, fmt)
+
+
+def stream_document(
+    verses: Iterable[scansion_pb2.Verse],
+    path: str,
+    name: Optional[str] = None,
+    fmt: Optional[str] = None,
+) -> None:
+    """Writes document message to file one verse at a time.
+
+    Args:
+      verses: an iterable of verse messages to write.
+      path: file path to write to, or "-" for standard output.
+      name: optional metadata about the source; not recorded by the
+        delimited format.
+      fmt: the format; if not specified, it is guessed from the path.
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    with contextlib.ExitStack() as stack:
+        if fmt == TEXTPROTO:
+            sink = (
+                sys.stdout
+                if path == "-"
+                else stack.enter_context(open(path, "w"))
+            )
+            textproto.stream_document(verses, sink, name)
+            return
+        bsink = (
+            sys.stdout.buffer
+            if path == "-"
+            else stack.enter_context(open(path, "wb"))
+        )
+        if fmt == BINARY:
+            # A serialized Document is just its serialized fields, so verses
+            # can be written one at a time as occurrences of the verse field.
+            bsink.write(scansion_pb2.Document(name=name).SerializeToString())
+            for verse in verses:
+                bsink.write(_VERSE_TAG)
+                write_delimited(verse, bsink)
+        else:
+            for verse in verses:
+                write_delimited(verse, bsink)
+
+
+def _skip_field(source: BinaryIO, wire_type: int) -> None:
+    """Skips over the value of a field of the given wire type."""
+    if wire_type == 0:
+        _decode_varint(source)
+    elif wire_type == 1:
+        source.seek(8, os.SEEK_CUR)
+    elif wire_type == 2:
+        size = _decode_varint(source)
+        if size is None:
+            raise EOFError("Truncated field")
+        source.seek(size, os.SEEK_CUR)
+    elif wire_type == 5:
+        source.seek(4, os.SEEK_CUR)
+    else:
+        raise ValueError(f"Unsupported wire type: {wire_type}")
+
+
+def _read_record(source: BinaryIO, size: int) -> Tuple[int, bytes]:
+    """Reads a record of known size, returning it with its offset."""
+    offset = source.tell()
+    serialized = source.read(size)
+    if len(serialized) != size:
+        raise EOFError("Truncated verse message")
+    return offset, serialized
+
+
+def _binary_records(source: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Reads the verse messages in a binary document.
+
+    Args:
+      source: binary file object to read from.
+
+    Yields:
+      (offset, serialized verse message) pairs.
+
+    Raises:
+      EOFError: the file ended in the middle of a message.
+    """
+    while True:
+        tag = _decode_varint(source)
+        if tag is None:
+            return
+        field, wire_type = tag >> 3, tag & 0x07
+        if field != _VERSE_FIELD:
+            _skip_field(source, wire_type)
+            continue
+        size = _decode_varint(source)
+        if size is None:
+            raise EOFError("Truncated verse message")
+        yield _read_record(source, size)
+
+
+def _delimited_records(source: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Reads the verse messages in a delimited stream.
+
+    Args:
+      source: binary file object to read from.
+
+    Yields:
+      (offset, serialized verse message) pairs.
+
+    Raises:
+      EOFError: the file ended in the middle of a message.
+    """
+    while True:
+        size = _decode_varint(source)
+        if size is None:
+            return
+        yield _read_record(source, size)
+
+
+def _textproto_records(source: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Reads the verse messages in a textproto document.
+
+    This assumes the canonical layout written by `write_document` (or
+    `latin_validate --canonicalize`), in which each verse message begins with
+    a line reading `verse {` and ends with a line reading `}`.
+
+    Args:
+      source: binary file object to read from.
+
+    Yields:
+      (offset, body of verse message) pairs.
+    """
+    position = 0
+    offset = None
+    lines = []
+    for line in source:
+        if offset is None:
+            if line.rstrip() == b"verse {":
+                offset = position + len(line)
+        elif line.rstrip() == b"}":
+            yield offset, b"".join(lines)
+            offset = None
+            lines.clear()
+        else:
+            lines.append(line)
+        position += len(line)
+
+
+def _binary_header(source: BinaryIO) -> bytes:
+    """Reads the fields of a binary document other than its verses.
+
+    Args:
+      source: binary file object to read from.
+
+    Returns:
+      The serialized fields.
+    """
+    fields = []
+    while True:
+        start = source.tell()
+        tag = _decode_varint(source)
+        if tag is None:
+            return b"".join(fields)
+        _skip_field(source, tag & 0x07)
+        if tag >> 3 != _VERSE_FIELD:
+            end = source.tell()
+            source.seek(start)
+            fields.append(source.read(end - start))
+
+
+def _textproto_header(source: BinaryIO) -> bytes:
+    """Reads the fields of a textproto document other than its verses.
+
+    Like `_textproto_records`, this assumes the canonical layout.
+
+    Args:
+      source: binary file object to read from.
+
+    Returns:
+      The text of the fields.
+    """
+    lines = []
+    in_verse = False
+    for line in source:
+        if in_verse:
+            in_verse = line.rstrip() != b"}"
+        elif line.rstrip() == b"verse {":
+            in_verse = True
+        else:
+            lines.append(line)
+    return b"".join(lines)
+
+
+_RECORDS = {
+    TEXTPROTO: _textproto_records,
+    BINARY: _binary_records,
+    DELIMITED: _delimited_records,
+}
+
+
+class DocumentReader:
+    """Lazily reads verse messages from a document file.
+
+    Iterating over the reader parses one verse at a time, so that memory
+    usage does not depend on the size of the document. Indexing the reader
+    (e.g., `reader[n]` for the n-th verse, counting from zero) seeks directly
+    to the requested verse using an index of byte offsets. The index is
+    recorded during the first complete iteration, or otherwise built on the
+    first random access; it can also be written alongside the document with
+    `write_index`, in which case it is reused until the document changes.
+
+    Textproto documents must be in the canonical layout written by this
+    library; see `write_document`.
+
+    Args:
+      path: path for the document.
+      fmt: the format; if not specified, it is guessed from the path.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self._path = path
+        self._fmt = fmt or guess_format(path)
+        if self._fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {self._fmt}")
+        self._offsets: Optional[array.array] = None
+
+    @property
+    def name(self) -> str:
+        """The document name, read without parsing any verses.
+
+        This is empty for delimited documents, which do not record it.
+        """
+        document = scansion_pb2.Document()
+        if self._fmt == DELIMITED:
+            return document.name
+        with open(self._path, "rb") as source:
+            if self._fmt == TEXTPROTO:
+                text_format.Parse(
+                    _textproto_header(source).decode("utf8"), document
+                )
+            else:
+                document.MergeFromString(_binary_header(source))
+        return document.name
+
+    @property
+    def index_path(self) -> str:
+        """Path for the stored offset index."""
+        return self._path + INDEX_EXTENSION
+
+    def _parse(self, serialized: bytes) -> scansion_pb2.Verse:
+        if self._fmt == TEXTPROTO:
+            return text_format.Parse(
+                serialized.decode("utf8"), scansion_pb2.Verse()
+            )
+        return scansion_pb2.Verse.FromString(serialized)
+
+    def __iter__(self) -> Iterator[scansion_pb2.Verse]:
+        offsets = array.array("Q")
+        with open(self._path, "rb") as source:
+            for offset, serialized in _RECORDS[self._fmt](source):
+                offsets.extend((offset, len(serialized)))
+                yield self._parse(serialized)
+        self._offsets = offsets
+
+    def _source_stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self._path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self) -> Optional[array.array]:
+        try:
+            with open(self.index_path, "rb") as source:
+                data = source.read()
+        except FileNotFoundError:
+            return None
+        stored = array.array("Q")
+        stored.frombytes(data)
+        if tuple(stored[:2]) != self._source_stamp():
+            return None
+        return stored[2:]
+
+    def _index(self) -> array.array:
+        if self._offsets is None:
+            self._offsets = self._load_index()
+        if self._offsets is None:
+            offsets = array.array("Q")
+            with open(self._path, "rb") as source:
+                for offset, serialized in _RECORDS[self._fmt](source):
+                    offsets.extend((offset, len(serialized)))
+            self._offsets = offsets
+        return self._offsets
+
+    def write_index(self) -> None:
+        """Writes the offset index alongside the document."""
+        stored = array.array("Q", self._source_stamp())
+        stored.extend(self._index())
+        with open(self.index_path, "wb") as sink:
+            stored.tofile(sink)
+
+    def __len__(self) -> int:
+        return len(self._index()) // 2
+
+    def __getitem__(self, n: int) -> scansion_pb2.Verse:
+        offsets = self._index()
+        length = len(offsets) // 2
+        if n < 0:
+            n += length
+        if not 0 <= n < length:
+            raise IndexError("Verse index out of range")
+        with open(self._path, "rb") as source:
+            source.seek(offsets[2 * n])
+            return self._parse(source.read(offsets[2 * n + 1]))
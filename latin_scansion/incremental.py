@@ -0,0 +1,163 @@
+"""Incremental rescanning.
+
+When only a few lines of a text have changed since it was last scanned, most
+of the previous scansion can be reused. Each verse scanned incrementally
+records a key (the `scan_key` field): a hash of its text and of a
+fingerprint of the grammar FAR and of the options which affect scansion.
+When the text is rescanned, each line whose key matches that of a previously
+scanned verse reuses that verse as is, renumbered; only new or changed lines
+are scanned. Since verses are matched by key rather than by position,
+insertions and deletions are handled correctly, and if the grammar or the
+options change, no verses are reused.
+"""
+
+import collections
+import hashlib
+import logging
+
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from . import scansion
+from . import scansion_pb2
+from .stats import ScanStats
+
+
+# Size in bytes of the hashes.
+DIGEST_SIZE = 16
+
+# Size in bytes of the blocks the FAR is read in.
+_BLOCK_SIZE = 1 << 16
+
+
+def fingerprint(far_path: str, *options: Any) -> str:
+    """Computes a fingerprint of a grammar FAR and scanning options.
+
+    Args:
+      far_path: path to the grammar FAR.
+      *options: the values of any options which affect scansion; their
+        representations are hashed.
+
+    Returns:
+      The fingerprint, as a hexadecimal string.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(far_path, "rb") as source:
+        for block in iter(lambda: source.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+    for option in options:
+        digest.update(b"\0")
+        digest.update(repr(option).encode("utf8"))
+    return digest.hexdigest()
+
+
+def scan_key(far_fingerprint: str, text: str) -> str:
+    """Computes the key of a verse.
+
+    Args:
+      far_fingerprint: the fingerprint of the grammar and options.
+      text: the input text.
+
+    Returns:
+      The key, as a hexadecimal string.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    digest.update(far_fingerprint.encode("ascii"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf8"))
+    return digest.hexdigest()
+
+
+def index_verses(
+    verses: Iterable[scansion_pb2.Verse],
+) -> Dict[str, scansion_pb2.Verse]:
+    """Indexes previously scanned verses by their keys.
+
+    Args:
+      verses: an iterable of scanned verses; those without keys (i.e., not
+        scanned incrementally) are ignored.
+
+    Returns:
+      A dictionary mapping keys onto verses.
+    """
+    return {verse.scan_key: verse for verse in verses if verse.scan_key}
+
+
+def rescan_verses(
+    scan: Callable[[str, int], scansion_pb2.Verse],
+    verses: Iterable[str],
+    previous: Dict[str, scansion_pb2.Verse],
+    far_fingerprint: str,
+    jobs: int = 1,
+    stats: Optional[ScanStats] = None,
+) -> Iterator[scansion_pb2.Verse]:
+    """Lazily scans verses, numbering them from 1, reusing previous verses.
+
+    The number of verses reused and rescanned is logged once the input is
+    exhausted.
+
+    Args:
+      scan: a function which scans a verse given its text and number, such
+        as `scan_verse` with its rules bound.
+      verses: an iterable of verses to scan.
+      previous: previously scanned verses, indexed by their keys (see
+        `index_verses`).
+      far_fingerprint: the fingerprint of the grammar and options.
+      jobs: number of worker processes used to scan new or changed verses.
+      stats: optional statistics.
+
+    Yields:
+      Populated Verse messages, with their keys, in input order.
+    """
+    # Verses not yet yielded, in input order, as tuples of the verse number,
+    # the key, and the previous verse, if any.
+    pending: Deque[
+        Tuple[int, str, Optional[scansion_pb2.Verse]]
+    ] = collections.deque()
+
+    def changed() -> Iterator[Tuple[str, int]]:
+        for number, text in enumerate(verses, 1):
+            key = scan_key(far_fingerprint, text)
+            verse = previous.get(key)
+            pending.append((number, key, verse))
+            if verse is None:
+                yield text, number
+
+    def reuse() -> Iterator[scansion_pb2.Verse]:
+        while pending and pending[0][2] is not None:
+            number, _, previous_verse = pending.popleft()
+            verse = scansion_pb2.Verse()
+            verse.CopyFrom(previous_verse)
+            verse.number = number
+            yield verse
+
+    reused_verses = 0
+    rescanned_verses = 0
+    # Since verses are scanned in input order, each scanned verse belongs to
+    # the first pending verse with no previous verse.
+    for verse in scansion.scan_numbered(scan, changed(), jobs):
+        for reused in reuse():
+            reused_verses += 1
+            yield reused
+        _, verse.scan_key, _ = pending.popleft()
+        rescanned_verses += 1
+        yield verse
+    for reused in reuse():
+        reused_verses += 1
+        yield reused
+    logging.info(
+        "%d verses reused, %d verses rescanned",
+        reused_verses,
+        rescanned_verses,
+    )
+    if stats is not None:
+        stats.count("reused_verses", reused_verses)
+        stats.count("rescanned_verses", rescanned_verses)
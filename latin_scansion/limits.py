@@ -0,0 +1,73 @@
+"""Limits on the size of scansion lattices.
+
+Each of the optional rules in the variable rule can double the number of
+paths through the lattices built during scansion, so that a sufficiently
+long (or sufficiently unusual) line can take far longer to scan than a
+typical verse. Limits bound this work: lattices may be pruned to paths
+within a cost threshold of the best path, and scansion of a verse is
+abandoned, and the verse marked incomplete, as soon as a lattice exceeds a
+maximum number of states or arcs.
+"""
+
+from typing import Optional
+
+import pynini
+
+
+class LatticeLimitError(Exception):
+    """Raised when a lattice exceeds the configured size limits."""
+
+
+class ScanLimits:
+    """Limits on the size of the lattices built during scansion.
+
+    Args:
+      threshold: if set, each lattice is pruned to the paths whose cost is
+        within this threshold of the best path. Since this is applied to
+        each lattice before later rules are composed, it can discard the
+        paths which would have given the best scansion; it also limits the
+        alternatives found in n-best mode.
+      max_states: if positive, the maximum number of states in a lattice.
+      max_arcs: if positive, the maximum number of arcs in a lattice.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_states: int = 0,
+        max_arcs: int = 0,
+    ):
+        self.threshold = threshold
+        self.max_states = max_states
+        self.max_arcs = max_arcs
+
+    def apply(self, fst: pynini.Fst, stage: str) -> pynini.Fst:
+        """Prunes a lattice, then checks its size.
+
+        Args:
+          fst: the lattice, which is modified in place.
+          stage: the name of the stage which produced the lattice.
+
+        Returns:
+          The lattice.
+
+        Raises:
+          LatticeLimitError: the lattice exceeds the limits.
+        """
+        if self.threshold is not None:
+            fst.prune(weight=self.threshold)
+        if self.max_states > 0:
+            states = fst.num_states()
+            if states > self.max_states:
+                raise LatticeLimitError(
+                    f"{stage} lattice has {states} states "
+                    f"(limit {self.max_states})"
+                )
+        if self.max_arcs > 0:
+            arcs = sum(fst.num_arcs(state) for state in fst.states())
+            if arcs > self.max_arcs:
+                raise LatticeLimitError(
+                    f"{stage} lattice has {arcs} arcs "
+                    f"(limit {self.max_arcs})"
+                )
+        return fst
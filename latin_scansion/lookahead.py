@@ -0,0 +1,54 @@
+"""Lookahead filtering of the syllable and weight rules.
+
+Stepwise scanning composes a pronunciation with the variable, syllable,
+weight, and meter rules one after another, so that each intermediate
+lattice contains every path the rules allow, even though the meter rejects
+most of them. Delayed composition with lookahead filters would avoid this by
+only expanding states from which the meter can still be reached, but pynini
+does not expose either. Instead, the same effect is achieved ahead of time:
+the output of each rule is restricted to the (unweighted) inputs accepted by
+the rules after it, so that the lattices only ever contain paths that can
+still be scanned. The lattices of the weight and meter steps are thus
+smaller, though scanning as a whole is only marginally faster.
+
+The filtered rules are deliberately not optimized. Composing a rule with an
+unweighted acceptor keeps the weights and the arc order of the rule, so that
+paths of equal cost are broken in the same order as by stepwise scanning, and
+the scansions are unchanged. Optimizing the filtered rules reorders their
+arcs, and may select a different syllabification of equal cost.
+
+Only the syllable and weight rules are filtered: the filtered variable rule
+is nearly a hundred times larger than the original, and takes a noticeable
+fraction of a second to build, for no measurable gain.
+"""
+
+from typing import Iterable, Tuple
+
+import pynini
+
+
+def _domain(rule: pynini.Fst) -> pynini.Fst:
+    """Computes the unweighted acceptor of the inputs a rule accepts."""
+    domain = pynini.arcmap(pynini.project(rule, "input"), map_type="rmweight")
+    return domain.optimize()
+
+
+def filter_rules(
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    meter_rules: Iterable[pynini.Fst],
+) -> Tuple[pynini.Fst, pynini.Fst]:
+    """Restricts the syllable and weight rules to scannable outputs.
+
+    Args:
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      meter_rules: the rules of the meters scanned.
+
+    Returns:
+      A tuple of the filtered syllable and weight rules.
+    """
+    meters = pynini.union(*(_domain(rule) for rule in meter_rules))
+    weight_rule = pynini.compose(weight_rule, meters.optimize())
+    syllable_rule = pynini.compose(syllable_rule, _domain(weight_rule))
+    return syllable_rule, weight_rule
@@ -0,0 +1,89 @@
+"""Registry of meters.
+
+Every meter shares the normalization, pronunciation, variable,
+syllabification, and weight rules, and differs only in the final rule,
+which maps weight codes onto foot codes and rejects any sequence which is
+not a valid line of that meter. When scanning with several meters, the
+shared lattices are built once per verse, and each meter's rule is then
+composed with the weight lattice in turn.
+
+Additional meters can be added with `register`, given a grammar FAR which
+exports their rules.
+"""
+
+from typing import Dict, Iterable, List
+
+from . import prefilter
+
+
+class Meter:
+    """A meter.
+
+    Args:
+      name: the name of the meter, as used on the command line and in the
+        `meter` field of scanned verses.
+      rule: the name of its rule in grammar FARs.
+      min_syllables: the minimum number of syllables in a line.
+      max_syllables: the maximum number of syllables in a line.
+    """
+
+    def __init__(
+        self, name: str, rule: str, min_syllables: int, max_syllables: int
+    ):
+        self.name = name
+        self.rule = rule
+        self.min_syllables = min_syllables
+        self.max_syllables = max_syllables
+
+    def __repr__(self) -> str:
+        return f"Meter({self.name!r})"
+
+
+METERS: Dict[str, Meter] = {}
+
+
+def register(meter: Meter) -> None:
+    """Adds a meter to the registry.
+
+    Args:
+      meter: the meter.
+    """
+    METERS[meter.name] = meter
+
+
+def lookup(names: Iterable[str]) -> List[Meter]:
+    """Looks up meters by name.
+
+    Args:
+      names: the names of the meters.
+
+    Returns:
+      The meters, in the same order.
+
+    Raises:
+      ValueError: unknown meter.
+    """
+    meters = []
+    for name in names:
+        if name not in METERS:
+            raise ValueError(
+                f"Unknown meter: {name} (known meters: "
+                f"{', '.join(sorted(METERS))})"
+            )
+        meters.append(METERS[name])
+    return meters
+
+
+# See grammars/hexameter.grm.
+register(
+    Meter(
+        "hexameter",
+        "HEXAMETER",
+        prefilter.MIN_SYLLABLES,
+        prefilter.MAX_SYLLABLES,
+    )
+)
+# See grammars/pentameter.grm.
+register(Meter("pentameter", "PENTAMETER", 12, 14))
+# See grammars/hendecasyllable.grm.
+register(Meter("hendecasyllable", "HENDECASYLLABLE", 11, 11))
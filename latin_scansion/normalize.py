@@ -0,0 +1,37 @@
+"""Table-driven normalization.
+
+This is a pure-Python equivalent of the NORMALIZE rule (see
+grammars/normalize.grm), which case-folds and removes punctuation. It gives
+the same results as rewriting with the rule (see tests/normalize_test.py)
+but is much faster, since no composition is needed.
+"""
+
+# Case-folding table; see grammars/casefold.tsv. Note that this does not
+# include W, which is not used in Latin.
+CASEFOLD = dict(
+    zip("ABCDEFGHIJKLMNOPQRSTUVXYZĀĒĪŌŪ", "abcdefghijklmnopqrstuvxyzāēīōū")
+)
+
+# Punctuation to remove; see `punctuation` in grammars/normalize.grm.
+PUNCTUATION = "!\"'()[],.:;?"
+
+EM_DASH = "---"
+
+_TABLE = str.maketrans({**CASEFOLD, **{char: None for char in PUNCTUATION}})
+
+
+def normalize(text: str) -> str:
+    """Case-folds and removes punctuation from a verse.
+
+    As in the NORMALIZE rule, an em-dash (written as three hyphens) is
+    removed at the end of the verse and otherwise replaced with a space.
+
+    Args:
+      text: the input text.
+
+    Returns:
+      The normalized text.
+    """
+    if text.endswith(EM_DASH):
+        text = text[: -len(EM_DASH)]
+    return text.replace(EM_DASH, " ").translate(_TABLE)
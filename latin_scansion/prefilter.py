@@ -0,0 +1,82 @@
+"""Syllable-count prefilter.
+
+A hexameter has between 12 and 17 syllables, and the hexameter rule rejects
+anything else, but a verse is only known to be defective once the full
+cascade has been composed. Since every syllable has exactly one nucleus, the
+number of syllables a pronunciation can have after poetic variation can be
+bounded cheaply by counting its vowels and the places where the variable
+rule (see grammars/variable.grm) may add or remove a nucleus:
+
+*   elision removes at most one nucleus per word boundary between a word
+    ending in a vowel or diphthong and one beginning with a vowel (possibly
+    after h-deletion);
+*   synizesis removes at most one nucleus per high vowel adjacent to another
+    vowel (ignoring "h", which may be deleted, and word boundaries, which
+    elision may remove);
+*   diaeresis adds a nucleus for each glide after "k" or "g", and for each
+    "jj".
+
+Verses whose bounds fall entirely outside the hexameter's range (or, when
+scanning with several meters, the union of their ranges) cannot be scanned,
+and are marked defective without composing any rules.
+"""
+
+import re
+
+from typing import Tuple
+
+
+# The range of syllable counts of a hexameter: five dactyls or spondees,
+# then a spondee or trochee; see grammars/hexameter.grm.
+MIN_SYLLABLES = 12
+MAX_SYLLABLES = 17
+
+# Phonemic vowels, without length; see grammars/inventory.grm.
+VOWELS = "aeiouãẽĩõũ"
+
+_VOWEL = re.compile(f"[{VOWELS}]")
+_DIAERESIS = re.compile("[kg]w|jj")
+# The following vowel is only looked ahead at, so that a word consisting of
+# a single vowel may itself be elided (e.g., "ille ē ōris").
+_ELISION = re.compile(f"(?:[{VOWELS}]ː?|oj|aj|aw) (?=h?[{VOWELS}])")
+_IGNORED = re.compile("[hː ]")
+_SYNIZESIS = re.compile(f"(?<=[{VOWELS}])[iu]|[iu](?=[{VOWELS}])")
+
+
+def syllable_bounds(raw_pron: str) -> Tuple[int, int]:
+    """Bounds the number of syllables of a pronunciation.
+
+    Args:
+      raw_pron: the pronunciation before poetic variation.
+
+    Returns:
+      The minimum and maximum number of syllables after poetic variation.
+    """
+    nuclei = len(_VOWEL.findall(raw_pron))
+    minimum = (
+        nuclei
+        - len(_ELISION.findall(raw_pron))
+        - len(_SYNIZESIS.findall(_IGNORED.sub("", raw_pron)))
+    )
+    maximum = nuclei + len(_DIAERESIS.findall(raw_pron))
+    return minimum, maximum
+
+
+def may_scan(
+    raw_pron: str,
+    min_syllables: int = MIN_SYLLABLES,
+    max_syllables: int = MAX_SYLLABLES,
+) -> bool:
+    """Checks whether a pronunciation could have a line's syllables.
+
+    Args:
+      raw_pron: the pronunciation before poetic variation.
+      min_syllables: the minimum number of syllables in a line (by default,
+        that of a hexameter).
+      max_syllables: the maximum number of syllables in a line.
+
+    Returns:
+      False if the verse is certainly defective.
+    """
+    minimum, maximum = syllable_bounds(raw_pron)
+    return minimum <= max_syllables and maximum >= min_syllables
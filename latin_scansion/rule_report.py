@@ -0,0 +1,198 @@
+"""Reports the sizes of the grammar rules, sub-rule by sub-rule.
+
+Since composition takes time linear in the size of its arguments, the sizes
+of the exported rules largely determine how long scanning takes. For each
+rule rebuilt by rules.py, this reports the number of states and arcs of each
+sub-rule, whether it is input-deterministic, and how many of its arcs have
+input or output epsilons, and then the size of each intermediate composition
+under one or more factorings of the chain:
+
+*   "left": ((a @ b) @ c) @ d, as Thrax composes;
+*   "right": a @ (b @ (c @ d)); and
+*   "balanced": (a @ b) @ (c @ d).
+
+Each factoring computes the same rule once optimized, but their intermediate
+compositions, and so the time they take, may differ greatly.
+"""
+
+import argparse
+import time
+
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+import pynini
+
+from . import rules
+
+
+# Factorings of a chain of compositions.
+FACTORINGS = ("left", "right", "balanced")
+
+
+class FstStats(NamedTuple):
+    """Size statistics for an FST."""
+
+    states: int
+    arcs: int
+    input_deterministic: bool
+    input_epsilons: int
+    output_epsilons: int
+
+
+def fst_stats(fst: pynini.Fst) -> FstStats:
+    """Computes size statistics for an FST.
+
+    Args:
+      fst: the FST.
+
+    Returns:
+      The statistics.
+    """
+    arcs = [arc for state in fst.states() for arc in fst.arcs(state)]
+    return FstStats(
+        fst.num_states(),
+        len(arcs),
+        fst.properties(pynini.I_DETERMINISTIC, True) == pynini.I_DETERMINISTIC,
+        sum(arc.ilabel == 0 for arc in arcs),
+        sum(arc.olabel == 0 for arc in arcs),
+    )
+
+
+# An intermediate composition: the names of the first and last stages it
+# covers, its statistics, and the seconds it took.
+Product = Tuple[str, str, FstStats, float]
+
+
+def compose_factored(
+    stages: List[rules.Stage], factoring: str
+) -> Tuple[pynini.Fst, List[Product]]:
+    """Composes a chain of stages under a factoring.
+
+    Args:
+      stages: the stages.
+      factoring: one of FACTORINGS.
+
+    Returns:
+      A tuple of the unoptimized composition and its intermediate
+      compositions, in the order they were computed.
+
+    Raises:
+      ValueError: unknown factoring.
+    """
+    if factoring not in FACTORINGS:
+        raise ValueError(f"Unknown factoring: {factoring}")
+    if len(stages) == 1:
+        return stages[0][1].copy(), []
+    products: List[Product] = []
+
+    def compose(first: int, last: int) -> pynini.Fst:
+        """Composes stages[first:last + 1]."""
+        if first == last:
+            return stages[first][1]
+        if factoring == "left":
+            split = last - 1
+        elif factoring == "right":
+            split = first
+        else:
+            split = (first + last) // 2
+        left = compose(first, split)
+        right = compose(split + 1, last)
+        start = time.perf_counter()
+        product = pynini.compose(left, right)
+        seconds = time.perf_counter() - start
+        products.append(
+            (stages[first][0], stages[last][0], fst_stats(product), seconds)
+        )
+        return product
+
+    return compose(0, len(stages) - 1), products
+
+
+def _describe(
+    name: str, stats: FstStats, seconds: Optional[float] = None
+) -> str:
+    return (
+        f"{name:40} {stats.states:8} {stats.arcs:8} "
+        f"{'yes' if stats.input_deterministic else 'no':>6} "
+        f"{stats.input_epsilons:8} {stats.output_epsilons:8}"
+        + ("" if seconds is None else f" {seconds:8.3f}")
+    )
+
+
+_HEADER = (
+    f"{'':40} {'states':>8} {'arcs':>8} {'i-det':>6} "
+    f"{'i-eps':>8} {'o-eps':>8} {'seconds':>8}"
+)
+
+
+def report(
+    far_path: Optional[str],
+    names: List[str],
+    factorings: List[str],
+) -> Iterator[str]:
+    """Generates the lines of the report.
+
+    Args:
+      far_path: optional path for the grammar FAR, whose rules are reported
+        for comparison.
+      names: names of the rules to report; see `rules.STAGES`.
+      factorings: factorings to report; see FACTORINGS.
+
+    Yields:
+      Lines of the report.
+    """
+    exported = {}
+    if far_path is not None:
+        with pynini.Far(far_path, "r") as far:
+            exported = {key: fst.copy() for key, fst in far}
+    for name in names:
+        stages = rules.STAGES[name]()
+        yield f"{name}:"
+        yield f"    {_HEADER}"
+        yield "  stages:"
+        for stage, fst in stages:
+            yield f"    {_describe(stage, fst_stats(fst))}"
+        if name in exported:
+            yield f"    {_describe('(exported)', fst_stats(exported[name]))}"
+        for factoring in factorings:
+            start = time.perf_counter()
+            fst, products = compose_factored(stages, factoring)
+            fst.optimize()
+            seconds = time.perf_counter() - start
+            yield f"  {factoring} factoring:"
+            for first, last, stats, seconds in products:
+                yield f"    {_describe(f'{first}..{last}', stats, seconds)}"
+            yield f"    {_describe('(optimized)', fst_stats(fst), seconds)}"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rule",
+        action="append",
+        choices=list(rules.STAGES),
+        help="rule to report; may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--far",
+        help="path for a grammar FAR, whose rules are reported for comparison",
+    )
+    parser.add_argument(
+        "--factoring",
+        action="append",
+        choices=FACTORINGS,
+        help="factoring to report; may be repeated (default: left)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    for line in report(
+        args.far, args.rule or list(rules.STAGES), args.factoring or ["left"]
+    ):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Pynini-native, stage-by-stage definitions of the grammar rules.
+
+The Thrax grammars define PRONOUNCE, VARIABLE, and SYLLABLE as chains of
+composed sub-rules (e.g., the twenty rewrites PRONOUNCE composes), but a
+grammar FAR only contains the exported rules, so the sizes of the
+intermediate sub-rules and compositions cannot be read from it. This module
+rebuilds each of these chains from the same definitions, one sub-rule at a
+time, so that they can be inspected (see rule_report.py).
+
+This module is a hand-maintained copy, not a translation: the grammars remain
+the source of truth, and whenever pronounce.grm, variable.grm, syllable.grm,
+or the grammars they import change, this module must be changed to match.
+tests/rules_test.py checks that the rebuilt rules agree with the FAR over the
+whole of Aeneid 1, and so fails if the two drift apart.
+
+Thrax's `CDRewrite` and `Optimize` correspond to `pynini.cdrewrite` and
+`Fst.optimize`, and a weight `<n>` to `_add_weight`.
+"""
+
+import functools
+
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import pynini
+
+
+# A named sub-rule of a chain.
+Stage = Tuple[str, pynini.Fst]
+
+
+class _Inventory(NamedTuple):
+    """The inventory definitions of inventory.grm."""
+
+    grapheme: pynini.Fst
+    phoneme: pynini.Fst
+    short_vowel: pynini.Fst
+    long_vowel: pynini.Fst
+    phonemic_vowel: pynini.Fst
+    voiceless_stop: pynini.Fst
+    stop: pynini.Fst
+    liquid: pynini.Fst
+    consonant: pynini.Fst
+    bow: pynini.Fst
+    eow: pynini.Fst
+    nucleus: pynini.Fst
+    prosodic_symbol: pynini.Fst
+
+
+def _union(*strings: str) -> pynini.Fst:
+    """Unions strings, optimized."""
+    return pynini.union(*strings).optimize()
+
+
+def _crosses(*pairs: Tuple[str, str]) -> pynini.Fst:
+    """Unions the cross-products of pairs of strings."""
+    return pynini.union(*(pynini.cross(i, o) for i, o in pairs))
+
+
+def _add_weight(fst: pynini.FstLike, weight: float) -> pynini.Fst:
+    """Weights an FST (cf. Thrax's `<weight>`)."""
+    return pynini.concat(fst, pynini.accep("", weight=weight))
+
+
+@functools.lru_cache(maxsize=None)
+def _inventory() -> _Inventory:
+    """Builds the inventory once, on first use."""
+    space = _union(" ", "\t", "\n", "\r")
+    short_vowel = _union("a", "e", "i", "o", "u", "ã", "ẽ", "ĩ", "õ", "ũ")
+    long_vowel = short_vowel + "ː"
+    voiceless_stop = _union("p", "t", "k")
+    stop = pynini.union(voiceless_stop, _union("b", "d", "g")).optimize()
+    liquid = _union("l", "r")
+    nucleus = _union("U", "-")
+    return _Inventory(
+        grapheme=pynini.union(
+            *"abcdefghijklmnopqrstuvwxyzāēīōūȳäëïöü", space
+        ).optimize(),
+        phoneme=pynini.union(
+            *"a aː ãː b d e eː ẽː f g h i iː ĩː j k kw l m n ŋ o oː õː p "
+            "r s t u uː ũː w z".split(),
+            space,
+        ).optimize(),
+        short_vowel=short_vowel,
+        long_vowel=long_vowel,
+        phonemic_vowel=pynini.union(short_vowel, long_vowel),
+        voiceless_stop=voiceless_stop,
+        stop=stop,
+        liquid=liquid,
+        consonant=pynini.union(stop, liquid, *"fhjmnŋswz").optimize(),
+        bow=pynini.union(space, "[BOS]").optimize(),
+        eow=pynini.union(space, "[EOS]").optimize(),
+        nucleus=nucleus,
+        prosodic_symbol=pynini.union(nucleus, *"OCLHDST").optimize(),
+    )
+
+
+def _rewrite(
+    tau: pynini.FstLike, sigma_star: pynini.Fst, *args, **kwargs
+) -> pynini.Fst:
+    """Performs an unconditioned rewrite (cf. utility.grm's `Rewrite`)."""
+    return pynini.cdrewrite(tau, "", "", sigma_star, *args, **kwargs)
+
+
+def pronounce_stages() -> List[Stage]:
+    """Builds the stages of PRONOUNCE (see pronounce.grm).
+
+    The first and last stages are the closures of the graphemes and phonemes
+    which, by composition, filter the input and output of the rules.
+    """
+    inv = _inventory()
+    sigma_star = pynini.union(inv.grapheme, inv.phoneme).closure().optimize()
+
+    def rewrite_word(*pairs: Tuple[str, str]) -> pynini.Fst:
+        return pynini.cdrewrite(_crosses(*pairs), inv.bow, inv.eow, sigma_star)
+
+    stages = [
+        (
+            "ei_exceptions",
+            rewrite_word(
+                ("dein", "dẽːj"),
+                ("deinde", "dẽːjde"),
+                ("deinceps", "dẽːjkeps"),
+                ("ei", "ej"),
+                ("hei", "hej"),
+                ("heia", "heja"),
+            ),
+        ),
+        (
+            "eu_exceptions",
+            rewrite_word(
+                ("heus", "hews"),
+                ("ceu", "kew"),
+                ("neu", "new"),
+                ("seu", "sew"),
+                ("ēheu", "eːhew"),
+            ),
+        ),
+        (
+            "oi_exceptions",
+            rewrite_word(("proin", "projn"), ("proinde", "projnde")),
+        ),
+        (
+            "ou_exceptions",
+            rewrite_word(("boum", "bowũː"), ("prout", "prowt")),
+        ),
+        (
+            "ui_exceptions",
+            rewrite_word(("hui", "huj"), ("huic", "hujk"), ("cui", "kuj")),
+        ),
+        (
+            "internal_nasalization",
+            pynini.cdrewrite(
+                _crosses(
+                    ("ān", "ãː"),
+                    ("ēn", "ẽː"),
+                    ("īn", "ĩː"),
+                    ("ōn", "õː"),
+                    ("ūn", "ũː"),
+                ),
+                "",
+                _union("f", "s"),
+                sigma_star,
+            ),
+        ),
+        (
+            "long_monophthongs",
+            _rewrite(
+                _crosses(
+                    ("ā", "aː"),
+                    ("ē", "eː"),
+                    ("ī", "iː"),
+                    ("ō", "oː"),
+                    ("ū", "uː"),
+                    ("ȳ", "uː"),
+                ),
+                sigma_star,
+            ),
+        ),
+        (
+            "digraphs",
+            _rewrite(
+                _crosses(("ph", "p"), ("ch", "k"), ("th", "t")), sigma_star
+            ),
+        ),
+        (
+            "unconditioned_rewrites",
+            _rewrite(
+                _crosses(("c", "k"), ("x", "ks"), ("v", "w"), ("y", "u")),
+                sigma_star,
+            ),
+        ),
+        (
+            "u_loss",
+            _rewrite(_crosses(("nguu", "ngu"), ("quu", "ku")), sigma_star),
+        ),
+        ("qu", _rewrite(pynini.cross("qu", "kw"), sigma_star)),
+        (
+            "ngu",
+            pynini.cdrewrite(
+                pynini.cross("gu", "gw"), "n", inv.phonemic_vowel, sigma_star
+            ),
+        ),
+        (
+            "gn",
+            pynini.cdrewrite(pynini.cross("gn", "n"), inv.bow, "", sigma_star)
+            @ _rewrite(pynini.cross("gn", "ŋn"), sigma_star),
+        ),
+        (
+            "final_nasalization",
+            pynini.cdrewrite(
+                _crosses(
+                    ("am", "ãː"),
+                    ("em", "ẽː"),
+                    ("im", "ĩː"),
+                    ("om", "õː"),
+                    ("um", "ũː"),
+                ),
+                "",
+                pynini.accep("kwe").ques + inv.eow,
+                sigma_star,
+            ),
+        ),
+        (
+            "nasal_place_assimilation",
+            pynini.cdrewrite(
+                pynini.cross("n", "ŋ"), "", _union("k", "g"), sigma_star
+            ),
+        ),
+        ("ae_diphthonization", _rewrite(pynini.cross("ae", "aj"), sigma_star)),
+        ("oe_diphthonization", _rewrite(pynini.cross("oe", "oj"), sigma_star)),
+        ("au_diphthonization", _rewrite(pynini.cross("au", "aw"), sigma_star)),
+        (
+            "diaeresis",
+            _rewrite(
+                _crosses(
+                    ("ä", "a"), ("ë", "e"), ("ï", "i"), ("ö", "o"), ("ü", "u")
+                ),
+                sigma_star,
+            ),
+        ),
+        (
+            "geminates",
+            pynini.cdrewrite(
+                _crosses(("j", "jj"), ("z", "zz")),
+                inv.phonemic_vowel,
+                inv.phonemic_vowel,
+                sigma_star,
+            ),
+        ),
+        (
+            "devoicing",
+            pynini.cdrewrite(
+                pynini.cross("b", "p"), "", _union("s", "t"), sigma_star
+            ),
+        ),
+    ]
+    return (
+        [("graphemes", inv.grapheme.closure())]
+        + [(name, rule.optimize()) for name, rule in stages]
+        + [("phonemes", inv.phoneme.closure())]
+    )
+
+
+def variable_stages() -> List[Stage]:
+    """Builds the stages of VARIABLE (see variable.grm)."""
+    inv = _inventory()
+    sigma_star = (
+        pynini.union(inv.prosodic_symbol, inv.phoneme).closure().optimize()
+    )
+    glides = pynini.union(
+        pynini.cross(_union("i", "iː"), "j"),
+        pynini.cross(_union("u", "uː"), "w"),
+    )
+    stages = [
+        (
+            "h_deletion",
+            _rewrite(
+                _add_weight(pynini.cross("h", ""), 10),
+                sigma_star,
+                mode="opt",
+            ),
+        ),
+        (
+            "resyllabification",
+            pynini.cdrewrite(
+                _add_weight(pynini.cross("", " "), 100),
+                "",
+                inv.consonant + " " + inv.phonemic_vowel,
+                sigma_star,
+                mode="opt",
+            )
+            @ pynini.cdrewrite(
+                _add_weight(pynini.cross(" ", ""), 100),
+                " " + inv.consonant,
+                inv.phonemic_vowel,
+                sigma_star,
+            ),
+        ),
+        (
+            "elision",
+            pynini.cdrewrite(
+                _add_weight(
+                    pynini.cross(
+                        pynini.union(inv.phonemic_vowel, "oj", "aj", "aw")
+                        + " ",
+                        "",
+                    ),
+                    1000,
+                ),
+                "",
+                inv.phonemic_vowel,
+                sigma_star,
+                mode="opt",
+            ),
+        ),
+        (
+            "synizesis",
+            pynini.cdrewrite(
+                _add_weight(glides, 10000),
+                "",
+                inv.phonemic_vowel,
+                sigma_star,
+                mode="opt",
+            )
+            @ pynini.cdrewrite(
+                _add_weight(glides, 10000),
+                inv.phonemic_vowel,
+                "",
+                sigma_star,
+                mode="opt",
+            ),
+        ),
+        (
+            "diaeresis",
+            pynini.cdrewrite(
+                _add_weight(pynini.cross("w", "u"), 10000),
+                _union("k", "g"),
+                "",
+                sigma_star,
+                mode="opt",
+            )
+            @ pynini.cdrewrite(
+                _add_weight(pynini.cross("jj", "i"), 10000),
+                inv.phonemic_vowel,
+                inv.phonemic_vowel,
+                sigma_star,
+                mode="opt",
+            ),
+        ),
+    ]
+    return [(name, rule.optimize()) for name, rule in stages]
+
+
+def syllable_stages() -> List[Stage]:
+    """Builds the stages of SYLLABLE (see syllable.grm)."""
+    inv = _inventory()
+    sigma_star = (
+        pynini.union(inv.prosodic_symbol, inv.phoneme).closure().optimize()
+    )
+    obstruent = pynini.union(inv.stop, "f")
+    muta_cum_liquida = pynini.difference(
+        obstruent + inv.liquid, _union("tl", "dl")
+    )
+    s_cluster = "s" + pynini.union(
+        pynini.difference(
+            inv.voiceless_stop.ques + inv.liquid.ques, "tl"
+        ).optimize(),
+        pynini.accep("k").ques + pynini.accep("w").ques,
+    )
+    onset = (
+        pynini.cdrewrite(
+            pynini.cross(
+                pynini.union(
+                    "ks",
+                    "mn",
+                    "pt",
+                    "tm",
+                    s_cluster,
+                    "kw",
+                    "gw",
+                    muta_cum_liquida,
+                    inv.consonant,
+                ),
+                "O",
+            ),
+            inv.bow,
+            inv.nucleus,
+            sigma_star,
+        )
+        @ pynini.cdrewrite(
+            pynini.cross("l", "O"), _union("t", "d"), inv.nucleus, sigma_star
+        )
+        @ pynini.cdrewrite(
+            pynini.cross(inv.liquid, _add_weight("O", 1)),
+            obstruent,
+            inv.nucleus,
+            sigma_star,
+            direction="rtl",
+            mode="opt",
+        )
+        @ pynini.cdrewrite(
+            pynini.cross(
+                pynini.union(
+                    muta_cum_liquida, "kw", "gw", "sw", inv.consonant
+                ),
+                "O",
+            ),
+            "",
+            inv.nucleus,
+            sigma_star,
+            direction="rtl",
+        )
+    )
+    stages = [
+        (
+            "long_nucleus",
+            _rewrite(pynini.cross(inv.long_vowel, "-"), sigma_star),
+        ),
+        (
+            "short_nucleus",
+            _rewrite(pynini.cross(inv.short_vowel, "U"), sigma_star),
+        ),
+        ("onset", onset),
+        (
+            "coda",
+            _rewrite(pynini.cross(inv.consonant.plus, "C"), sigma_star),
+        ),
+    ]
+    return [(name, rule.optimize()) for name, rule in stages]
+
+
+# Maps the name of each exported rule onto a function building its stages.
+STAGES: Dict[str, Callable[[], List[Stage]]] = {
+    "PRONOUNCE": pronounce_stages,
+    "VARIABLE": variable_stages,
+    "SYLLABLE": syllable_stages,
+}
+
+
+def compose_stages(stages: List[Stage]) -> pynini.Fst:
+    """Composes stages left to right and optimizes, as Thrax does.
+
+    Args:
+      stages: the stages.
+
+    Returns:
+      The optimized composition.
+    """
+    _, rule = stages[0]
+    rule = rule.copy()
+    for _, stage in stages[1:]:
+        rule = pynini.compose(rule, stage)
+    return rule.optimize()
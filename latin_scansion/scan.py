@@ -1,39 +1,248 @@
-"""Scans a text document, outputting a Document textproto."""
+"""Scans a text document, outputting a Document message."""
 
 import argparse
 import contextlib
+import json
 import logging
 import os.path
+import sys
 
-import pynini
+from typing import Iterable, Optional, TextIO
 
 import latin_scansion
 
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("input", help="path for input text document")
-    parser.add_argument("output", help="path for output textproto document")
+    parser.add_argument(
+        "input", help="path for input text document (or - for stdin)"
+    )
+    parser.add_argument(
+        "output", help="path for output document (or - for stdout)"
+    )
     parser.add_argument("--far", required=True, help="path to grammar FAR")
     parser.add_argument("--name", help="optional name field")
+    parser.add_argument(
+        "--format",
+        choices=latin_scansion.formats.FORMATS,
+        help="output format (default: guessed from the output path)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of parallel scanning processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="maximum number of pronunciations and scansions to memoize "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--word-cache-size",
+        type=int,
+        default=0,
+        help="if positive, pronounce verses word by word, memoizing at most "
+        "this many word pronunciations (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory for a persistent cache of scansions, shared by "
+        "parallel workers and by later runs",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=latin_scansion.disk_cache.DEFAULT_MAX_ENTRIES,
+        help="if positive, the maximum number of scansions in the "
+        "persistent cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--patterns-only",
+        action="store_true",
+        help="output only the pattern of feet (e.g., DSSSDS) of each verse, "
+        "one per line, with an empty line for each defective verse",
+    )
+    parser.add_argument(
+        "--previous",
+        help="path to the output of a previous run with --previous; "
+        "verses whose text, grammar, and options are unchanged are reused "
+        "rather than scanned again (if the path does not exist, every "
+        "verse is scanned)",
+    )
+    parser.add_argument(
+        "--nbest",
+        type=int,
+        default=1,
+        help="if greater than 1, also record up to this many alternative "
+        "scansions of each verse, each with a distinct pattern of feet "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--prune-threshold",
+        type=float,
+        help="prune each lattice to paths whose cost is within this "
+        "threshold of the best path",
+    )
+    parser.add_argument(
+        "--max-states",
+        type=int,
+        default=0,
+        help="if positive, abandon scansion of any verse (marking it "
+        "incomplete) once a lattice has more than this many states "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-arcs",
+        type=int,
+        default=0,
+        help="if positive, abandon scansion of any verse (marking it "
+        "incomplete) once a lattice has more than this many arcs "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--meters",
+        help="comma-separated meters (e.g., hexameter,pentameter) to scan "
+        "each verse in, in order of preference; the name of the best-fitting "
+        "meter is recorded for each verse",
+    )
+    parser.add_argument(
+        "--lookahead",
+        action="store_true",
+        help="restrict the syllable and weight rules, once, to outputs the "
+        "meter accepts, so that smaller lattices are composed (ignored with "
+        "--cascade, unless --meters is set)",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="scan with the pre-composed cascade, which the grammar FAR must "
+        "contain (see latin_build_cascade); the scansions are unchanged "
+        "(ignored if --meters is set)",
+    )
+    parser.add_argument(
+        "--fst-normalize",
+        action="store_true",
+        help="normalize using the grammar rule rather than the equivalent "
+        "(but faster) table-driven normalizer",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="log per-stage timings, lattice sizes, and counters",
+    )
+    parser.add_argument(
+        "--stats-json", help="path for output JSON per-stage statistics"
+    )
     return parser.parse_args()
 
 
+def _write_patterns(patterns: Iterable[Optional[str]], sink: TextIO) -> None:
+    """Writes patterns of feet, one per line, logging summary statistics.
+
+    Args:
+      patterns: an iterable of patterns of feet, or None for defective
+        verses.
+      sink: file object to write to.
+    """
+    scanned_verses = 0
+    defective_verses = 0
+    for pattern in patterns:
+        if pattern is None:
+            defective_verses += 1
+            print(file=sink)
+        else:
+            scanned_verses += 1
+            print(pattern, file=sink)
+    logging.info("%d verses scanned", scanned_verses)
+    logging.info("%d verses defective", defective_verses)
+
+
 def main() -> None:
     logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
     args = _parse_args()
+    if args.previous is not None and args.patterns_only:
+        logging.error("--previous cannot be used with --patterns-only")
+        sys.exit(1)
+    stats = None
+    if args.stats or args.stats_json:
+        if args.jobs > 1:
+            logging.warning("Statistics are not collected with --jobs > 1")
+        else:
+            stats = latin_scansion.ScanStats()
+    limits = None
+    if args.prune_threshold is not None or args.max_states or args.max_arcs:
+        limits = latin_scansion.ScanLimits(
+            args.prune_threshold, args.max_states, args.max_arcs
+        )
+    scanner = latin_scansion.Scanner(
+        args.far,
+        args.cache_size,
+        args.word_cache_size,
+        stats,
+        args.fst_normalize,
+        args.nbest,
+        limits,
+        args.meters.split(",") if args.meters else None,
+        args.cache_dir,
+        args.cache_max_entries,
+        args.lookahead,
+        args.cascade,
+    )
+    if args.name:
+        name = args.name
+    elif args.input != "-":
+        name = os.path.normpath(args.input)
+    else:
+        name = None
     with contextlib.ExitStack() as stack:
-        far = stack.enter_context(pynini.Far(args.far, "r"))
-        source = stack.enter_context(open(args.input, "r"))
-        lines = [line.rstrip() for line in source]
-        document = latin_scansion.scan_document(
-            far["NORMALIZE"],
-            far["PRONOUNCE"],
-            far["VARIABLE"],
-            far["SYLLABLE"],
-            far["WEIGHT"],
-            far["HEXAMETER"],
-            lines,
-            args.name if args.name else os.path.normpath(args.input),
+        source = (
+            sys.stdin
+            if args.input == "-"
+            else stack.enter_context(open(args.input, "r"))
         )
-        latin_scansion.write_document(document, args.output)
+        # Each verse is written as soon as it is scanned.
+        if args.patterns_only:
+            sink = (
+                sys.stdout
+                if args.output == "-"
+                else stack.enter_context(open(args.output, "w"))
+            )
+            _write_patterns(
+                scanner.scan_patterns(source, jobs=args.jobs), sink
+            )
+        else:
+            if args.previous is not None:
+                # The previous verses are all read before the output is
+                # opened, so that it may overwrite the previous output.
+                previous = (
+                    latin_scansion.DocumentReader(args.previous)
+                    if os.path.exists(args.previous)
+                    else []
+                )
+                verses = scanner.rescan_stream(
+                    source, previous, jobs=args.jobs
+                )
+            else:
+                verses = scanner.scan_stream(source, jobs=args.jobs)
+            latin_scansion.stream_document(
+                verses,
+                args.output,
+                name,
+                args.format,
+            )
+    # With multiple jobs, the workers' caches are not visible here.
+    if scanner.cache is not None and args.jobs <= 1:
+        scanner.cache.log_stats()
+    if scanner.disk_cache is not None:
+        if args.jobs <= 1:
+            scanner.disk_cache.log_stats()
+        scanner.disk_cache.close()
+    if stats is not None:
+        if args.stats:
+            stats.log_stats()
+        if args.stats_json:
+            with open(args.stats_json, "w") as sink:
+                json.dump(stats.as_dict(), sink, indent=2)
@@ -0,0 +1,550 @@
+"""Persistent scanner which owns the grammar rules."""
+
+import functools
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import pynini
+
+from . import cascade
+from . import disk_cache as disk_cache_lib
+from . import incremental
+from . import lookahead as lookahead_lib
+from . import meters as meters_lib
+from . import scansion
+from . import scansion_pb2
+from .cache import ScansionCache
+from .limits import ScanLimits
+from .stats import ScanStats
+
+
+# Words per verse allowed for in the temporary word cache used by
+# `Scanner.scan_batch`; hexameter verses rarely have more than a dozen.
+BATCH_WORDS_PER_VERSE = 16
+
+# Names of the rules in the grammar FAR, in cascade order.
+RULES = (
+    "NORMALIZE",
+    "PRONOUNCE",
+    "VARIABLE",
+    "SYLLABLE",
+    "WEIGHT",
+    "HEXAMETER",
+)
+
+
+class Scanner:
+    """Scans verses using the rules from a grammar FAR.
+
+    The FAR is read, and the rules prepared for composition, only once, when
+    the scanner is constructed; the scanner can then be used to scan any
+    number of verses or documents.
+
+    If `use_cascade` is set, the FAR must also contain a pre-composed cascade
+    (as written by `latin_build_cascade`), which is used in place of the
+    variable, syllable, weight and hexameter rules. The cascade may break
+    ties between scansions of equal cost differently, so verses whose best
+    scansions are tied are scanned with those rules instead; the scansions
+    are thus unchanged.
+
+    If `meters` is set, verses are instead scanned in whichever of the named
+    meters (see meters.py) fits best; the shared variable, syllable, and
+    weight lattices are built once per verse, and the pre-composed cascade,
+    which is specific to the hexameter, is not used.
+
+    If `lookahead` is set, the syllable and weight rules are restricted, once,
+    to outputs which the meter rules accept (see lookahead.py), so that the
+    per-verse lattices only contain paths which can still be scanned. This
+    does not apply to the pre-composed cascade, which already does so.
+
+    Verses are normalized by an equivalent table-driven normalizer rather
+    than by the normalization rule, unless `fst_normalize` is set.
+
+    Args:
+      far_path: path to the grammar FAR.
+      cache_size: if positive, the maximum number of pronunciations and
+        scansions to memoize.
+      word_cache_size: if positive, verses are pronounced word by word, and
+        this is the maximum number of word pronunciations to memoize.
+      stats: optional statistics, recorded for all verses scanned in this
+        process (i.e., not by parallel workers).
+      fst_normalize: if set, verses are normalized using the normalization
+        rule, for reference.
+      nbest: if greater than 1, each scanned verse also records up to this
+        many alternative scansions, each with a distinct pattern of feet.
+      limits: optional limits on the size of the lattices; verses whose
+        lattices exceed them are marked incomplete.
+      meters: optional names of meters, in order of preference.
+      cache_dir: if set, scansions are also cached in a database in this
+        directory, which persists across processes and runs (see
+        disk_cache.py).
+      cache_max_entries: if positive, the maximum number of scansions in
+        the disk cache.
+      lookahead: if set, the syllable and weight rules are filtered by the
+        meter rules.
+      use_cascade: if set, the pre-composed cascade is used.
+
+    Raises:
+      ValueError: unknown meter, meter rule missing from the FAR, or
+        pre-composed cascade requested but missing from the FAR.
+    """
+
+    def __init__(
+        self,
+        far_path: str,
+        cache_size: int = 0,
+        word_cache_size: int = 0,
+        stats: Optional[ScanStats] = None,
+        fst_normalize: bool = False,
+        nbest: int = 1,
+        limits: Optional[ScanLimits] = None,
+        meters: Optional[Sequence[str]] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_entries: int = disk_cache_lib.DEFAULT_MAX_ENTRIES,
+        lookahead: bool = False,
+        use_cascade: bool = False,
+    ):
+        self._far_path = far_path
+        with pynini.Far(far_path, "r") as far:
+            # Verses are always the left-hand side of compositions with the
+            # rules, so the rules are input-label-sorted once here rather
+            # than (if needed) copied and sorted at each composition.
+            self._rules = tuple(_sorted(far[rule]) for rule in RULES)
+            self._cascade = None
+            if use_cascade:
+                if not far.find(cascade.CASCADE):
+                    raise ValueError(
+                        f"Grammar FAR has no {cascade.CASCADE} rule"
+                    )
+                self._cascade = _sorted(far[cascade.CASCADE])
+            self._meter_rules = _load_meters(far, meters) if meters else None
+        self._lookahead = lookahead and (
+            self._cascade is None or self._meter_rules is not None
+        )
+        if self._lookahead:
+            self._rules = _filter_rules(self._rules, self._meter_rules)
+        self._cache = (
+            ScansionCache(cache_size, word_cache_size)
+            if cache_size > 0 or word_cache_size > 0
+            else None
+        )
+        self._stats = stats
+        self._fst_normalize = fst_normalize
+        self._nbest = nbest
+        self._limits = limits
+        self._fingerprint: Optional[str] = None
+        self._disk_cache = (
+            disk_cache_lib.DiskCache(cache_dir, cache_max_entries)
+            if cache_dir
+            else None
+        )
+        self._scan_verse = self._bind(self._cache)
+        self._scan_pattern = self._bind(self._cache, pattern=True)
+
+    def _bind(
+        self, cache: Optional[ScansionCache], pattern: bool = False
+    ) -> Callable[..., Any]:
+        """Binds the rules and the given cache to a scanning function.
+
+        Unless only the pattern of feet is computed, the function also
+        consults the disk cache, if any.
+
+        Args:
+          cache: an optional cache.
+          pattern: if set, the function computes only the pattern of feet.
+
+        Returns:
+          The bound function.
+        """
+        function = self._bind_rules(cache, pattern)
+        if pattern or self._disk_cache is None:
+            return function
+        return disk_cache_lib.CachedScan(
+            function, self._disk_cache, self.fingerprint, self._stats
+        )
+
+    def _bind_rules(
+        self, cache: Optional[ScansionCache], pattern: bool = False
+    ) -> Callable[..., Any]:
+        """Binds the rules and the given cache to a scanning function.
+
+        Args:
+          cache: an optional cache.
+          pattern: if set, the function computes only the pattern of feet.
+
+        Returns:
+          The bound function.
+        """
+        normalize_rule, pronounce_rule, *scan_rules = self._rules
+        if not self._fst_normalize:
+            normalize_rule = None
+        options: Dict[str, Any] = {
+            "cache": cache,
+            "stats": self._stats,
+            "limits": self._limits,
+        }
+        if not pattern:
+            options["nbest"] = self._nbest
+        if self._meter_rules is not None:
+            return functools.partial(
+                (
+                    scansion.scan_pattern_meters
+                    if pattern
+                    else scansion.scan_verse_meters
+                ),
+                normalize_rule,
+                pronounce_rule,
+                *scan_rules[:-1],
+                self._meter_rules,
+                **options,
+            )
+        if self._cascade is not None:
+            return functools.partial(
+                (
+                    scansion.scan_pattern_cascade
+                    if pattern
+                    else scansion.scan_verse_cascade
+                ),
+                normalize_rule,
+                pronounce_rule,
+                self._cascade,
+                stepwise_rules=tuple(scan_rules),
+                **options,
+            )
+        return functools.partial(
+            scansion.scan_pattern if pattern else scansion.scan_verse,
+            normalize_rule,
+            pronounce_rule,
+            *scan_rules,
+            **options,
+        )
+
+    @property
+    def rules(self) -> Tuple[pynini.Fst, ...]:
+        """The rules, in the order expected by `scan_verse`."""
+        return self._rules
+
+    @property
+    def cascade(self) -> Optional[pynini.Fst]:
+        """The pre-composed cascade, if used."""
+        return self._cascade
+
+    @property
+    def meters(self) -> Optional[List[str]]:
+        """The names of the meters, if any."""
+        if self._meter_rules is None:
+            return None
+        return [meter.name for meter, _ in self._meter_rules]
+
+    @property
+    def fingerprint(self) -> str:
+        """A fingerprint of the grammar FAR and of the scanning options.
+
+        This is computed when first needed, and is used to key verses for
+        incremental rescanning (see incremental.py).
+        """
+        if self._fingerprint is None:
+            limits = self._limits
+            self._fingerprint = incremental.fingerprint(
+                self._far_path,
+                self._nbest,
+                (
+                    (limits.threshold, limits.max_states, limits.max_arcs)
+                    if limits is not None
+                    else None
+                ),
+                self.meters,
+                # Neither lookahead nor the cascade should change scansions,
+                # but the rules differ, and so verses are rescanned.
+                self._lookahead,
+                self._cascade is not None,
+            )
+        return self._fingerprint
+
+    @property
+    def cache(self) -> Optional[ScansionCache]:
+        """The cache, if any."""
+        return self._cache
+
+    @property
+    def disk_cache(self) -> Optional[disk_cache_lib.DiskCache]:
+        """The disk cache, if any."""
+        return self._disk_cache
+
+    @property
+    def stats(self) -> Optional[ScanStats]:
+        """The statistics, if any."""
+        return self._stats
+
+    def scan(self, text: str, number: int = 0) -> scansion_pb2.Verse:
+        """Scans a single verse.
+
+        Args:
+          text: the input text.
+          number: an optional verse number.
+
+        Returns:
+          A populated Verse message.
+        """
+        return self._scan_verse(text, number)
+
+    def scan_pattern(self, text: str) -> Optional[str]:
+        """Computes the pattern of feet (e.g., "DSSSDS") of a single verse.
+
+        This gives the same feet as `scan`, but skips recovering the
+        syllables and building the message.
+
+        Args:
+          text: the input text.
+
+        Returns:
+          The pattern of feet, or None if the verse is defective.
+        """
+        return self._scan_pattern(text)
+
+    def scan_patterns(
+        self, lines: Iterable[str], jobs: int = 1
+    ) -> Iterator[Optional[str]]:
+        """Lazily computes the patterns of feet of lines of text.
+
+        Trailing whitespace (including newlines) is stripped from each line.
+
+        Args:
+          lines: an iterable of lines to scan.
+          jobs: number of worker processes; each uses its own copy of the
+            cache, if any.
+
+        Returns:
+          An iterator of patterns of feet (or None for defective verses).
+        """
+        verses = (line.rstrip() for line in lines)
+        return scansion.scan_patterns(self._scan_pattern, verses, jobs)
+
+    def scan_batch(
+        self, texts: Iterable[str], start: int = 1
+    ) -> List[scansion_pb2.Verse]:
+        """Scans a batch of verses.
+
+        The results are identical to those of scanning each verse with
+        `scan`, but work is shared across the batch: repeated verses are
+        scanned only once, and unless the scanner has its own cache, verses
+        are pronounced word by word with a temporary word cache, so that
+        each distinct word is rewritten only once.
+
+        Args:
+          texts: the verses to scan.
+          start: the number of the first verse.
+
+        Returns:
+          A list of populated Verse messages.
+        """
+        texts = list(texts)
+        scan = self._scan_verse
+        if self._cache is None:
+            scan = self._bind(
+                ScansionCache(0, len(texts) * BATCH_WORDS_PER_VERSE)
+            )
+        scanned: Dict[str, scansion_pb2.Verse] = {}
+        verses = []
+        for number, text in enumerate(texts, start):
+            verse = scanned.get(text)
+            if verse is None:
+                verse = scan(text, number)
+                scanned[text] = verse
+            else:
+                verse = scansion_pb2.Verse()
+                verse.CopyFrom(scanned[text])
+                verse.number = number
+            verses.append(verse)
+        return verses
+
+    def scan_many(self, verses: Iterable[str]) -> Iterator[scansion_pb2.Verse]:
+        """Lazily scans verses, numbering them from 1.
+
+        Args:
+          verses: an iterable of verses to scan.
+
+        Returns:
+          An iterator of populated Verse messages.
+        """
+        return scansion.scan_verses(self._scan_verse, verses)
+
+    def scan_stream(
+        self, lines: Iterable[str], jobs: int = 1
+    ) -> Iterator[scansion_pb2.Verse]:
+        """Lazily scans lines of text, numbering them from 1.
+
+        Trailing whitespace (including newlines) is stripped from each line,
+        and summary statistics are logged once the input is exhausted. Only a
+        bounded number of lines are held in memory at a time, so this is
+        suitable for unbounded input such as standard input.
+
+        Args:
+          lines: an iterable of lines to scan.
+          jobs: number of worker processes; each uses its own copy of the
+            cache, if any.
+
+        Returns:
+          An iterator of populated Verse messages.
+        """
+        verses = (line.rstrip() for line in lines)
+        return scansion.count_verses(
+            scansion.scan_verses(self._scan_verse, verses, jobs)
+        )
+
+    def scan_numbered(
+        self, numbered: Iterable[Tuple[str, int]], jobs: int = 1
+    ) -> Iterator[scansion_pb2.Verse]:
+        """Lazily scans verses with the given numbers.
+
+        Args:
+          numbered: an iterable of pairs of verses to scan and their
+            numbers.
+          jobs: number of worker processes; each uses its own copy of the
+            cache, if any.
+
+        Returns:
+          An iterator of populated Verse messages, in input order.
+        """
+        return scansion.scan_numbered(self._scan_verse, numbered, jobs)
+
+    def rescan_stream(
+        self,
+        lines: Iterable[str],
+        previous: Iterable[scansion_pb2.Verse],
+        jobs: int = 1,
+    ) -> Iterator[scansion_pb2.Verse]:
+        """Lazily rescans lines of text, reusing previously scanned verses.
+
+        This is equivalent to `scan_stream`, except that each verse records
+        its key, and that lines whose keys match those of previous verses
+        reuse those verses rather than being scanned again (see
+        incremental.py). The numbers of verses reused and rescanned are
+        also logged.
+
+        Args:
+          lines: an iterable of lines to scan.
+          previous: the verses of a previous incremental scan (of this or
+            an earlier version of the text).
+          jobs: number of worker processes used to scan new or changed
+            lines; each uses its own copy of the cache, if any.
+
+        Returns:
+          An iterator of populated Verse messages.
+        """
+        verses = (line.rstrip() for line in lines)
+        return scansion.count_verses(
+            incremental.rescan_verses(
+                self._scan_verse,
+                verses,
+                incremental.index_verses(previous),
+                self.fingerprint,
+                jobs,
+                self._stats,
+            )
+        )
+
+    def scan_document(
+        self,
+        verses: Iterable[str],
+        name: Optional[str] = None,
+        jobs: int = 1,
+    ) -> scansion_pb2.Document:
+        """Scans an entire document.
+
+        Args:
+          verses: an iterable of verses to scan.
+          name: optional metadata about the source.
+          jobs: number of worker processes; each uses its own copy of the
+            cache, if any.
+
+        Returns:
+          A populated Document message.
+        """
+        return scansion.make_document(
+            scansion.scan_verses(self._scan_verse, verses, jobs), name
+        )
+
+
+def _sorted(fst: pynini.Fst) -> pynini.Fst:
+    """Input-label-sorts a rule, unless it is already known to be sorted.
+
+    Args:
+      fst: the rule, which is modified in place.
+
+    Returns:
+      The rule.
+    """
+    # Rules from grammar bundles (see bundle.py) are already sorted.
+    if fst.properties(pynini.I_LABEL_SORTED, True) == pynini.I_LABEL_SORTED:
+        return fst
+    return fst.arcsort("ilabel")
+
+
+def _filter_rules(
+    rules: Tuple[pynini.Fst, ...],
+    meter_rules: Optional[List[Tuple[meters_lib.Meter, pynini.Fst]]],
+) -> Tuple[pynini.Fst, ...]:
+    """Filters the syllable and weight rules by the meter rules.
+
+    Args:
+      rules: the rules, in `RULES` order.
+      meter_rules: optional pairs of meters and their rules; if unset, the
+        hexameter rule is used.
+
+    Returns:
+      The rules, with the syllable and weight rules filtered.
+    """
+    normalize, pronounce, variable, syllable, weight, hexameter = rules
+    syllable, weight = lookahead_lib.filter_rules(
+        syllable,
+        weight,
+        (
+            [rule for _, rule in meter_rules]
+            if meter_rules is not None
+            else [hexameter]
+        ),
+    )
+    return (
+        normalize,
+        pronounce,
+        variable,
+        _sorted(syllable),
+        _sorted(weight),
+        hexameter,
+    )
+
+
+def _load_meters(
+    far: pynini.Far, names: Sequence[str]
+) -> List[Tuple[meters_lib.Meter, pynini.Fst]]:
+    """Reads the rules of the named meters from a grammar FAR.
+
+    Args:
+      far: the grammar FAR.
+      names: the names of the meters.
+
+    Returns:
+      Pairs of meters and their (input-label-sorted) rules.
+
+    Raises:
+      ValueError: unknown meter, or meter rule missing from the FAR.
+    """
+    meter_rules = []
+    for meter in meters_lib.lookup(names):
+        if not far.find(meter.rule):
+            raise ValueError(
+                f"Grammar FAR has no {meter.rule} rule; rebuild grammars"
+            )
+        meter_rules.append((meter, _sorted(far[meter.rule])))
+    return meter_rules
@@ -1,171 +1,1633 @@
 """Scansion engine."""
 
 import functools
+import itertools
 import logging
+import multiprocessing
 
-from typing import Iterable, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import pynini
 from pynini.lib import rewrite
 
+from . import alignment
+from . import cascade
+from . import meters
+from . import normalize
+from . import prefilter
 from . import scansion_pb2
+from .cache import LRUCache, ScansionCache
+from .limits import LatticeLimitError, ScanLimits
+from .stats import ScanStats, stage_timer
 
 
-def _chunk(fst: pynini.Fst) -> List[Tuple[str, str]]:
-    """Chunks a string transducer into tuples.
+# Number of verses sent to a worker process at a time when scanning in
+# parallel.
+CHUNKSIZE = 64
 
-    This function is given a string transducer of the form:
+# Number of chunks per worker process submitted at a time when scanning in
+# parallel.
+WINDOW = 4
 
-        il1 il2 il3 il4 il5 il6
-        ol1 eps eps ol2 eps ol3
+# Per-process function used by parallel workers; see `_init_worker`.
+_worker_function: Optional[Callable[..., Any]] = None
 
-    And returns the list:
 
-        [(il1 il2 il3, ol1), (il4 il5, ol2), (il6, ol3)]
+def pronounce_words(
+    pronounce_rule: pynini.Fst, norm: str, words: LRUCache[str, str]
+) -> str:
+    """Pronounces a normalized verse word by word.
 
-    It thus recovers the "many-to-one" alignment.
+    Every context in the pronunciation rule is bounded by the beginning or end
+    of the word (see `BOW` and `EOW` in grammars/inventory.grm), so no rule
+    applies across a space; thus pronouncing each space-delimited word
+    separately gives the same result as rewriting the whole line, but repeated
+    words can be looked up rather than composed. Should any word fail to
+    rewrite on its own, this falls back to rewriting the whole line.
 
     Args:
-      fst: a string transducer containing the alignment.
+      pronounce_rule: the pronunciation rule.
+      norm: the normalized verse.
+      words: the cache of word pronunciations.
+
+    Returns:
+      The pronunciation of the verse.
+
+    Raises:
+      rewrite.Error: the verse could not be pronounced.
+    """
+    prons = []
+    for word in norm.split(" "):
+        pron = words.get(word)
+        if pron is None:
+            try:
+                pron = rewrite.top_rewrite(word, pronounce_rule)
+            except rewrite.Error:
+                return rewrite.top_rewrite(norm, pronounce_rule)
+            words.put(word, pron)
+        prons.append(pron)
+    return " ".join(prons)
+
+
+def _pronounce(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    verse: scansion_pb2.Verse,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+) -> bool:
+    """Populates the normalization and pronunciation of a verse.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      verse: the Verse message, with its text field populated.
+      cache: an optional cache; if it has a word cache, the verse is
+        pronounced word by word.
+      stats: optional statistics.
+
+    Returns:
+      Whether both rewrites succeeded.
+    """
+    # A cache with only words (e.g., that of `Scanner.scan_batch`) is neither
+    # consulted nor counted here.
+    pronunciations = (
+        cache.pronunciations
+        if cache is not None and cache.pronunciations.maxsize > 0
+        else None
+    )
+    if pronunciations is not None:
+        cached = pronunciations.get(verse.text)
+        if stats is not None:
+            stats.count(
+                "pronunciation_cache_hits"
+                if cached is not None
+                else "pronunciation_cache_misses"
+            )
+        if cached is not None:
+            verse.norm, verse.raw_pron = cached
+            return True
+    try:
+        with stage_timer(stats, "normalize"):
+            if normalize_rule is None:
+                verse.norm = normalize.normalize(verse.text)
+            else:
+                verse.norm = rewrite.top_rewrite(
+                    # We need escapes since Pharr uses [ and ].
+                    pynini.escape(verse.text),
+                    normalize_rule,
+                )
+    except rewrite.Error:
+        logging.error("Rewrite failure (verse %d)", verse.number)
+        if stats is not None:
+            stats.count("rewrite_failures")
+        return False
+    try:
+        with stage_timer(stats, "pronounce"):
+            if cache is not None and cache.words is not None:
+                verse.raw_pron = pronounce_words(
+                    pronounce_rule, verse.norm, cache.words
+                )
+            else:
+                verse.raw_pron = rewrite.top_rewrite(
+                    verse.norm, pronounce_rule
+                )
+    except rewrite.Error:
+        logging.error("Rewrite failure (verse %d)", verse.number)
+        if stats is not None:
+            stats.count("rewrite_failures")
+        return False
+    if pronunciations is not None:
+        pronunciations.put(verse.text, (verse.norm, verse.raw_pron))
+    return True
+
+
+# The range of syllable counts of a hexameter.
+_HEXAMETER_SYLLABLES = (prefilter.MIN_SYLLABLES, prefilter.MAX_SYLLABLES)
+
+
+def _may_scan(
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    syllables: Tuple[int, int] = _HEXAMETER_SYLLABLES,
+) -> bool:
+    """Checks whether a pronunciation could be scanned.
+
+    Args:
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      syllables: the minimum and maximum number of syllables in a line.
+
+    Returns:
+      False if the verse is certainly defective (see prefilter.py).
+    """
+    with stage_timer(stats, "prefilter"):
+        result = prefilter.may_scan(raw_pron, *syllables)
+    if not result and stats is not None:
+        stats.count("prefiltered_verses")
+    return result
+
+
+def _scan(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    scan_pron: Callable[[scansion_pb2.Verse, Optional[ScanStats]], None],
+    text: str,
+    number: int,
+    cache: Optional[ScansionCache],
+    stats: Optional[ScanStats],
+    syllables: Tuple[int, int] = _HEXAMETER_SYLLABLES,
+) -> scansion_pb2.Verse:
+    """Scans a single verse, consulting the cache if any.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      scan_pron: a function which populates the scansion of a verse given
+        its pronunciation, recording optional statistics.
+      text: the input text.
+      number: the verse number.
+      cache: an optional cache.
+      stats: optional statistics.
+      syllables: the minimum and maximum number of syllables in a line,
+        for the prefilter.
+
+    Returns:
+      A populated Verse message.
+    """
+    if stats is not None:
+        stats.count("verses")
+    with stage_timer(stats, "verse"):
+        verse = scansion_pb2.Verse(number=number, text=text)
+        if not _pronounce(normalize_rule, pronounce_rule, verse, cache, stats):
+            return verse
+        scansions = (
+            cache.scansions
+            if cache is not None and cache.scansions.maxsize > 0
+            else None
+        )
+        cached = (
+            scansions.get(verse.raw_pron) if scansions is not None else None
+        )
+        if scansions is not None and stats is not None:
+            stats.count(
+                "scansion_cache_hits"
+                if cached is not None
+                else "scansion_cache_misses"
+            )
+        if cached is not None:
+            verse.MergeFrom(cached)
+        else:
+            if not _may_scan(verse.raw_pron, stats, syllables):
+                verse.defective = True
+            else:
+                try:
+                    scan_pron(verse, stats)
+                except LatticeLimitError:
+                    verse.incomplete = True
+            if scansions is not None:
+                # Only the fields derived from the pronunciation are cached.
+                cached = scansion_pb2.Verse()
+                cached.CopyFrom(verse)
+                for field in ("number", "text", "norm", "raw_pron"):
+                    cached.ClearField(field)
+                scansions.put(verse.raw_pron, cached)
+        if verse.defective:
+            logging.warning(
+                "Defective verse (verse %d): %r", verse.number, verse.norm
+            )
+            if stats is not None:
+                stats.count("defective_verses")
+        elif verse.incomplete:
+            logging.warning(
+                "Incomplete verse (verse %d): %r", verse.number, verse.norm
+            )
+            if stats is not None:
+                stats.count("incomplete_verses")
+        return verse
+
+
+def scan_verse(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    text: str,
+    number: int = 0,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
+) -> scansion_pb2.Verse:
+    """Scans a single verse of poetry.
+
+    If `nbest` is greater than 1, the `scansion` field is also populated
+    with up to `nbest` alternative scansions, each with a distinct pattern
+    of feet, in order of increasing cost. All of these are extracted from
+    the same lattices as the best scansion.
+
+    If a lattice exceeds the size limits, scansion is abandoned and the
+    verse is marked incomplete.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      text: the input text.
+      number: an optional verse number (defaulting to -1).
+      cache: an optional cache of pronunciations and scansions.
+      stats: optional statistics.
+      nbest: the maximum number of alternative scansions to record.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      A populated Verse message.
+    """
+    scan_pron = functools.partial(
+        _scan_stepwise,
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        nbest=nbest,
+        limits=limits,
+    )
+    return _scan(
+        normalize_rule, pronounce_rule, scan_pron, text, number, cache, stats
+    )
+
+
+def _scan_stepwise(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    verse: scansion_pb2.Verse,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
+) -> None:
+    """Populates the scansion of a verse given its pronunciation.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      verse: the Verse message, with its raw_pron field populated.
+      stats: optional statistics.
+      nbest: the maximum number of alternative scansions to record.
+      limits: optional limits on the size of the lattices.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    syllable, weight, foot = _lattices(
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        verse.raw_pron,
+        stats,
+        limits,
+    )
+    if foot.start() == pynini.NO_STATE_ID:
+        verse.defective = True
+        return
+    aligned = _align_lattices(syllable, weight, foot, stats)
+    # Writes structure to message.
+    with stage_timer(stats, "proto"):
+        aligned.populate(verse)
+    if nbest > 1:
+        _populate_scansions(
+            verse,
+            _nbest_lattices(syllable, weight, foot, nbest, stats),
+            stats,
+        )
+
+
+def _lattices(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Tuple[pynini.Fst, pynini.Fst, pynini.Fst]:
+    """Composes a pronunciation with the rules, one after another.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices, which are
+        checked after each composition.
+
+    Returns:
+      A tuple of the syllable, weight, and foot lattices; the last has no
+      states if the verse is defective.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    syllable, weight = _prefix_lattices(
+        variable_rule, syllable_rule, weight_rule, raw_pron, stats, limits
+    )
+    foot = _meter_lattice("hexameter", hexameter_rule, weight, stats, limits)
+    return syllable, weight, foot
+
+
+def _prefix_lattices(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Tuple[pynini.Fst, pynini.Fst]:
+    """Composes a pronunciation with the rules shared by all meters.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      A tuple of the syllable and weight lattices.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    with stage_timer(stats, "variable"):
+        var = raw_pron @ variable_rule
+    var = _check_lattice("variable", var, stats, limits)
+    with stage_timer(stats, "syllable"):
+        syllable = pynini.project(var, "output") @ syllable_rule
+    syllable = _check_lattice("syllable", syllable, stats, limits)
+    with stage_timer(stats, "weight"):
+        weight = pynini.project(syllable, "output") @ weight_rule
+    weight = _check_lattice("weight", weight, stats, limits)
+    return syllable, weight
+
+
+def _meter_lattice(
+    stage: str,
+    meter_rule: pynini.Fst,
+    weight: pynini.Fst,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> pynini.Fst:
+    """Composes the weight lattice with a meter's rule.
+
+    Args:
+      stage: the name of the stage (i.e., of the meter).
+      meter_rule: the meter's rule.
+      weight: the weight lattice.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      The foot lattice; it has no states if the verse is not a line of the
+      meter.
+
+    Raises:
+      LatticeLimitError: the lattice exceeded the limits.
+    """
+    with stage_timer(stats, stage):
+        foot = pynini.project(weight, "output") @ meter_rule
+    return _check_lattice(stage, foot, stats, limits)
+
+
+def _check_lattice(
+    stage: str,
+    fst: pynini.Fst,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> pynini.Fst:
+    """Records the size of a lattice, then applies the limits, if any.
+
+    Args:
+      stage: the name of the stage which produced the lattice.
+      fst: the lattice.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattice.
+
+    Returns:
+      The (possibly pruned) lattice.
+
+    Raises:
+      LatticeLimitError: the lattice exceeded the limits.
+    """
+    if stats is not None:
+        stats.record_lattice(stage, fst)
+    if limits is None:
+        return fst
+    try:
+        return limits.apply(fst, stage)
+    except LatticeLimitError:
+        if stats is not None:
+            stats.count(f"{stage}_limit_exceeded")
+        raise
+
+
+def align_stepwise(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[alignment.Alignment]:
+    """Aligns a pronunciation to its scansion.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      The alignment, or None if the verse is defective.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    syllable, weight, foot = _lattices(
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        raw_pron,
+        stats,
+        limits,
+    )
+    if foot.start() == pynini.NO_STATE_ID:
+        return None
+    return _align_lattices(syllable, weight, foot, stats)
+
+
+def _align_lattices(
+    syllable: pynini.Fst,
+    weight: pynini.Fst,
+    foot: pynini.Fst,
+    stats: Optional[ScanStats] = None,
+) -> alignment.Alignment:
+    """Aligns the best path through the foot lattice to its scansion.
+
+    Args:
+      syllable: the syllable lattice.
+      weight: the weight lattice.
+      foot: the (non-empty) foot lattice.
+      stats: optional statistics.
+
+    Returns:
+      The alignment.
+    """
+    # Works backwards to obtain intermediate structure.
+    with stage_timer(stats, "shortestpath"):
+        foot = pynini.arcmap(pynini.shortestpath(foot), map_type="rmweight")
+        weight = pynini.shortestpath(weight @ pynini.project(foot, "input"))
+        syllable = pynini.shortestpath(
+            syllable @ pynini.project(weight, "input")
+        )
+    with stage_timer(stats, "align"):
+        return alignment.from_paths(foot, weight, syllable)
+
+
+def nbest_stepwise(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    raw_pron: str,
+    nbest: int,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> List[Tuple[alignment.Alignment, float]]:
+    """Aligns a pronunciation to its n best scansions.
+
+    Args:
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      raw_pron: the pronunciation.
+      nbest: the maximum number of scansions.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      A list of (alignment, cost) pairs, each with a distinct pattern of
+      feet, in order of increasing cost; this is empty if the verse is
+      defective.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    syllable, weight, foot = _lattices(
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        raw_pron,
+        stats,
+        limits,
+    )
+    if foot.start() == pynini.NO_STATE_ID:
+        return []
+    return _nbest_lattices(syllable, weight, foot, nbest, stats)
+
+
+def _nbest_lattices(
+    syllable: pynini.Fst,
+    weight: pynini.Fst,
+    foot: pynini.Fst,
+    nbest: int,
+    stats: Optional[ScanStats] = None,
+) -> List[Tuple[alignment.Alignment, float]]:
+    """Aligns the n best patterns of feet in the foot lattice.
+
+    Args:
+      syllable: the syllable lattice.
+      weight: the weight lattice.
+      foot: the (non-empty) foot lattice.
+      nbest: the maximum number of scansions.
+      stats: optional statistics.
+
+    Returns:
+      A list of (alignment, cost) pairs, in order of increasing cost.
+    """
+    with stage_timer(stats, "nbest"):
+        patterns = _nbest_paths(pynini.project(foot, "output"), nbest)
+    results = []
+    for labels, cost in patterns:
+        # Restricts the foot lattice to the pattern, then proceeds as for the
+        # best path.
+        pattern = pynini.accep(bytes(labels).decode("ascii"))
+        aligned = _align_lattices(syllable, weight, foot @ pattern, stats)
+        results.append((aligned, cost))
+    return results
+
+
+def _nbest_paths(key: pynini.Fst, nbest: int) -> List[Tuple[List[int], float]]:
+    """Finds the n best distinct strings of an acceptor.
+
+    Args:
+      key: the acceptor; this is modified in place.
+      nbest: the maximum number of strings.
+
+    Returns:
+      A list of (labels, cost) pairs, in order of increasing cost.
+    """
+    # Epsilons must be removed so that paths which differ only in the
+    # placement of epsilons are not considered distinct.
+    key.rmepsilon()
+    paths = pynini.shortestpath(key, nshortest=nbest, unique=True).paths()
+    results = []
+    while not paths.done():
+        labels = [label for label in paths.olabels() if label]
+        results.append((labels, float(paths.weight())))
+        paths.next()
+    results.sort(key=lambda result: result[1])
+    return results
+
+
+def _populate_scansions(
+    verse: scansion_pb2.Verse,
+    alternatives: List[Tuple[alignment.Alignment, float]],
+    stats: Optional[ScanStats] = None,
+) -> None:
+    """Populates the alternative scansions of a verse.
+
+    Args:
+      verse: the Verse message, with its best scansion populated.
+      alternatives: a list of (alignment, cost) pairs, in order of
+        increasing cost.
+      stats: optional statistics.
+    """
+    pattern = "".join(chr(foot.type) for foot in verse.foot)
+    # Among scansions of equal cost, the best scansion comes first.
+    alternatives = sorted(
+        alternatives,
+        key=lambda alternative: (
+            alternative[1],
+            alternative[0].pattern != pattern,
+        ),
+    )
+    with stage_timer(stats, "proto"):
+        for aligned, cost in alternatives:
+            aligned.populate(verse.scansion.add(cost=cost))
+    if stats is not None and len(alternatives) > 1:
+        stats.count("ambiguous_verses")
+
+
+def scan_verse_cascade(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    cascade_rule: pynini.Fst,
+    text: str,
+    number: int = 0,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> scansion_pb2.Verse:
+    """Scans a single verse of poetry using the pre-composed cascade.
+
+    This is equivalent to `scan_verse`, except that the variable, syllable,
+    weight, and hexameter rules are replaced by a single pre-composed cascade
+    (see `cascade.build_cascade`), so that a single composition and shortest
+    path recover the full structure of the verse. Limits on the size of
+    the lattice can only be checked once that composition is complete.
+
+    Both assign each path the same cost, but may break ties between paths
+    of equal cost differently. If `stepwise_rules` are given, verses whose
+    best paths are tied (see `_check_ties`) are instead scanned stepwise,
+    so that the result is always that of `scan_verse`.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      cascade_rule: the pre-composed cascade.
+      text: the input text.
+      number: an optional verse number.
+      cache: an optional cache of pronunciations and scansions.
+      stats: optional statistics.
+      nbest: the maximum number of alternative scansions to record.
+      limits: optional limits on the size of the lattice.
+      stepwise_rules: optional variable, syllable, weight, and hexameter
+        rules, with which tied verses are scanned.
+
+    Returns:
+      A populated Verse message.
+    """
+    scan_pron = functools.partial(
+        _scan_cascade,
+        cascade_rule,
+        nbest=nbest,
+        limits=limits,
+        stepwise_rules=stepwise_rules,
+    )
+    return _scan(
+        normalize_rule, pronounce_rule, scan_pron, text, number, cache, stats
+    )
+
+
+def _scan_cascade(
+    cascade_rule: pynini.Fst,
+    verse: scansion_pb2.Verse,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> None:
+    """Populates the scansion of a verse using the pre-composed cascade.
+
+    Args:
+      cascade_rule: the pre-composed cascade.
+      verse: the Verse message, with its raw_pron field populated.
+      stats: optional statistics.
+      nbest: the maximum number of alternative scansions to record.
+      limits: optional limits on the size of the lattice.
+      stepwise_rules: optional variable, syllable, weight, and hexameter
+        rules, with which tied verses are scanned.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    tape = _tape_lattice(cascade_rule, verse.raw_pron, stats, limits)
+    if tape.start() == pynini.NO_STATE_ID:
+        verse.defective = True
+        return
+    strict = stepwise_rules is not None
+    try:
+        aligned = _align_tape(tape, stats, strict)
+        alternatives = (
+            _nbest_tape(tape, nbest, stats, strict) if nbest > 1 else []
+        )
+    except _TieError:
+        _count_tie(stats)
+        _scan_stepwise(
+            *stepwise_rules, verse, stats, nbest=nbest, limits=limits
+        )
+        return
+    with stage_timer(stats, "proto"):
+        aligned.populate(verse)
+    if nbest > 1:
+        _populate_scansions(verse, alternatives, stats)
+
+
+def align_cascade(
+    cascade_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> Optional[alignment.Alignment]:
+    """Aligns a pronunciation to its scansion using the pre-composed cascade.
+
+    Args:
+      cascade_rule: the pre-composed cascade.
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattice.
+      stepwise_rules: optional variable, syllable, weight, and hexameter
+        rules, with which tied verses are aligned (see
+        `scan_verse_cascade`).
+
+    Returns:
+      The alignment, or None if the verse is defective.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    tape = _tape_lattice(cascade_rule, raw_pron, stats, limits)
+    if tape.start() == pynini.NO_STATE_ID:
+        return None
+    try:
+        return _align_tape(tape, stats, stepwise_rules is not None)
+    except _TieError:
+        _count_tie(stats)
+        return align_stepwise(*stepwise_rules, raw_pron, stats, limits)
+
+
+def _tape_lattice(
+    cascade_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> pynini.Fst:
+    """Composes a pronunciation with the pre-composed cascade.
+
+    Args:
+      cascade_rule: the pre-composed cascade.
+      raw_pron: the pronunciation.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattice.
+
+    Returns:
+      The lattice of tapes, as an acceptor; it has no states if the verse is
+      defective.
+
+    Raises:
+      LatticeLimitError: the lattice exceeded the limits.
+    """
+    with stage_timer(stats, "cascade"):
+        lattice = pynini.project(raw_pron @ cascade_rule, "output")
+    return _check_lattice("cascade", lattice, stats, limits)
+
+
+def _align_tape(
+    tape: pynini.Fst, stats: Optional[ScanStats] = None, strict: bool = False
+) -> alignment.Alignment:
+    """Aligns the best tape in a (non-empty) lattice of tapes.
+
+    Args:
+      tape: the lattice of tapes.
+      stats: optional statistics.
+      strict: if set, the best tape must not be tied with another.
+
+    Returns:
+      The alignment.
+
+    Raises:
+      _TieError: the best tape is tied.
+    """
+    with stage_timer(stats, "shortestpath"):
+        tape = _best_tape(tape, strict)
+    with stage_timer(stats, "align"):
+        return alignment.from_tape(tape)
+
+
+# Costs closer than this, relative to the lower, are considered tied. Path
+# costs are summed in single precision, and the cascade and the stepwise
+# rules sum them in different orders, so that costs which are equal in
+# stepwise scanning may differ by a unit in the last place in the cascade
+# (and vice versa). This is two such units (i.e., 2 ** -23 each).
+TIE_TOLERANCE = 2**-22
+
+
+class _TieError(Exception):
+    """The best paths through a lattice are tied."""
+
+
+def _check_ties(costs: List[float]) -> None:
+    """Checks that sorted costs are not tied.
+
+    Args:
+      costs: the costs, in increasing order.
+
+    Raises:
+      _TieError: two of the costs are tied.
+    """
+    for cost, other in zip(costs, costs[1:]):
+        if other - cost <= abs(cost) * TIE_TOLERANCE:
+            raise _TieError
+
+
+def _count_tie(stats: Optional[ScanStats]) -> None:
+    if stats is not None:
+        stats.count("cascade_ties")
+
+
+def _best_tape(tape: pynini.Fst, strict: bool = False) -> pynini.Fst:
+    """Finds the best tape in a (non-empty) lattice of tapes.
+
+    Args:
+      tape: the lattice of tapes.
+      strict: if set, the best tape must not be tied with the next best.
 
     Returns:
-      A list of string, char tuples.
+      The best tape.
+
+    Raises:
+      _TieError: the best tape is tied.
     """
-    # Input epsilon-normalization and removal forces a sensible alignment.
-    fst = pynini.epsnormalize(fst).rmepsilon()
-    assert (
-        fst.properties(pynini.STRING, True) == pynini.STRING
-    ), "FST is not a string automaton"
-    alignment: List[Tuple[str, str]] = []
-    state = 0
-    arc = fst.arcs(state).value()
-    assert arc.ilabel, f"Input label leaving state {state} contains epsilon"
-    ilabels = bytearray([arc.ilabel])
-    assert arc.olabel, f"Output label leaving state {state} contains epsilon"
-    olabel = arc.olabel
-    for state in range(1, fst.num_states() - 1):
-        arc = fst.arcs(state).value()
-        assert (
-            arc.ilabel
-        ), f"Input label leaving state {state} contains epsilon"
-        # A non-epsilon olabel signals a new chunk.
-        if arc.olabel:
-            alignment.append((ilabels.decode("utf8"), chr(olabel)))
-            ilabels.clear()
-            olabel = arc.olabel
-        ilabels.append(arc.ilabel)
-    assert (
-        ilabels
-    ), f"Input label leaving penultimate state {state}  contains epsilon"
-    alignment.append((ilabels.decode("utf8"), chr(olabel)))
-    return alignment
+    if not strict:
+        return pynini.shortestpath(tape)
+    best = pynini.shortestpath(tape, nshortest=2, unique=True)
+    paths = best.paths()
+    costs = []
+    while not paths.done():
+        costs.append(float(paths.weight()))
+        paths.next()
+    _check_ties(sorted(costs))
+    return pynini.shortestpath(best)
 
 
-def scan_verse(
-    normalize_rule: pynini.Fst,
+def nbest_cascade(
+    cascade_rule: pynini.Fst,
+    raw_pron: str,
+    nbest: int,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> List[Tuple[alignment.Alignment, float]]:
+    """Aligns a pronunciation to its n best scansions using the cascade.
+
+    Args:
+      cascade_rule: the pre-composed cascade.
+      raw_pron: the pronunciation.
+      nbest: the maximum number of scansions.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattice.
+      stepwise_rules: optional variable, syllable, weight, and hexameter
+        rules, with which tied verses are aligned (see
+        `scan_verse_cascade`).
+
+    Returns:
+      A list of (alignment, cost) pairs, each with a distinct pattern of
+      feet, in order of increasing cost; this is empty if the verse is
+      defective.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    tape = _tape_lattice(cascade_rule, raw_pron, stats, limits)
+    if tape.start() == pynini.NO_STATE_ID:
+        return []
+    try:
+        return _nbest_tape(tape, nbest, stats, stepwise_rules is not None)
+    except _TieError:
+        _count_tie(stats)
+        return nbest_stepwise(*stepwise_rules, raw_pron, nbest, stats, limits)
+
+
+# Relabels everything but the foot codes on the tape to epsilon.
+_NON_FOOT_LABELS = [(label, 0) for label in range(1, cascade.FOOT_OFFSET)]
+
+
+def _nbest_tape(
+    tape: pynini.Fst,
+    nbest: int,
+    stats: Optional[ScanStats] = None,
+    strict: bool = False,
+) -> List[Tuple[alignment.Alignment, float]]:
+    """Aligns the n best patterns of feet in a (non-empty) lattice of tapes.
+
+    Args:
+      tape: the lattice of tapes.
+      nbest: the maximum number of scansions.
+      stats: optional statistics.
+      strict: if set, neither the n best patterns, nor the best tapes with
+        each, may be tied.
+
+    Returns:
+      A list of (alignment, cost) pairs, in order of increasing cost.
+
+    Raises:
+      _TieError: a pattern or tape is tied.
+    """
+    # Maps each tape onto its foot codes.
+    feet = pynini.relabel_pairs(tape, opairs=_NON_FOOT_LABELS).arcsort(
+        "olabel"
+    )
+    with stage_timer(stats, "nbest"):
+        # If strict, one more pattern is found, to check for a tie with the
+        # last.
+        patterns = _nbest_paths(
+            pynini.project(feet, "output"), nbest + 1 if strict else nbest
+        )
+    if strict:
+        _check_ties([cost for _, cost in patterns])
+        patterns = patterns[:nbest]
+    results = []
+    for labels, cost in patterns:
+        # Restricts the lattice to tapes with the pattern, then proceeds as
+        # for the best tape.
+        restricted = pynini.project(feet @ _string(labels), "input")
+        results.append((_align_tape(restricted, stats, strict), cost))
+    return results
+
+
+def _string(labels: List[int]) -> pynini.Fst:
+    """Builds an acceptor of a single string of labels."""
+    fst = pynini.Fst()
+    fst.add_states(len(labels) + 1)
+    fst.set_start(0)
+    fst.set_final(len(labels))
+    one = pynini.Weight.one(fst.weight_type())
+    for state, label in enumerate(labels):
+        fst.add_arc(state, pynini.Arc(label, label, one, state + 1))
+    return fst
+
+
+def _pattern(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    pattern_pron: Callable[[str, Optional[ScanStats]], Optional[str]],
+    text: str,
+    cache: Optional[ScansionCache],
+    stats: Optional[ScanStats],
+    syllables: Tuple[int, int] = _HEXAMETER_SYLLABLES,
+) -> Optional[str]:
+    """Computes the pattern of feet of a single verse.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      pattern_pron: a function which computes the pattern of feet of a
+        verse given its pronunciation, recording optional statistics.
+      text: the input text.
+      cache: an optional cache; only pronunciations are cached.
+      stats: optional statistics.
+      syllables: the minimum and maximum number of syllables in a line,
+        for the prefilter.
+
+    Returns:
+      The pattern of feet, or None if the verse could not be pronounced, is
+      defective, or is incomplete.
+    """
+    if stats is not None:
+        stats.count("verses")
+    with stage_timer(stats, "verse"):
+        verse = scansion_pb2.Verse(text=text)
+        if not _pronounce(normalize_rule, pronounce_rule, verse, cache, stats):
+            return None
+        if not _may_scan(verse.raw_pron, stats, syllables):
+            pattern = None
+        else:
+            try:
+                pattern = pattern_pron(verse.raw_pron, stats)
+            except LatticeLimitError:
+                if stats is not None:
+                    stats.count("incomplete_verses")
+                return None
+    if pattern is None and stats is not None:
+        stats.count("defective_verses")
+    return pattern
+
+
+def _foot_codes(path: pynini.Fst, offset: int = 0) -> str:
+    """Reads the foot codes off the output labels of a path.
+
+    Args:
+      path: the path.
+      offset: the offset of foot codes among the output labels; epsilons
+        and labels below it are ignored.
+
+    Returns:
+      The foot codes, as a string.
+    """
+    return bytes(
+        label - offset
+        for label in path.paths().olabels()
+        if label and label >= offset
+    ).decode("ascii")
+
+
+def scan_pattern(
+    normalize_rule: Optional[pynini.Fst],
     pronounce_rule: pynini.Fst,
     variable_rule: pynini.Fst,
     syllable_rule: pynini.Fst,
     weight_rule: pynini.Fst,
     hexameter_rule: pynini.Fst,
     text: str,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[str]:
+    """Computes the pattern of feet (e.g., "DSSSDS") of a single verse.
+
+    The pattern is identical to the foot types `scan_verse` would give, but
+    since only the best path through the foot lattice is needed, the
+    intermediate structure is never recovered.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
+      text: the input text.
+      cache: an optional cache; only pronunciations are cached.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      The pattern of feet, or None if the verse could not be pronounced, is
+      defective, or is incomplete.
+    """
+    pattern_pron = functools.partial(
+        _pattern_stepwise,
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        limits=limits,
+    )
+    return _pattern(
+        normalize_rule, pronounce_rule, pattern_pron, text, cache, stats
+    )
+
+
+def _pattern_stepwise(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    hexameter_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[str]:
+    *_, foot = _lattices(
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        hexameter_rule,
+        raw_pron,
+        stats,
+        limits,
+    )
+    if foot.start() == pynini.NO_STATE_ID:
+        return None
+    with stage_timer(stats, "shortestpath"):
+        foot = pynini.shortestpath(foot)
+    return _foot_codes(foot)
+
+
+def scan_pattern_cascade(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    cascade_rule: pynini.Fst,
+    text: str,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> Optional[str]:
+    """Computes the pattern of feet of a single verse using the cascade.
+
+    This is equivalent to `scan_pattern`, except that the variable,
+    syllable, weight, and hexameter rules are replaced by the pre-composed
+    cascade; the pattern is read off the foot codes on the tape. As with
+    `scan_verse_cascade`, tied verses are scanned with `stepwise_rules`, if
+    given.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      cascade_rule: the pre-composed cascade.
+      text: the input text.
+      cache: an optional cache; only pronunciations are cached.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattice.
+      stepwise_rules: optional variable, syllable, weight, and hexameter
+        rules, with which tied verses are scanned.
+
+    Returns:
+      The pattern of feet, or None if the verse could not be pronounced, is
+      defective, or is incomplete.
+    """
+    pattern_pron = functools.partial(
+        _pattern_cascade,
+        cascade_rule,
+        limits=limits,
+        stepwise_rules=stepwise_rules,
+    )
+    return _pattern(
+        normalize_rule, pronounce_rule, pattern_pron, text, cache, stats
+    )
+
+
+def _pattern_cascade(
+    cascade_rule: pynini.Fst,
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+    stepwise_rules: Optional[Sequence[pynini.Fst]] = None,
+) -> Optional[str]:
+    lattice = _tape_lattice(cascade_rule, raw_pron, stats, limits)
+    if lattice.start() == pynini.NO_STATE_ID:
+        return None
+    try:
+        with stage_timer(stats, "shortestpath"):
+            tape = _best_tape(lattice, stepwise_rules is not None)
+    except _TieError:
+        _count_tie(stats)
+        return _pattern_stepwise(*stepwise_rules, raw_pron, stats, limits)
+    return _foot_codes(tape, cascade.FOOT_OFFSET)
+
+
+def _syllable_range(
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]]
+) -> Tuple[int, int]:
+    """Computes the range of syllable counts of lines of any of the meters."""
+    return (
+        min(meter.min_syllables for meter, _ in meter_rules),
+        max(meter.max_syllables for meter, _ in meter_rules),
+    )
+
+
+def _best_meter(
+    weight: pynini.Fst,
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]],
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[Tuple[str, pynini.Fst]]:
+    """Composes the weight lattice with each meter's rule in turn.
+
+    Args:
+      weight: the weight lattice.
+      meter_rules: pairs of meters and their rules, in order of preference.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      A tuple of the name of the meter whose best path has the lowest cost
+      (ties going to the earlier meter) and its foot lattice, or None if
+      the verse is not a line of any of the meters.
+
+    Raises:
+      LatticeLimitError: a lattice exceeded the limits.
+    """
+    candidates = []
+    for meter, rule in meter_rules:
+        foot = _meter_lattice(meter.name, rule, weight, stats, limits)
+        if foot.start() != pynini.NO_STATE_ID:
+            candidates.append((meter.name, foot))
+    if len(candidates) < 2:
+        return candidates[0] if candidates else None
+    with stage_timer(stats, "shortestpath"):
+        costs = [
+            float(pynini.shortestdistance(foot, reverse=True)[foot.start()])
+            for _, foot in candidates
+        ]
+    # The first of the cheapest candidates.
+    return candidates[costs.index(min(costs))]
+
+
+def scan_verse_meters(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]],
+    text: str,
     number: int = 0,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
 ) -> scansion_pb2.Verse:
-    """Scans a single verse of poetry.
+    """Scans a single verse of poetry in any of several meters.
+
+    This is equivalent to `scan_verse`, except that the weight lattice is
+    composed with each meter's rule in turn (see meters.py); the variable,
+    syllable, and weight lattices are built only once. The verse is scanned
+    in the meter whose best path has the lowest cost, ties going to the
+    earlier meter, and its name is recorded in the `meter` field. The verse
+    is defective if it is not a line of any of the meters.
 
     Args:
-      normalize_rule: the normalization rule.
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
       pronounce_rule: the pronunciation rule.
       variable_rule: the rule for introducing pronunciation variation.
       syllable_rule: the syllabification rule.
       weight_rule: the weight rule.
-      hexameter_rule: the hexameter rule.
+      meter_rules: pairs of meters and their rules, in order of preference.
       text: the input text.
       number: an optional verse number (defaulting to -1).
+      cache: an optional cache of pronunciations and scansions.
+      stats: optional statistics.
+      nbest: the maximum number of alternative scansions, in the chosen
+        meter, to record.
+      limits: optional limits on the size of the lattices.
 
     Returns:
       A populated Verse message.
     """
-    verse = scansion_pb2.Verse(number=number, text=text)
-    try:
-        verse.norm = rewrite.top_rewrite(
-            # We need escapes for normalization since Pharr uses [ and ].
-            pynini.escape(verse.text),
-            normalize_rule,
-        )
-    except rewrite.Error:
-        logging.error("Rewrite failure (verse %d)", verse.number)
-        return verse
-    try:
-        verse.raw_pron = rewrite.top_rewrite(verse.norm, pronounce_rule)
-    except rewrite.Error:
-        logging.error("Rewrite failure (verse %d)", verse.number)
-        return verse
-    var = verse.raw_pron @ variable_rule
-    syllable = pynini.project(var, "output") @ syllable_rule
-    weight = pynini.project(syllable, "output") @ weight_rule
-    foot = pynini.project(weight, "output") @ hexameter_rule
-    if foot.start() == pynini.NO_STATE_ID:
+    scan_pron = functools.partial(
+        _scan_meters,
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        meter_rules,
+        nbest=nbest,
+        limits=limits,
+    )
+    return _scan(
+        normalize_rule,
+        pronounce_rule,
+        scan_pron,
+        text,
+        number,
+        cache,
+        stats,
+        _syllable_range(meter_rules),
+    )
+
+
+def _scan_meters(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]],
+    verse: scansion_pb2.Verse,
+    stats: Optional[ScanStats] = None,
+    nbest: int = 1,
+    limits: Optional[ScanLimits] = None,
+) -> None:
+    syllable, weight = _prefix_lattices(
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        verse.raw_pron,
+        stats,
+        limits,
+    )
+    best = _best_meter(weight, meter_rules, stats, limits)
+    if best is None:
         verse.defective = True
-        logging.warning(
-            "Defective verse (verse %d): %r", verse.number, verse.norm
+        return
+    verse.meter, foot = best
+    aligned = _align_lattices(syllable, weight, foot, stats)
+    with stage_timer(stats, "proto"):
+        aligned.populate(verse)
+    if nbest > 1:
+        _populate_scansions(
+            verse,
+            _nbest_lattices(syllable, weight, foot, nbest, stats),
+            stats,
         )
-        return verse
-    # Works backwards to obtain intermediate structure.
-    foot = pynini.arcmap(pynini.shortestpath(foot), map_type="rmweight")
-    weight = pynini.shortestpath(weight @ pynini.project(foot, "input"))
-    syllable = pynini.shortestpath(syllable @ pynini.project(weight, "input"))
-    # Writes structure to message.
-    verse.var_pron = pynini.project(syllable, "input").string()
-    foot_chunks = _chunk(foot)
-    weight_chunks = _chunk(weight)
-    syllable_chunks = _chunk(syllable)
-    # These help us preserve the multi-alignment.
-    weight_chunk_idx = 0
-    syllable_chunk_idx = 0
-    for weight_codes, foot_code in foot_chunks:
-        # The foot type enum uses the ASCII decimals; see scansion.proto.
-        foot = verse.foot.add(type=ord(foot_code))
-        for weight_code in weight_codes:
-            syllable_codes, exp_weight_code = weight_chunks[weight_chunk_idx]
-            assert (
-                weight_code == exp_weight_code
-            ), f"Weight code mismatch: {weight_code!r} != {exp_weight_code!r}"
-            weight_chunk_idx += 1
-            # Skips over whitespace between words.
-            if weight_code.isspace():
-                # We also advance one step in the syllable chunking or this
-                # will become misaligned.
-                syllable_chunk_idx += 1
-                continue
-            syllable = foot.syllable.add(weight=ord(weight_code))
-            for syllable_code in syllable_codes:
-                var_codes, exp_syllable_code = syllable_chunks[
-                    syllable_chunk_idx
-                ]
-                assert syllable_code == exp_syllable_code, (
-                    "Syllable code mismatch: "
-                    f"{syllable_code!r} != {exp_syllable_code!r}"
-                )
-                syllable_chunk_idx += 1
-                # Skips over whitespace between words.
-                if syllable_code.isspace():
-                    continue
-                if syllable_code == "O":
-                    syllable.onset = var_codes
-                elif syllable_code in ("-", "U"):
-                    syllable.nucleus = var_codes
-                elif syllable_code == "C":
-                    syllable.coda = var_codes
-                else:
-                    raise AssertionError(
-                        f"Unknown syllable code: {syllable_code}"
-                    )
-    return verse
+
+
+def scan_pattern_meters(
+    normalize_rule: Optional[pynini.Fst],
+    pronounce_rule: pynini.Fst,
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]],
+    text: str,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[str]:
+    """Computes the pattern of feet of a single verse in several meters.
+
+    The pattern is identical to the foot types `scan_verse_meters` would
+    give.
+
+    Args:
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
+      pronounce_rule: the pronunciation rule.
+      variable_rule: the rule for introducing pronunciation variation.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      meter_rules: pairs of meters and their rules, in order of preference.
+      text: the input text.
+      cache: an optional cache; only pronunciations are cached.
+      stats: optional statistics.
+      limits: optional limits on the size of the lattices.
+
+    Returns:
+      The pattern of feet, or None if the verse could not be pronounced, is
+      defective, or is incomplete.
+    """
+    pattern_pron = functools.partial(
+        _pattern_meters,
+        variable_rule,
+        syllable_rule,
+        weight_rule,
+        meter_rules,
+        limits=limits,
+    )
+    return _pattern(
+        normalize_rule,
+        pronounce_rule,
+        pattern_pron,
+        text,
+        cache,
+        stats,
+        _syllable_range(meter_rules),
+    )
+
+
+def _pattern_meters(
+    variable_rule: pynini.Fst,
+    syllable_rule: pynini.Fst,
+    weight_rule: pynini.Fst,
+    meter_rules: Sequence[Tuple[meters.Meter, pynini.Fst]],
+    raw_pron: str,
+    stats: Optional[ScanStats] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Optional[str]:
+    _, weight = _prefix_lattices(
+        variable_rule, syllable_rule, weight_rule, raw_pron, stats, limits
+    )
+    best = _best_meter(weight, meter_rules, stats, limits)
+    if best is None:
+        return None
+    with stage_timer(stats, "shortestpath"):
+        foot = pynini.shortestpath(best[1])
+    return _foot_codes(foot)
+
+
+def _init_worker(function: Callable[..., Any]) -> None:
+    """Binds the scanning function once per worker process.
+
+    Args:
+      function: the function to call on each item.
+    """
+    global _worker_function
+    _worker_function = function
+
+
+def _call_worker(args: Tuple) -> Any:
+    """Calls the scanning function in a worker process.
+
+    Args:
+      args: the arguments to the function.
+
+    Returns:
+      The (picklable) result.
+    """
+    assert _worker_function is not None, "Worker not initialized"
+    return _worker_function(*args)
+
+
+def _parallel_map(
+    function: Callable[..., Any], items: Iterator[Tuple], jobs: int
+) -> Iterator[Any]:
+    """Lazily applies a function to items across worker processes.
+
+    Args:
+      function: the function, which must be picklable and return picklable
+        results.
+      items: an iterator of argument tuples.
+      jobs: number of worker processes.
+
+    Yields:
+      The results, in input order.
+    """
+    # Each worker receives the function (and thus the rules) once, when it
+    # is started, rather than once per item.
+    with multiprocessing.Pool(
+        jobs, initializer=_init_worker, initargs=(function,)
+    ) as pool:
+        # `imap` would otherwise consume the entire input up front, so items
+        # are submitted in bounded windows to keep memory usage flat.
+        window = WINDOW * jobs * CHUNKSIZE
+        while True:
+            batch = list(itertools.islice(items, window))
+            if not batch:
+                break
+            # `imap` yields results in input order, so the output is
+            # identical to that of serial scanning.
+            yield from pool.imap(_call_worker, batch, CHUNKSIZE)
+
+
+def _scan_serialized(
+    scan: Callable[[str, int], scansion_pb2.Verse], text: str, number: int
+) -> bytes:
+    """Scans a single verse, returning the serialized Verse message."""
+    return scan(text, number).SerializeToString()
+
+
+def scan_verses(
+    scan: Callable[[str, int], scansion_pb2.Verse],
+    verses: Iterable[str],
+    jobs: int = 1,
+) -> Iterator[scansion_pb2.Verse]:
+    """Lazily scans verses, numbering them from 1.
+
+    Args:
+      scan: a function which scans a verse given its text and number, such
+        as `scan_verse` with its rules bound.
+      verses: an iterable of verses to scan.
+      jobs: number of worker processes; if greater than 1, verses are scanned
+        in parallel, in chunks of CHUNKSIZE verses.
+
+    Returns:
+      An iterator of populated Verse messages, in input order.
+    """
+    numbered = ((verse, number) for number, verse in enumerate(verses, 1))
+    return scan_numbered(scan, numbered, jobs)
+
+
+def scan_numbered(
+    scan: Callable[[str, int], scansion_pb2.Verse],
+    numbered: Iterable[Tuple[str, int]],
+    jobs: int = 1,
+) -> Iterator[scansion_pb2.Verse]:
+    """Lazily scans verses with the given numbers.
+
+    Args:
+      scan: a function which scans a verse given its text and number, such
+        as `scan_verse` with its rules bound.
+      numbered: an iterable of pairs of verses to scan and their numbers.
+      jobs: number of worker processes; if greater than 1, verses are scanned
+        in parallel, in chunks of CHUNKSIZE verses.
+
+    Yields:
+      Populated Verse messages, in input order.
+    """
+    numbered = iter(numbered)
+    if jobs <= 1:
+        for verse, number in numbered:
+            yield scan(verse, number)
+        return
+    # Messages are sent back from the workers serialized, since the
+    # generated message classes cannot be pickled.
+    for serialized in _parallel_map(
+        functools.partial(_scan_serialized, scan), numbered, jobs
+    ):
+        yield scansion_pb2.Verse.FromString(serialized)
+
+
+def scan_patterns(
+    pattern: Callable[[str], Optional[str]],
+    verses: Iterable[str],
+    jobs: int = 1,
+) -> Iterator[Optional[str]]:
+    """Lazily computes the patterns of feet of verses.
+
+    Args:
+      pattern: a function which computes the pattern of feet of a verse
+        given its text, such as `scan_pattern` with its rules bound.
+      verses: an iterable of verses to scan.
+      jobs: number of worker processes; if greater than 1, verses are scanned
+        in parallel, in chunks of CHUNKSIZE verses.
+
+    Yields:
+      Patterns of feet (or None for defective verses), in input order.
+    """
+    if jobs <= 1:
+        for verse in verses:
+            yield pattern(verse)
+        return
+    yield from _parallel_map(pattern, ((verse,) for verse in verses), jobs)
+
+
+def count_verses(
+    verses: Iterable[scansion_pb2.Verse],
+) -> Iterator[scansion_pb2.Verse]:
+    """Passes scanned verses through, logging summary statistics at the end.
+
+    Args:
+      verses: an iterable of scanned verses.
+
+    Yields:
+      The same verses.
+    """
+    scanned_verses = 0
+    defective_verses = 0
+    incomplete_verses = 0
+    for verse in verses:
+        yield verse
+        if verse.defective:
+            defective_verses += 1
+        elif verse.incomplete:
+            incomplete_verses += 1
+        else:
+            scanned_verses += 1
+    logging.info("%d verses scanned", scanned_verses)
+    logging.info("%d verses defective", defective_verses)
+    if incomplete_verses:
+        logging.info("%d verses incomplete", incomplete_verses)
+
+
+def make_document(
+    verses: Iterable[scansion_pb2.Verse], name: Optional[str] = None
+) -> scansion_pb2.Document:
+    """Collects scanned verses into a document, logging summary statistics.
+
+    Args:
+      verses: an iterable of scanned verses.
+      name: optional metadata about the source.
+
+    Returns:
+      A populated Document message.
+    """
+    document = scansion_pb2.Document(name=name)
+    # TODO(kbg): the `append` method copies the message to avoid circular
+    # references. Would we improve performance using the `add` method and
+    # passing the empty message to be mutated?
+    document.verse.extend(count_verses(verses))
+    return document
 
 
 def scan_document(
-    normalize_rule: pynini.Fst,
+    normalize_rule: Optional[pynini.Fst],
     pronounce_rule: pynini.Fst,
     variable_rule: pynini.Fst,
     syllable_rule: pynini.Fst,
@@ -173,22 +1635,33 @@ def scan_document(
     hexameter_rule: pynini.Fst,
     verses: Iterable[str],
     name: Optional[str] = None,
+    jobs: int = 1,
+    cache: Optional[ScansionCache] = None,
+    stats: Optional[ScanStats] = None,
 ) -> scansion_pb2.Document:
     """Scans an entire document.
 
     Args:
-      normalize_rule: the normalization rule.
+      normalize_rule: the normalization rule, or None to use the equivalent
+        table-driven normalizer.
       pronounce_rule: the pronunciation rule.
       variable_rule: the rule for introducing pronunciation variation.
-      meter_rule: the rule for constraining pronunciation variation to scan.
+      syllable_rule: the syllabification rule.
+      weight_rule: the weight rule.
+      hexameter_rule: the hexameter rule.
       verses: an iterable of verses to scan.
       name: optional metadata about the source.
+      jobs: number of worker processes; if greater than 1, verses are scanned
+        in parallel, in chunks of CHUNKSIZE verses.
+      cache: an optional cache of pronunciations and scansions; when scanning
+        in parallel, each worker process uses its own copy.
+      stats: optional statistics; these are not recorded when scanning in
+        parallel.
 
     Returns:
       A populated Document message.
     """
-    document = scansion_pb2.Document(name=name)
-    # This binds the rule nmes ahead of time.
+    # This binds the rule names ahead of time.
     curried = functools.partial(
         scan_verse,
         normalize_rule,
@@ -197,19 +1670,7 @@ def scan_document(
         syllable_rule,
         weight_rule,
         hexameter_rule,
+        cache=cache,
+        stats=stats if jobs <= 1 else None,
     )
-    scanned_verses = 0
-    defective_verses = 0
-    for number, verse in enumerate(verses, 1):
-        # TODO(kbg): the `append` method copies the message to avoid circular
-        # references. Would we improve performance using the `add` method and
-        # passing the empty message to be mutated?
-        scanned = curried(verse, number)
-        document.verse.append(scanned)
-        if scanned.defective:
-            defective_verses += 1
-        else:
-            scanned_verses += 1
-    logging.info("%d verses scanned", scanned_verses)
-    logging.info("%d verses defective", defective_verses)
-    return document
+    return make_document(scan_verses(curried, verses, jobs), name)
@@ -2,9 +2,9 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: scansion.proto
 """Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
 from google.protobuf import descriptor as _descriptor
-from google.protobuf import message as _message
-from google.protobuf import reflection as _reflection
+from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
 # @@protoc_insertion_point(imports)
 
@@ -13,326 +13,25 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor.FileDescriptor(
-  name='scansion.proto',
-  package='LatinScansion',
-  syntax='proto2',
-  serialized_options=None,
-  create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0escansion.proto\x12\rLatinScansion\"\x88\x01\n\x08Syllable\x12\r\n\x05onset\x18\x01 \x01(\t\x12\x0f\n\x07nucleus\x18\x02 \x02(\t\x12\x0c\n\x04\x63oda\x18\x03 \x01(\t\x12.\n\x06weight\x18\x04 \x01(\x0e\x32\x1e.LatinScansion.Syllable.Weight\"\x1e\n\x06Weight\x12\t\n\x05HEAVY\x10H\x12\t\n\x05LIGHT\x10L\"\x87\x01\n\x04\x46oot\x12)\n\x08syllable\x18\x01 \x03(\x0b\x32\x17.LatinScansion.Syllable\x12&\n\x04type\x18\x02 \x01(\x0e\x32\x18.LatinScansion.Foot.Type\",\n\x04Type\x12\n\n\x06\x44\x41\x43TYL\x10\x44\x12\x0b\n\x07SPONDEE\x10S\x12\x0b\n\x07TROCHEE\x10T\"\xa5\x01\n\x05Verse\x12\x0e\n\x06number\x18\x01 \x01(\x05\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0c\n\x04norm\x18\x03 \x01(\t\x12\x10\n\x08raw_pron\x18\x04 \x01(\t\x12\x10\n\x08var_pron\x18\x05 \x01(\t\x12!\n\x04\x66oot\x18\x06 \x03(\x0b\x32\x13.LatinScansion.Foot\x12\x18\n\tdefective\x18\x07 \x01(\x08:\x05\x66\x61lse\x12\x0f\n\x07\x63omment\x18\x08 \x01(\t\"=\n\x08\x44ocument\x12\x0c\n\x04name\x18\x01 \x01(\t\x12#\n\x05verse\x18\x02 \x03(\x0b\x32\x14.LatinScansion.Verse'
-)
-
-
-
-_SYLLABLE_WEIGHT = _descriptor.EnumDescriptor(
-  name='Weight',
-  full_name='LatinScansion.Syllable.Weight',
-  filename=None,
-  file=DESCRIPTOR,
-  create_key=_descriptor._internal_create_key,
-  values=[
-    _descriptor.EnumValueDescriptor(
-      name='HEAVY', index=0, number=72,
-      serialized_options=None,
-      type=None,
-      create_key=_descriptor._internal_create_key),
-    _descriptor.EnumValueDescriptor(
-      name='LIGHT', index=1, number=76,
-      serialized_options=None,
-      type=None,
-      create_key=_descriptor._internal_create_key),
-  ],
-  containing_type=None,
-  serialized_options=None,
-  serialized_start=140,
-  serialized_end=170,
-)
-_sym_db.RegisterEnumDescriptor(_SYLLABLE_WEIGHT)
-
-_FOOT_TYPE = _descriptor.EnumDescriptor(
-  name='Type',
-  full_name='LatinScansion.Foot.Type',
-  filename=None,
-  file=DESCRIPTOR,
-  create_key=_descriptor._internal_create_key,
-  values=[
-    _descriptor.EnumValueDescriptor(
-      name='DACTYL', index=0, number=68,
-      serialized_options=None,
-      type=None,
-      create_key=_descriptor._internal_create_key),
-    _descriptor.EnumValueDescriptor(
-      name='SPONDEE', index=1, number=83,
-      serialized_options=None,
-      type=None,
-      create_key=_descriptor._internal_create_key),
-    _descriptor.EnumValueDescriptor(
-      name='TROCHEE', index=2, number=84,
-      serialized_options=None,
-      type=None,
-      create_key=_descriptor._internal_create_key),
-  ],
-  containing_type=None,
-  serialized_options=None,
-  serialized_start=264,
-  serialized_end=308,
-)
-_sym_db.RegisterEnumDescriptor(_FOOT_TYPE)
-
-
-_SYLLABLE = _descriptor.Descriptor(
-  name='Syllable',
-  full_name='LatinScansion.Syllable',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='onset', full_name='LatinScansion.Syllable.onset', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='nucleus', full_name='LatinScansion.Syllable.nucleus', index=1,
-      number=2, type=9, cpp_type=9, label=2,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='coda', full_name='LatinScansion.Syllable.coda', index=2,
-      number=3, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='weight', full_name='LatinScansion.Syllable.weight', index=3,
-      number=4, type=14, cpp_type=8, label=1,
-      has_default_value=False, default_value=72,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-    _SYLLABLE_WEIGHT,
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto2',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=34,
-  serialized_end=170,
-)
-
-
-_FOOT = _descriptor.Descriptor(
-  name='Foot',
-  full_name='LatinScansion.Foot',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='syllable', full_name='LatinScansion.Foot.syllable', index=0,
-      number=1, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='type', full_name='LatinScansion.Foot.type', index=1,
-      number=2, type=14, cpp_type=8, label=1,
-      has_default_value=False, default_value=68,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-    _FOOT_TYPE,
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto2',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=173,
-  serialized_end=308,
-)
-
-
-_VERSE = _descriptor.Descriptor(
-  name='Verse',
-  full_name='LatinScansion.Verse',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='number', full_name='LatinScansion.Verse.number', index=0,
-      number=1, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='text', full_name='LatinScansion.Verse.text', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='norm', full_name='LatinScansion.Verse.norm', index=2,
-      number=3, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='raw_pron', full_name='LatinScansion.Verse.raw_pron', index=3,
-      number=4, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='var_pron', full_name='LatinScansion.Verse.var_pron', index=4,
-      number=5, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='foot', full_name='LatinScansion.Verse.foot', index=5,
-      number=6, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='defective', full_name='LatinScansion.Verse.defective', index=6,
-      number=7, type=8, cpp_type=7, label=1,
-      has_default_value=True, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='comment', full_name='LatinScansion.Verse.comment', index=7,
-      number=8, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto2',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=311,
-  serialized_end=476,
-)
-
-
-_DOCUMENT = _descriptor.Descriptor(
-  name='Document',
-  full_name='LatinScansion.Document',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='name', full_name='LatinScansion.Document.name', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='verse', full_name='LatinScansion.Document.verse', index=1,
-      number=2, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto2',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=478,
-  serialized_end=539,
-)
-
-_SYLLABLE.fields_by_name['weight'].enum_type = _SYLLABLE_WEIGHT
-_SYLLABLE_WEIGHT.containing_type = _SYLLABLE
-_FOOT.fields_by_name['syllable'].message_type = _SYLLABLE
-_FOOT.fields_by_name['type'].enum_type = _FOOT_TYPE
-_FOOT_TYPE.containing_type = _FOOT
-_VERSE.fields_by_name['foot'].message_type = _FOOT
-_DOCUMENT.fields_by_name['verse'].message_type = _VERSE
-DESCRIPTOR.message_types_by_name['Syllable'] = _SYLLABLE
-DESCRIPTOR.message_types_by_name['Foot'] = _FOOT
-DESCRIPTOR.message_types_by_name['Verse'] = _VERSE
-DESCRIPTOR.message_types_by_name['Document'] = _DOCUMENT
-_sym_db.RegisterFileDescriptor(DESCRIPTOR)
-
-Syllable = _reflection.GeneratedProtocolMessageType('Syllable', (_message.Message,), {
-  'DESCRIPTOR' : _SYLLABLE,
-  '__module__' : 'scansion_pb2'
-  # @@protoc_insertion_point(class_scope:LatinScansion.Syllable)
-  })
-_sym_db.RegisterMessage(Syllable)
-
-Foot = _reflection.GeneratedProtocolMessageType('Foot', (_message.Message,), {
-  'DESCRIPTOR' : _FOOT,
-  '__module__' : 'scansion_pb2'
-  # @@protoc_insertion_point(class_scope:LatinScansion.Foot)
-  })
-_sym_db.RegisterMessage(Foot)
-
-Verse = _reflection.GeneratedProtocolMessageType('Verse', (_message.Message,), {
-  'DESCRIPTOR' : _VERSE,
-  '__module__' : 'scansion_pb2'
-  # @@protoc_insertion_point(class_scope:LatinScansion.Verse)
-  })
-_sym_db.RegisterMessage(Verse)
-
-Document = _reflection.GeneratedProtocolMessageType('Document', (_message.Message,), {
-  'DESCRIPTOR' : _DOCUMENT,
-  '__module__' : 'scansion_pb2'
-  # @@protoc_insertion_point(class_scope:LatinScansion.Document)
-  })
-_sym_db.RegisterMessage(Document)
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0escansion.proto\x12\rLatinScansion\"\x88\x01\n\x08Syllable\x12\r\n\x05onset\x18\x01 \x01(\t\x12\x0f\n\x07nucleus\x18\x02 \x02(\t\x12\x0c\n\x04\x63oda\x18\x03 \x01(\t\x12.\n\x06weight\x18\x04 \x01(\x0e\x32\x1e.LatinScansion.Syllable.Weight\"\x1e\n\x06Weight\x12\t\n\x05HEAVY\x10H\x12\t\n\x05LIGHT\x10L\"\x9b\x01\n\x04\x46oot\x12)\n\x08syllable\x18\x01 \x03(\x0b\x32\x17.LatinScansion.Syllable\x12&\n\x04type\x18\x02 \x01(\x0e\x32\x18.LatinScansion.Foot.Type\"@\n\x04Type\x12\n\n\x06\x44\x41\x43TYL\x10\x44\x12\x0b\n\x07SPONDEE\x10S\x12\x0b\n\x07TROCHEE\x10T\x12\x08\n\x04IAMB\x10I\x12\x08\n\x04HALF\x10X\"M\n\x08Scansion\x12\x10\n\x08var_pron\x18\x01 \x01(\t\x12!\n\x04\x66oot\x18\x02 \x03(\x0b\x32\x13.LatinScansion.Foot\x12\x0c\n\x04\x63ost\x18\x03 \x01(\x02\"\x8c\x02\n\x05Verse\x12\x0e\n\x06number\x18\x01 \x01(\x05\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0c\n\x04norm\x18\x03 \x01(\t\x12\x10\n\x08raw_pron\x18\x04 \x01(\t\x12\x10\n\x08var_pron\x18\x05 \x01(\t\x12!\n\x04\x66oot\x18\x06 \x03(\x0b\x32\x13.LatinScansion.Foot\x12\x18\n\tdefective\x18\x07 \x01(\x08:\x05\x66\x61lse\x12\x0f\n\x07\x63omment\x18\x08 \x01(\t\x12\x19\n\nincomplete\x18\n \x01(\x08:\x05\x66\x61lse\x12\r\n\x05meter\x18\x0b \x01(\t\x12\x10\n\x08scan_key\x18\x0c \x01(\t\x12)\n\x08scansion\x18\t \x03(\x0b\x32\x17.LatinScansion.Scansion\"=\n\x08\x44ocument\x12\x0c\n\x04name\x18\x01 \x01(\t\x12#\n\x05verse\x18\x02 \x03(\x0b\x32\x14.LatinScansion.Verse')
 
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'scansion_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
 
+  DESCRIPTOR._options = None
+  _SYLLABLE._serialized_start=34
+  _SYLLABLE._serialized_end=170
+  _SYLLABLE_WEIGHT._serialized_start=140
+  _SYLLABLE_WEIGHT._serialized_end=170
+  _FOOT._serialized_start=173
+  _FOOT._serialized_end=328
+  _FOOT_TYPE._serialized_start=264
+  _FOOT_TYPE._serialized_end=328
+  _SCANSION._serialized_start=330
+  _SCANSION._serialized_end=407
+  _VERSE._serialized_start=410
+  _VERSE._serialized_end=678
+  _DOCUMENT._serialized_start=680
+  _DOCUMENT._serialized_end=741
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,154 @@
+"""Instrumentation for scansion."""
+
+import collections
+import contextlib
+import logging
+import time
+
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+import pynini
+
+
+class ScanStats:
+    """Collects timings and counters from scansion.
+
+    Pass an instance to `scan_verse`, `scan_document`, or `Scanner` to
+    record, for each stage of scansion, the number of calls and wall time,
+    and, for each composition, the number of states and arcs of the
+    resulting lattice. Counters record the number of verses scanned, the
+    number of defective verses and rewrite failures, and cache hits and
+    misses. When no instance is passed, nothing is recorded.
+
+    To receive measurements as they are made (e.g., to export them to a
+    monitoring system), subclass this and override `record_time`,
+    `record_lattice`, or `count`.
+    """
+
+    def __init__(self):
+        self.calls: "collections.Counter[str]" = collections.Counter()
+        self.seconds: Dict[str, float] = collections.defaultdict(float)
+        self.max_seconds: Dict[str, float] = collections.defaultdict(float)
+        self.lattices: "collections.Counter[str]" = collections.Counter()
+        self.states: "collections.Counter[str]" = collections.Counter()
+        self.arcs: "collections.Counter[str]" = collections.Counter()
+        self.max_states: "collections.Counter[str]" = collections.Counter()
+        self.max_arcs: "collections.Counter[str]" = collections.Counter()
+        self.counters: "collections.Counter[str]" = collections.Counter()
+
+    def record_time(self, stage: str, seconds: float) -> None:
+        """Records the wall time of a single call to a stage.
+
+        Args:
+          stage: the name of the stage.
+          seconds: the wall time, in seconds.
+        """
+        self.calls[stage] += 1
+        self.seconds[stage] += seconds
+        if seconds > self.max_seconds[stage]:
+            self.max_seconds[stage] = seconds
+
+    @contextlib.contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Records the wall time of the enclosed block.
+
+        Args:
+          stage: the name of the stage.
+        """
+        start = time.perf_counter()
+        yield
+        self.record_time(stage, time.perf_counter() - start)
+
+    def record_lattice(self, stage: str, fst: pynini.Fst) -> None:
+        """Records the size of a lattice.
+
+        Args:
+          stage: the name of the stage which produced the lattice.
+          fst: the lattice.
+        """
+        states = fst.num_states()
+        arcs = sum(fst.num_arcs(state) for state in fst.states())
+        self.lattices[stage] += 1
+        self.states[stage] += states
+        self.arcs[stage] += arcs
+        self.max_states[stage] = max(self.max_states[stage], states)
+        self.max_arcs[stage] = max(self.max_arcs[stage], arcs)
+
+    def count(self, counter: str, n: int = 1) -> None:
+        """Increments a counter.
+
+        Args:
+          counter: the name of the counter.
+          n: the increment.
+        """
+        self.counters[counter] += n
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Summarizes the statistics as a JSON-serializable dictionary."""
+        return {
+            "stages": {
+                stage: {
+                    "calls": calls,
+                    "seconds": self.seconds[stage],
+                    "mean_us": self.seconds[stage] / calls * 1e6,
+                    "max_us": self.max_seconds[stage] * 1e6,
+                }
+                for stage, calls in self.calls.items()
+            },
+            "lattices": {
+                stage: {
+                    "count": count,
+                    "mean_states": self.states[stage] / count,
+                    "max_states": self.max_states[stage],
+                    "mean_arcs": self.arcs[stage] / count,
+                    "max_arcs": self.max_arcs[stage],
+                }
+                for stage, count in self.lattices.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def log_stats(self) -> None:
+        """Logs a summary of the statistics."""
+        summary = self.as_dict()
+        for stage, timing in summary["stages"].items():
+            logging.info(
+                "%s: %d calls, %.2fs total, %.1fus mean, %.1fus max",
+                stage,
+                timing["calls"],
+                timing["seconds"],
+                timing["mean_us"],
+                timing["max_us"],
+            )
+        for stage, lattice in summary["lattices"].items():
+            logging.info(
+                "%s lattice: %.1f states (max %d), %.1f arcs (max %d)",
+                stage,
+                lattice["mean_states"],
+                lattice["max_states"],
+                lattice["mean_arcs"],
+                lattice["max_arcs"],
+            )
+        for counter, value in sorted(summary["counters"].items()):
+            logging.info("%s: %d", counter, value)
+
+
+# A reusable do-nothing context manager, used in place of a timer when
+# statistics are disabled.
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def stage_timer(
+    stats: Optional[ScanStats], stage: str
+) -> ContextManager[None]:
+    """Returns a timer for a stage if statistics are enabled.
+
+    Args:
+      stats: optional statistics.
+      stage: the name of the stage.
+
+    Returns:
+      A context manager which records the wall time of the enclosed block,
+      or does nothing if `stats` is None.
+    """
+    return stats.timer(stage) if stats is not None else _NULL_TIMER
@@ -1,5 +1,6 @@
 """Code for reading and writing scansion text-format protocol buffers."""
 
+from typing import Iterable, Optional, TextIO
 
 from google.protobuf import text_format  # type: ignore
 
@@ -24,12 +25,25 @@ def read_document(path: str) -> scansion_pb2.Document:
     return document
 
 
-def write_document(document: scansion_pb2.Document, path: str) -> None:
-    """Writes docuemnt message to file.
+def stream_document(
+    verses: Iterable[scansion_pb2.Verse],
+    sink: TextIO,
+    name: Optional[str] = None,
+) -> None:
+    """Writes document message to a file object one verse at a time.
+
+    The output is identical to that of printing the whole document, but only
+    one verse need be held in memory at a time.
 
     Args:
-      document: the document message to write
-      path: file path to write to.
+      verses: an iterable of verse messages to write.
+      sink: file object to write to.
+      name: optional metadata about the source.
     """
-    with open(path, "w") as sink:
-        text_format.PrintMessage(document, sink, as_utf8=True)
+    text_format.PrintMessage(
+        scansion_pb2.Document(name=name), sink, as_utf8=True
+    )
+    for verse in verses:
+        sink.write("verse {\n")
+        text_format.PrintMessage(verse, sink, indent=2, as_utf8=True)
+        sink.write("}\n")
@@ -1,34 +1,342 @@
-"""Validates Document textprotos."""
+"""Validates Document messages.
+
+Paths may be documents or directories, in which case every document in the
+directory (i.e., every file with a document extension) is validated.
+Documents are parsed in parallel with `--jobs`. With `--deep`, each verse of
+each valid document is also scanned again with the given grammar, in
+parallel, and its feet and syllables compared with those stored. Verses are
+then read one at a time, so textproto documents must be in canonical form
+(see `--canonicalize`).
+
+A summary is logged once all documents are validated, and can also be
+written as JSON with `--summary-json`. The exit status is 0 if all documents
+are valid, and otherwise the bitwise OR of EXIT_INVALID, if any document
+could not be parsed, and EXIT_MISMATCH, if any verse differs from its
+rescansion. With `--fail-fast`, validation stops at the first failure.
+"""
 
 import argparse
+import collections
+import functools
+import itertools
+import json
 import logging
+import os
+import shutil
+import tempfile
+import time
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.protobuf import message  # type: ignore
+from google.protobuf import text_format  # type: ignore
 
 import latin_scansion
 
+from latin_scansion import scansion
+
+# Exit status flags. (argparse exits with status 2 on usage errors.)
+EXIT_INVALID = 1
+EXIT_MISMATCH = 4
+
+# Errors which indicate that a document is invalid, rather than a bug.
+_ERRORS = (
+    EOFError,
+    OSError,
+    UnicodeDecodeError,
+    ValueError,
+    message.DecodeError,
+    text_format.ParseError,
+)
+
+# The result of validating a document: the error, if it is invalid, and the
+# number of verses.
+_Result = Tuple[Optional[str], int]
+
+
+def _expand(paths: List[str]) -> List[str]:
+    """Replaces directories with the documents they contain."""
+    expanded = []
+    for path in paths:
+        if not os.path.isdir(path):
+            expanded.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            if os.path.splitext(name)[1] in latin_scansion.formats.EXTENSIONS:
+                expanded.append(os.path.join(path, name))
+    return expanded
+
+
+def _write_atomically(
+    document: latin_scansion.Document, path: str, fmt: str
+) -> None:
+    """Writes a document, atomically replacing the existing file."""
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or ".", delete=False
+    ) as temp:
+        temp_path = temp.name
+    try:
+        latin_scansion.write_document(document, temp_path, fmt)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _validate(path: str, fmt: Optional[str], canonicalize: bool) -> _Result:
+    """Validates, and optionally canonicalizes, a single document.
+
+    Args:
+      path: path for the document.
+      fmt: the format; if not specified, it is guessed from the path.
+      canonicalize: if set, the document is rewritten in canonical form.
+
+    Returns:
+      The result.
+    """
+    fmt = fmt or latin_scansion.formats.guess_format(path)
+    try:
+        document = latin_scansion.read_document(path, fmt)
+        if canonicalize:
+            _write_atomically(document, path, fmt)
+    except _ERRORS as error:
+        return f"{type(error).__name__}: {error}", 0
+    return None, len(document.verse)
+
+
+def validate_documents(
+    paths: List[str],
+    fmt: Optional[str] = None,
+    canonicalize: bool = False,
+    jobs: int = 1,
+) -> Iterator[Tuple[str, _Result]]:
+    """Lazily validates documents.
+
+    Args:
+      paths: paths for the documents.
+      fmt: the format; if not specified, it is guessed from each path.
+      canonicalize: if set, valid documents are rewritten in canonical form.
+      jobs: number of worker processes.
+
+    Yields:
+      Pairs of paths and results, in input order. Should the caller stop
+      iterating, documents not yet validated are skipped.
+    """
+    if jobs <= 1:
+        for path in paths:
+            yield path, _validate(path, fmt, canonicalize)
+        return
+    # Stopping early closes this generator, and with it the worker pool.
+    results = scansion._parallel_map(
+        functools.partial(_validate, fmt=fmt, canonicalize=canonicalize),
+        ((path,) for path in paths),
+        jobs,
+    )
+    yield from zip(paths, results)
+
+
+def _read_verses(
+    paths: List[str], fmt: Optional[str]
+) -> Iterator[Tuple[str, latin_scansion.Verse]]:
+    """Lazily reads the verses of documents, paired with their paths."""
+    for path in paths:
+        for verse in latin_scansion.DocumentReader(path, fmt):
+            yield path, verse
+
+
+def rescan_documents(
+    scanner: latin_scansion.Scanner,
+    paths: List[str],
+    fmt: Optional[str] = None,
+    jobs: int = 1,
+) -> Iterator[Tuple[str, latin_scansion.Verse, latin_scansion.Verse]]:
+    """Lazily rescans the verses of documents.
+
+    Verses are read one at a time, so memory usage does not depend on the
+    size of the documents; textproto documents must therefore be in
+    canonical form.
+
+    Args:
+      scanner: the scanner.
+      paths: paths for the documents.
+      fmt: the format; if not specified, it is guessed from each path.
+      jobs: number of worker processes.
+
+    Yields:
+      Triples of paths, stored verses, and their rescansions, in input
+      order.
+    """
+    # Only the verses not yet rescanned are buffered by `tee`.
+    stored, texts = itertools.tee(_read_verses(paths, fmt))
+    rescanned = scanner.scan_numbered(
+        ((verse.text, verse.number) for _, verse in texts), jobs
+    )
+    for (path, verse), other in zip(stored, rescanned):
+        yield path, verse, other
+
+
+def diff_verse(
+    stored: latin_scansion.Verse, rescanned: latin_scansion.Verse
+) -> Optional[str]:
+    """Compares a stored verse with its rescansion.
+
+    Args:
+      stored: the stored verse.
+      rescanned: the rescanned verse.
+
+    Returns:
+      A description of the first difference, or None if their flags, feet,
+      and syllables are the same.
+    """
+    for flag in ("defective", "incomplete"):
+        value = getattr(stored, flag)
+        other = getattr(rescanned, flag)
+        if value != other:
+            return f"{flag} is {value}, but rescanned as {other}"
+    stored_feet = _pattern(stored)
+    rescanned_feet = _pattern(rescanned)
+    if stored_feet != rescanned_feet:
+        return f"feet are {stored_feet}, but rescanned as {rescanned_feet}"
+    for index, (foot, other) in enumerate(zip(stored.foot, rescanned.foot)):
+        if foot != other:
+            return f"syllables of foot {index + 1} differ"
+    return None
+
+
+def _pattern(verse: latin_scansion.Verse) -> str:
+    # The foot type enum uses the ASCII decimals; see scansion.proto.
+    return "".join(chr(foot.type) for foot in verse.foot)
+
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
-        "textproto", nargs="+", help="path for input textproto"
+        "path", nargs="+", help="path for input document or directory"
     )
     parser.add_argument(
         "--canonicalize",
         action="store_true",
-        help="canonicalize input textprotos upon successful parse?",
+        help="canonicalize input documents upon successful parse?",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--format",
+        choices=latin_scansion.formats.FORMATS,
+        help="input format (default: guessed from each path)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of parallel validation processes "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="also rescan each verse, and compare its feet and syllables "
+        "with those stored; requires --far",
+    )
+    parser.add_argument("--far", help="path to grammar FAR, for --deep")
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first invalid document or mismatched verse",
+    )
+    parser.add_argument("--summary-json", help="path for output JSON summary")
+    args = parser.parse_args()
+    if args.deep and not args.far:
+        parser.error("--deep requires --far")
+    return args
 
 
 def main() -> None:
     logging.basicConfig(format="%(levelname)s: %(message)s", level="INFO")
     args = _parse_args()
-    for textproto in args.textproto:
-        try:
-            document = latin_scansion.read_document(textproto)
-            logging.info("Successfully validated %s", textproto)
-            if args.canonicalize:
-                logging.info("Canonicalizing contents of %s", textproto)
-                latin_scansion.write_document(document, textproto)
-        # TODO(kbg): Can I make this more explicit?
-        except Exception as err:
-            logging.info("Validation of %s failed: %s", textproto, err)
+    start = time.perf_counter()
+    paths = _expand(args.path)
+    summary: Dict[str, Any] = {
+        "documents": 0,
+        "verses": 0,
+        "invalid": [],
+        "mismatched": [],
+    }
+    valid: Dict[str, int] = {}
+    for path, (error, verses) in validate_documents(
+        paths, args.format, args.canonicalize, args.jobs
+    ):
+        summary["documents"] += 1
+        if error is not None:
+            logging.error("Validation of %s failed: %s", path, error)
+            summary["invalid"].append({"path": path, "error": error})
+            if args.fail_fast:
+                break
+            continue
+        logging.info(
+            "Successfully %s %s",
+            "validated and canonicalized"
+            if args.canonicalize
+            else "validated",
+            path,
+        )
+        summary["verses"] += verses
+        valid[path] = verses
+    if args.deep and not (args.fail_fast and summary["invalid"]):
+        scanner = latin_scansion.Scanner(args.far)
+        rescanned: Dict[str, int] = collections.Counter()
+        for path, verse, other in rescan_documents(
+            scanner, list(valid), args.format, args.jobs
+        ):
+            rescanned[path] += 1
+            difference = diff_verse(verse, other)
+            if difference is None:
+                continue
+            logging.error(
+                "Mismatch in %s (verse %d): %s", path, verse.number, difference
+            )
+            summary["mismatched"].append(
+                {
+                    "path": path,
+                    "number": verse.number,
+                    "difference": difference,
+                }
+            )
+            if args.fail_fast:
+                break
+        else:
+            # Verses of non-canonical textproto documents cannot be read one
+            # at a time, and so are not rescanned.
+            for path, verses in valid.items():
+                if rescanned[path] == verses:
+                    continue
+                difference = (
+                    f"only {rescanned[path]} of {verses} verses could be "
+                    "rescanned; canonicalize the document first"
+                )
+                logging.error("Mismatch in %s: %s", path, difference)
+                summary["mismatched"].append(
+                    {"path": path, "number": None, "difference": difference}
+                )
+    status = 0
+    if summary["invalid"]:
+        status |= EXIT_INVALID
+    if summary["mismatched"]:
+        status |= EXIT_MISMATCH
+    summary["seconds"] = time.perf_counter() - start
+    summary["status"] = status
+    logging.info(
+        "%d documents (%d verses) validated in %.2fs: %d invalid%s",
+        summary["documents"],
+        summary["verses"],
+        summary["seconds"],
+        len(summary["invalid"]),
+        (
+            f", {len(summary['mismatched'])} verses mismatched"
+            if args.deep
+            else ""
+        ),
+    )
+    if args.summary_json:
+        with open(args.summary_json, "w") as sink:
+            json.dump(summary, sink, indent=2)
+    raise SystemExit(status)
@@ -34,9 +34,14 @@ def main():
         python_requires=">=3.7",
         zip_safe=False,
         setup_requires=["setuptools>=39"],
-        install_requires=["protobuf>=3.17.2"],
+        install_requires=["protobuf>=3.20.0"],
         entry_points={
             "console_scripts": [
+                "latin_build_bundle = latin_scansion.build_bundle:main",
+                "latin_build_cascade = latin_scansion.build_cascade:main",
+                "latin_build_grammars = latin_scansion.build:main",
+                "latin_convert = latin_scansion.convert:main",
+                "latin_rule_report = latin_scansion.rule_report:main",
                 "latin_scan = latin_scansion.scan:main",
                 "latin_validate = latin_scansion.validate:main",
             ]
@@ -0,0 +1,68 @@
+"""Unit tests for alignment.py."""
+
+import unittest
+
+import latin_scansion
+
+from latin_scansion import alignment
+from latin_scansion import scansion
+
+
+class AlignmentTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+        (
+            cls.normalize_rule,
+            cls.pronounce_rule,
+            *cls.scan_rules,
+        ) = cls.scanner.rules
+
+    def align(self, text):
+        verse = self.scanner.scan(text)
+        return verse, scansion.align_stepwise(*self.scan_rules, verse.raw_pron)
+
+    def test_aen_1_1(self):
+        verse, aligned = self.align(
+            "Arma virumque canō, Trojae quī prīmus ab ōris"
+        )
+        self.assertEqual(aligned.pattern, "DDSSDS")
+        self.assertEqual(aligned.var_pron.decode("utf8"), verse.var_pron)
+        self.assertEqual(len(aligned.weights), 15)
+        self.assertEqual(list(aligned.foot_ends), [3, 6, 8, 10, 13, 15])
+
+    def test_populate_matches_scan(self):
+        for text in (
+            "Arma virumque canō, Trojae quī prīmus ab ōris",
+            "exciderant animō; manet altā mente repostum",
+            "Ipsa Jovis rapidum jaculāta ē nūbibus ignem",
+        ):
+            with self.subTest(text=text):
+                expected, aligned = self.align(text)
+                verse = latin_scansion.Verse(
+                    number=expected.number,
+                    text=expected.text,
+                    norm=expected.norm,
+                    raw_pron=expected.raw_pron,
+                )
+                aligned.populate(verse)
+                self.assertEqual(verse, expected)
+
+    def test_defective(self):
+        _, aligned = self.align("Hic cursus fuit,")
+        self.assertIsNone(aligned)
+
+    def test_spans(self):
+        _, aligned = self.align(
+            "Arma virumque canō, Trojae quī prīmus ab ōris"
+        )
+        # The first syllable, "ar", has no onset.
+        self.assertEqual(
+            list(aligned.spans[: 2 * len(alignment.FIELDS)]),
+            [-1, -1, 0, 1, 1, 2],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Unit tests for build.py."""
+
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from latin_scansion import build
+
+
+class BuildTest(unittest.TestCase):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.grammar_dir = os.path.join(tempdir.name, "grammars")
+        self.cache_dir = os.path.join(tempdir.name, "cache")
+        os.mkdir(self.grammar_dir)
+        for path in glob.glob("grammars/*.grm") + ["grammars/casefold.tsv"]:
+            shutil.copy(path, self.grammar_dir)
+        self.all_grm = os.path.join(self.grammar_dir, "all.grm")
+
+    def path(self, name):
+        return os.path.join(self.grammar_dir, name)
+
+    def test_load_grammars(self):
+        grammars = build.load_grammars([self.all_grm])
+        self.assertIn(self.path("utility.grm"), grammars)
+        self.assertEqual(
+            grammars[self.path("weight.grm")].imports,
+            [self.path("utility.grm")],
+        )
+        self.assertEqual(
+            grammars[self.path("normalize.grm")].files,
+            [self.path("casefold.tsv")],
+        )
+
+    def test_edit_changes_only_dependent_keys(self):
+        grammars = build.load_grammars([self.all_grm])
+        before = build.cache_keys(grammars)
+        with open(self.path("pentameter.grm"), "a") as sink:
+            print("# An edit.", file=sink)
+        after = build.cache_keys(build.load_grammars([self.all_grm]))
+        changed = {path for path in before if before[path] != after[path]}
+        self.assertEqual(changed, {self.path("pentameter.grm"), self.all_grm})
+
+    def test_data_file_changes_key(self):
+        grammars = build.load_grammars([self.all_grm])
+        before = build.cache_keys(grammars)
+        with open(self.path("casefold.tsv"), "a") as sink:
+            print("Ж\tж", file=sink)
+        after = build.cache_keys(grammars)
+        self.assertNotEqual(
+            before[self.path("normalize.grm")],
+            after[self.path("normalize.grm")],
+        )
+        self.assertEqual(
+            before[self.path("foot.grm")], after[self.path("foot.grm")]
+        )
+
+    def test_cyclic_import(self):
+        with open(self.path("byte.grm"), "a") as sink:
+            print("import 'inventory.grm' as i;", file=sink)
+        with self.assertRaises(build.BuildError):
+            build.cache_keys(build.load_grammars([self.all_grm]))
+
+    def test_cached_build_needs_no_compiler(self):
+        compiler = os.path.join(self.grammar_dir, "no-such-compiler")
+        keys = build.cache_keys(build.load_grammars([self.all_grm]), compiler)
+        os.mkdir(self.cache_dir)
+        for key in keys.values():
+            shutil.copy(
+                "grammars/all.far", os.path.join(self.cache_dir, f"{key}.far")
+            )
+        results = build.build(
+            [self.all_grm], self.cache_dir, jobs=4, compiler=compiler
+        )
+        self.assertEqual(set(results), set(keys))
+        self.assertEqual(set(results.values()), {"cached"})
+        self.assertTrue(os.path.exists(self.path("all.far")))
+        # Without the cache, the missing compiler is needed.
+        with self.assertRaises(build.BuildError):
+            build.build([self.all_grm], None, compiler=compiler)
+
+    @unittest.skipUnless(
+        shutil.which(build.THRAXCOMPILER), "Requires thraxcompiler"
+    )
+    def test_build(self):
+        results = build.build([self.all_grm], self.cache_dir, jobs=4)
+        self.assertEqual(set(results.values()), {"compiled"})
+        results = build.build([self.all_grm], self.cache_dir, jobs=4)
+        self.assertEqual(set(results.values()), {"cached"})
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Unit tests for bundle.py."""
+
+import logging
+import os
+import tempfile
+import unittest
+
+import pynini
+
+import latin_scansion
+
+from latin_scansion import bundle
+
+
+class BundleTest(unittest.TestCase):
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Hic cursus fuit,",
+        "exciderant animō; manet altā mente repostum",
+        # Tied, and so scanned stepwise with the cascade (Aeneid 6.42).
+        "Excīsum Euboīcae latus ingēns rūpis in antrum,",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.tempdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tempdir.name, "bundle.far")
+        bundle.write_far("grammars/all.far", cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tempdir.cleanup()
+        super().tearDownClass()
+
+    def test_rules_are_sorted(self):
+        with pynini.Far(self.path, "r") as far:
+            self.assertEqual(far.far_type(), bundle.FAR_TYPE)
+            for key, fst in far:
+                self.assertEqual(
+                    fst.properties(pynini.I_LABEL_SORTED, True),
+                    pynini.I_LABEL_SORTED,
+                    key,
+                )
+
+    def test_bundle_matches_far(self):
+        scanner = latin_scansion.Scanner(self.path)
+        self.assertIsNone(scanner.cascade)
+        self.assertEqual(
+            list(scanner.scan_many(self.verses)),
+            list(self.scanner.scan_many(self.verses)),
+        )
+
+    def test_cascade(self):
+        path = os.path.join(self.tempdir.name, "cascade.far")
+        bundle.write_far("grammars/all.far", path, with_cascade=True)
+        scanner = latin_scansion.Scanner(path, use_cascade=True)
+        self.assertIsNotNone(scanner.cascade)
+        self.assertEqual(
+            list(scanner.scan_many(self.verses)),
+            list(self.scanner.scan_many(self.verses)),
+        )
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Unit tests for cache.py."""
+
+import glob
+import unittest
+
+import pynini
+from pynini.lib import rewrite
+
+import latin_scansion
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_eviction(self):
+        cache = latin_scansion.cache.LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # Touches "a" so that "b" is the least recently used.
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+
+
+class ScansionCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far", 16)
+        cls.uncached = latin_scansion.Scanner("grammars/all.far")
+
+    def test_cached_matches_uncached(self):
+        verses = [
+            "Arma virumque canō, Trojae quī prīmus ab ōris",
+            "Hic cursus fuit,",
+            "Arma virumque canō, Trojae quī prīmus ab ōris",
+            "arma virumque canō trojae quī prīmus ab ōris",
+            "Hic cursus fuit,",
+        ]
+        self.assertEqual(
+            list(self.scanner.scan_many(verses)),
+            list(self.uncached.scan_many(verses)),
+        )
+        cache = self.scanner.cache
+        self.assertEqual(cache.pronunciations.hits, 2)
+        self.assertEqual(cache.pronunciations.misses, 3)
+        # The casefolded verse shares a pronunciation with the first.
+        self.assertEqual(cache.scansions.hits, 3)
+        self.assertEqual(cache.scansions.misses, 2)
+
+
+class WordCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with pynini.Far("grammars/all.far", "r") as far:
+            cls.normalize_rule = far["NORMALIZE"]
+            cls.pronounce_rule = far["PRONOUNCE"]
+
+    # Checks that word-by-word pronunciation is equivalent to whole-line
+    # pronunciation over the entire Aeneid.
+    def test_aeneid(self):
+        words = latin_scansion.cache.LRUCache(100_000)
+        for path in sorted(glob.glob("data/Aeneid/*.txt")):
+            with open(path, "r") as source:
+                for line in source:
+                    try:
+                        norm = rewrite.top_rewrite(
+                            pynini.escape(line.rstrip()), self.normalize_rule
+                        )
+                        expected = rewrite.top_rewrite(
+                            norm, self.pronounce_rule
+                        )
+                    except rewrite.Error:
+                        continue
+                    self.assertEqual(
+                        latin_scansion.scansion.pronounce_words(
+                            self.pronounce_rule, norm, words
+                        ),
+                        expected,
+                    )
+        # The vocabulary is much smaller than the number of tokens.
+        self.assertGreater(words.hits, words.misses)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Unit tests for disk_cache.py."""
+
+import logging
+import pickle
+import tempfile
+import unittest
+
+import latin_scansion
+
+from latin_scansion import disk_cache
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def test_put_and_get(self):
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", latin_scansion.Verse(text="a"))
+        self.assertEqual(cache.get("a").text, "a")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+        # The entry persists.
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        self.assertEqual(cache.get("a").text, "a")
+        cache.close()
+
+    def test_get_does_not_write(self):
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        cache.put("a", latin_scansion.Verse(text="a"))
+        cache.close()
+        cache = disk_cache.DiskCache(self.tempdir.name, access_resolution=0)
+        connection = cache._connect()
+        (accessed,) = connection.execute(
+            "SELECT accessed FROM verses"
+        ).fetchone()
+        self.assertEqual(cache.get("a").text, "a")
+        self.assertEqual(connection.total_changes, 0)
+        # The access time is written when the cache is closed.
+        cache.close()
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        (updated,) = (
+            cache._connect().execute("SELECT accessed FROM verses").fetchone()
+        )
+        self.assertGreater(updated, accessed)
+        cache.close()
+
+    def test_access_resolution(self):
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        cache.put("a", latin_scansion.Verse(text="a"))
+        # The access time is recent enough not to need updating.
+        cache.get("a")
+        self.assertFalse(cache._accessed)
+        cache.close()
+
+    def test_evict(self):
+        cache = disk_cache.DiskCache(
+            self.tempdir.name, max_entries=2, access_resolution=0
+        )
+        for key in ("a", "b", "c"):
+            cache.put(key, latin_scansion.Verse(text=key))
+        # Marks "a" as more recently used than "b".
+        cache.get("a")
+        cache.evict()
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        cache.close()
+
+    def test_pickle(self):
+        cache = disk_cache.DiskCache(self.tempdir.name)
+        cache.put("a", latin_scansion.Verse(text="a"))
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copy.get("a").text, "a")
+        copy.close()
+        cache.close()
+
+
+class ScannerDiskCacheTest(unittest.TestCase):
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Hic cursus fuit,",
+        "exciderant animō; manet altā mente repostum",
+    ]
+
+    def test_warm_start_matches_scan(self):
+        expected = list(
+            latin_scansion.Scanner("grammars/all.far").scan_many(self.verses)
+        )
+        with tempfile.TemporaryDirectory() as tempdir:
+            scanner = latin_scansion.Scanner(
+                "grammars/all.far", cache_dir=tempdir
+            )
+            self.assertEqual(list(scanner.scan_many(self.verses)), expected)
+            scanner.disk_cache.close()
+            stats = latin_scansion.ScanStats()
+            scanner = latin_scansion.Scanner(
+                "grammars/all.far", cache_dir=tempdir, stats=stats
+            )
+            self.assertEqual(list(scanner.scan_many(self.verses)), expected)
+            self.assertEqual(stats.counters["disk_cache_hits"], 3)
+            self.assertEqual(stats.counters["disk_cache_misses"], 0)
+            scanner.disk_cache.close()
+
+    def test_parallel_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            scanner = latin_scansion.Scanner(
+                "grammars/all.far", cache_dir=tempdir
+            )
+            parallel = list(scanner.scan_stream(self.verses * 2, jobs=2))
+            serial = list(scanner.scan_stream(self.verses * 2))
+            self.assertEqual(parallel, serial)
+            self.assertEqual(len(scanner.disk_cache), 3)
+            scanner.disk_cache.close()
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Unit tests for formats.py."""
+
+import io
+import os
+import tempfile
+import unittest
+
+import latin_scansion
+
+from latin_scansion import formats
+
+
+class FormatsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.document = scanner.scan_document(
+            [
+                "Arma virumque canō, Trojae quī prīmus ab ōris",
+                "Hic cursus fuit,",
+                "exciderant animō; manet altā mente repostum",
+            ],
+            "aen",
+        )
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_guess_format(self):
+        self.assertEqual(formats.guess_format("a.textproto"), "textproto")
+        self.assertEqual(formats.guess_format("a.binpb"), "binary")
+        self.assertEqual(formats.guess_format("a.delimited"), "delimited")
+        self.assertEqual(formats.guess_format("a"), "textproto")
+
+    def test_textproto_round_trip(self):
+        path = os.path.join(self.tempdir.name, "aen.textproto")
+        latin_scansion.write_document(self.document, path)
+        self.assertEqual(latin_scansion.read_document(path), self.document)
+
+    def test_binary_round_trip(self):
+        path = os.path.join(self.tempdir.name, "aen.binpb")
+        latin_scansion.write_document(self.document, path)
+        with open(path, "rb") as source:
+            self.assertEqual(source.read(), self.document.SerializeToString())
+        self.assertEqual(latin_scansion.read_document(path), self.document)
+
+    def test_delimited_round_trip(self):
+        path = os.path.join(self.tempdir.name, "aen.delimited")
+        latin_scansion.write_document(self.document, path)
+        document = latin_scansion.read_document(path)
+        # The delimited format does not record the document name.
+        self.assertEqual(document.name, "")
+        self.assertEqual(document.verse, self.document.verse)
+
+    def test_explicit_format(self):
+        path = os.path.join(self.tempdir.name, "aen")
+        latin_scansion.write_document(self.document, path, "binary")
+        self.assertEqual(
+            latin_scansion.read_document(path, "binary"), self.document
+        )
+
+    def test_truncated_delimited_raises(self):
+        sink = io.BytesIO()
+        formats.write_delimited(self.document.verse[0], sink)
+        source = io.BytesIO(sink.getvalue()[:-1])
+        with self.assertRaises(EOFError):
+            list(formats.read_delimited(source))
+
+    def test_unknown_format_raises(self):
+        path = os.path.join(self.tempdir.name, "aen")
+        with self.assertRaises(ValueError):
+            latin_scansion.write_document(self.document, path, "xml")
+
+
+class DocumentReaderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        scanner = latin_scansion.Scanner("grammars/all.far")
+        with open("data/Aeneid/Aeneid01.txt", "r") as source:
+            cls.document = scanner.scan_document(
+                [line.rstrip() for line in source][:50], "aen"
+            )
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def _write(self, extension):
+        path = os.path.join(self.tempdir.name, f"aen{extension}")
+        latin_scansion.write_document(self.document, path)
+        return path
+
+    def _assert_reads(self, extension):
+        path = self._write(extension)
+        reader = latin_scansion.DocumentReader(path)
+        self.assertEqual(list(reader), list(self.document.verse))
+        self.assertEqual(len(reader), len(self.document.verse))
+        self.assertEqual(reader[17], self.document.verse[17])
+        self.assertEqual(reader[-1], self.document.verse[-1])
+        with self.assertRaises(IndexError):
+            reader[len(self.document.verse)]
+        # The delimited format does not record the document name.
+        self.assertEqual(
+            reader.name, "" if extension == ".delimited" else "aen"
+        )
+
+    def test_textproto(self):
+        self._assert_reads(".textproto")
+
+    def test_binary(self):
+        self._assert_reads(".binpb")
+
+    def test_delimited(self):
+        self._assert_reads(".delimited")
+
+    def test_random_access_before_iteration(self):
+        path = self._write(".binpb")
+        reader = latin_scansion.DocumentReader(path)
+        self.assertEqual(reader[3], self.document.verse[3])
+
+    def test_stored_index(self):
+        path = self._write(".delimited")
+        latin_scansion.DocumentReader(path).write_index()
+        self.assertTrue(os.path.exists(path + formats.INDEX_EXTENSION))
+        reader = latin_scansion.DocumentReader(path)
+        self.assertEqual(reader[42], self.document.verse[42])
+
+    def test_stale_index_is_rebuilt(self):
+        path = self._write(".delimited")
+        latin_scansion.DocumentReader(path).write_index()
+        with open(path, "ab") as sink:
+            formats.write_delimited(self.document.verse[0], sink)
+        reader = latin_scansion.DocumentReader(path)
+        self.assertEqual(len(reader), len(self.document.verse) + 1)
+        self.assertEqual(reader[-1], self.document.verse[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
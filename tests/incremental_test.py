@@ -0,0 +1,90 @@
+"""Unit tests for incremental.py."""
+
+import logging
+import unittest
+
+import latin_scansion
+
+from latin_scansion import incremental
+
+
+class IncrementalTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stats = latin_scansion.ScanStats()
+        cls.scanner = latin_scansion.Scanner(
+            "grammars/all.far", stats=cls.stats
+        )
+
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Hic cursus fuit,",
+        "exciderant animō; manet altā mente repostum",
+        "Ipsa Jovis rapidum jaculāta ē nūbibus ignem",
+        "bis medium amplexī, bis collō squāmea circum",
+    ]
+
+    def setUp(self):
+        self.stats.counters.clear()
+
+    def assertScansEqual(self, verses, texts):
+        expected = list(self.scanner.scan_many(texts))
+        for verse in verses:
+            self.assertTrue(verse.scan_key)
+            verse.ClearField("scan_key")
+        self.assertEqual(verses, expected)
+
+    def test_scan_key(self):
+        fingerprint = self.scanner.fingerprint
+        key = incremental.scan_key(fingerprint, self.verses[0])
+        self.assertEqual(
+            key, incremental.scan_key(fingerprint, self.verses[0])
+        )
+        self.assertNotEqual(
+            key, incremental.scan_key(fingerprint, self.verses[1])
+        )
+        other = latin_scansion.Scanner("grammars/all.far", nbest=2)
+        self.assertNotEqual(fingerprint, other.fingerprint)
+
+    def test_rescan_without_previous_matches_scan(self):
+        verses = list(self.scanner.rescan_stream(self.verses, []))
+        self.assertScansEqual(verses, self.verses)
+        self.assertEqual(self.stats.counters["reused_verses"], 0)
+        self.assertEqual(self.stats.counters["rescanned_verses"], 5)
+
+    def test_rescan_reuses_unchanged_verses(self):
+        previous = list(self.scanner.rescan_stream(self.verses, []))
+        # Changes the third verse, inserts a verse before the second, and
+        # deletes the last.
+        texts = list(self.verses[:-1])
+        texts[2] = texts[2].replace("ā", "a")
+        texts.insert(1, "Ipsa Jovis rapidum jaculāta ē nūbibus ignem")
+        self.stats.counters.clear()
+        verses = list(self.scanner.rescan_stream(texts, previous))
+        self.assertScansEqual(verses, texts)
+        self.assertEqual(self.stats.counters["reused_verses"], 4)
+        self.assertEqual(self.stats.counters["rescanned_verses"], 1)
+
+    def test_parallel_rescan_matches_serial(self):
+        previous = list(self.scanner.rescan_stream(self.verses[::2], []))
+        serial = list(self.scanner.rescan_stream(self.verses, previous))
+        parallel = list(
+            self.scanner.rescan_stream(self.verses, previous, jobs=2)
+        )
+        self.assertEqual(serial, parallel)
+
+    def test_changed_options_rescan_every_verse(self):
+        previous = list(self.scanner.rescan_stream(self.verses, []))
+        stats = latin_scansion.ScanStats()
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far", stats=stats, nbest=2
+        )
+        list(scanner.rescan_stream(self.verses, previous))
+        self.assertEqual(stats.counters["reused_verses"], 0)
+        self.assertEqual(stats.counters["rescanned_verses"], 5)
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Unit tests for lookahead.py."""
+
+import logging
+import unittest
+
+import pynini
+
+import latin_scansion
+
+from latin_scansion import lookahead
+
+
+class LookaheadTest(unittest.TestCase):
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Ītaliam fātō profugus Lāvīniaque vēnit",
+        "Hic cursus fuit,",
+        "exciderant animō; manet altā mente repostum",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with pynini.Far("grammars/all.far", "r") as far:
+            cls.syllable_rule = far["SYLLABLE"].copy()
+            cls.weight_rule = far["WEIGHT"].copy()
+            cls.hexameter_rule = far["HEXAMETER"].copy()
+
+    def test_filter_rules(self):
+        syllable_rule, weight_rule = lookahead.filter_rules(
+            self.syllable_rule, self.weight_rule, [self.hexameter_rule]
+        )
+        # A single syllable is not a hexameter.
+        self.assertNotEqual(
+            ("OU" @ self.weight_rule).start(), pynini.NO_STATE_ID
+        )
+        self.assertEqual(("OU" @ weight_rule).start(), pynini.NO_STATE_ID)
+        self.assertNotEqual(
+            ("ta" @ self.syllable_rule).start(), pynini.NO_STATE_ID
+        )
+        self.assertEqual(("ta" @ syllable_rule).start(), pynini.NO_STATE_ID)
+
+    def test_scansions_unchanged(self):
+        for nbest in (1, 3):
+            with self.subTest(nbest=nbest):
+                expected = list(
+                    latin_scansion.Scanner(
+                        "grammars/all.far", nbest=nbest
+                    ).scan_many(self.verses)
+                )
+                scanner = latin_scansion.Scanner(
+                    "grammars/all.far", nbest=nbest, lookahead=True
+                )
+                self.assertEqual(
+                    list(scanner.scan_many(self.verses)), expected
+                )
+
+    def test_ties_unchanged(self):
+        # Both syllabifications of "antrum" cost the same here, and the tie
+        # must be broken as in stepwise scanning.
+        verse = "Excīsum Euboīcae latus ingēns rūpis in antrum,"
+        expected = latin_scansion.Scanner("grammars/all.far").scan(verse)
+        scanner = latin_scansion.Scanner("grammars/all.far", lookahead=True)
+        self.assertEqual(scanner.scan(verse), expected)
+
+    def test_book_unchanged(self):
+        with open("data/Aeneid/Aeneid06.txt", "r") as source:
+            verses = [line.rstrip() for line in source]
+        expected = latin_scansion.Scanner("grammars/all.far").scan_many(verses)
+        scanner = latin_scansion.Scanner("grammars/all.far", lookahead=True)
+        for verse, other in zip(scanner.scan_many(verses), expected):
+            self.assertEqual(verse, other, verse.text)
+
+    def test_fingerprint(self):
+        self.assertNotEqual(
+            latin_scansion.Scanner("grammars/all.far").fingerprint,
+            latin_scansion.Scanner(
+                "grammars/all.far", lookahead=True
+            ).fingerprint,
+        )
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Unit tests for normalize.py."""
+
+import glob
+import unittest
+
+import pynini
+from pynini.lib import rewrite
+
+from latin_scansion import normalize
+
+
+class NormalizeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with pynini.Far("grammars/all.far", "r") as far:
+            cls.normalize_rule = far["NORMALIZE"]
+
+    def assertConforms(self, text):
+        self.assertEqual(
+            normalize.normalize(text),
+            rewrite.top_rewrite(pynini.escape(text), self.normalize_rule),
+        )
+
+    def test_casefold_table(self):
+        with open("grammars/casefold.tsv", "r") as source:
+            expected = dict(line.rstrip("\n").split("\t") for line in source)
+        self.assertEqual(normalize.CASEFOLD, expected)
+
+    def test_punctuation(self):
+        self.assertEqual(
+            normalize.normalize(
+                'Trōs" ait "Aenēā? Cessās? Neque enim ante dehīscent'
+            ),
+            "trōs ait aenēā cessās neque enim ante dehīscent",
+        )
+
+    def test_em_dash(self):
+        self.assertEqual(
+            normalize.normalize(
+                "lītora---multum ille et terrīs jactātus et altō"
+            ),
+            "lītora multum ille et terrīs jactātus et altō",
+        )
+        self.assertEqual(
+            normalize.normalize(
+                "et genus invīsum, et raptī Ganymēdis honōrēs)---"
+            ),
+            "et genus invīsum et raptī ganymēdis honōrēs",
+        )
+
+    def test_edge_cases(self):
+        for text in ("", "----", "------", "----.", "a--- B", "W", "\\[Ā\\]"):
+            with self.subTest(text=text):
+                self.assertConforms(text)
+
+    # Checks that the normalizer is equivalent to the normalization rule over
+    # the entire Aeneid.
+    def test_aeneid(self):
+        for path in sorted(glob.glob("data/Aeneid/*.txt")):
+            with open(path, "r") as source:
+                for line in source:
+                    self.assertConforms(line.rstrip())
+
+
+if __name__ == "__main__":
+    unittest.main()
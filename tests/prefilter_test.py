@@ -0,0 +1,60 @@
+"""Unit tests for prefilter.py."""
+
+import unittest
+
+import latin_scansion
+
+from latin_scansion import prefilter
+
+
+class PrefilterTest(unittest.TestCase):
+    paths = [
+        "data/Aeneid/Aeneid01.textproto",
+        "data/Aeneid/Aeneid02.textproto",
+    ]
+
+    def test_bounds_contain_scanned_syllables(self):
+        for path in self.paths:
+            for verse in latin_scansion.read_document(path).verse:
+                if verse.defective or not verse.foot:
+                    continue
+                with self.subTest(path=path, number=verse.number):
+                    syllables = sum(len(foot.syllable) for foot in verse.foot)
+                    minimum, maximum = prefilter.syllable_bounds(
+                        verse.raw_pron
+                    )
+                    self.assertLessEqual(minimum, syllables)
+                    self.assertGreaterEqual(maximum, syllables)
+
+    def test_elision_and_synizesis(self):
+        # "conticuēre omnēs": elision, and synizesis of the "u".
+        self.assertEqual(
+            prefilter.syllable_bounds("kontikueːre omneːs"), (5, 7)
+        )
+
+    def test_chained_elision(self):
+        # "ille ē ōris": both "ille" and "ē" may be elided, as "illoːris".
+        self.assertEqual(prefilter.syllable_bounds("ille eː oːris"), (3, 5))
+        self.assertEqual(prefilter.syllable_bounds("a a a a a a"), (1, 6))
+
+    def test_diaeresis(self):
+        # "quī": the labiovelar glide may be vocalized.
+        self.assertEqual(prefilter.syllable_bounds("kwiː"), (1, 2))
+        # "silvae": other glides may not.
+        self.assertEqual(prefilter.syllable_bounds("silwaj"), (2, 2))
+
+    def test_may_scan(self):
+        self.assertFalse(prefilter.may_scan("hik kursus fuit"))
+        self.assertTrue(
+            prefilter.may_scan(
+                "arma wirũːkwe kanoː trojjaj kwiː priːmus ab oːris"
+            )
+        )
+
+    def test_may_scan_range(self):
+        self.assertTrue(prefilter.may_scan("hik kursus fuit", 3, 5))
+        self.assertFalse(prefilter.may_scan("hik kursus fuit", 6, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Unit tests for rule_report.py."""
+
+import unittest
+
+import pynini
+
+from latin_scansion import rule_report
+from latin_scansion import rules
+
+
+class RuleReportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stages = rules.variable_stages()
+
+    @staticmethod
+    def outputs(rule):
+        lattice = pynini.accep("arma wirũːkwe kanoː trojjaj") @ rule
+        return {
+            (ostring, float(weight))
+            for _, ostring, weight in lattice.paths().items()
+        }
+
+    def test_fst_stats(self):
+        stats = rule_report.fst_stats(pynini.cross("ab", "a"))
+        self.assertEqual(stats.states, 3)
+        self.assertEqual(stats.arcs, 2)
+        self.assertTrue(stats.input_deterministic)
+        self.assertEqual(stats.input_epsilons, 0)
+        self.assertEqual(stats.output_epsilons, 1)
+
+    def test_factorings_agree(self):
+        expected = rules.compose_stages(self.stages)
+        for factoring in rule_report.FACTORINGS:
+            with self.subTest(factoring=factoring):
+                fst, products = rule_report.compose_factored(
+                    self.stages, factoring
+                )
+                # One composition per pair of adjacent stages.
+                self.assertEqual(len(products), len(self.stages) - 1)
+                first, last, _, _ = products[-1]
+                self.assertEqual(first, self.stages[0][0])
+                self.assertEqual(last, self.stages[-1][0])
+                self.assertEqual(
+                    self.outputs(fst.optimize()), self.outputs(expected)
+                )
+
+    def test_unknown_factoring(self):
+        with self.assertRaises(ValueError):
+            rule_report.compose_factored(self.stages, "sideways")
+
+    def test_report(self):
+        lines = list(
+            rule_report.report("grammars/all.far", ["SYLLABLE"], ["left"])
+        )
+        self.assertEqual(lines[0], "SYLLABLE:")
+        self.assertTrue(any("(exported)" in line for line in lines))
+        self.assertTrue(lines[-1].strip().startswith("(optimized)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Unit tests for rules.py."""
+
+import unittest
+
+import pynini
+
+from latin_scansion import rules
+
+
+def _best(text, rule):
+    return pynini.shortestpath(pynini.accep(text) @ rule).string()
+
+
+class RulesTest(unittest.TestCase):
+    # The rules are compared verse by verse over a whole book.
+    book = "data/Aeneid/Aeneid01.txt"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with pynini.Far("grammars/all.far", "r") as far:
+            cls.exported = {key: fst.copy() for key, fst in far}
+        cls.rebuilt = {
+            name: rules.compose_stages(build())
+            for name, build in rules.STAGES.items()
+        }
+        with open(cls.book, "r") as source:
+            cls.texts = [
+                _best(line.rstrip(), cls.exported["NORMALIZE"])
+                for line in source
+            ]
+
+    @staticmethod
+    def outputs(text, rule, weighted=True):
+        lattice = pynini.accep(text) @ rule
+        return {
+            (ostring, float(weight) if weighted else None)
+            for _, ostring, weight in lattice.paths().items()
+        }
+
+    def best(self, text, name):
+        return _best(text, self.exported[name])
+
+    def test_pronounce(self):
+        for number, text in enumerate(self.texts, 1):
+            with self.subTest(number=number):
+                self.assertEqual(
+                    self.outputs(text, self.rebuilt["PRONOUNCE"]),
+                    self.outputs(text, self.exported["PRONOUNCE"]),
+                )
+
+    def test_variable(self):
+        for number, text in enumerate(self.texts, 1):
+            pron = self.best(text, "PRONOUNCE")
+            with self.subTest(number=number):
+                self.assertEqual(
+                    self.outputs(pron, self.rebuilt["VARIABLE"]),
+                    self.outputs(pron, self.exported["VARIABLE"]),
+                )
+
+    def test_syllable(self):
+        # The FAR may carry small tie-breaking weights absent from the
+        # grammar, so only the outputs are compared.
+        for number, text in enumerate(self.texts, 1):
+            var = self.best(self.best(text, "PRONOUNCE"), "VARIABLE")
+            with self.subTest(number=number):
+                self.assertEqual(
+                    self.outputs(var, self.rebuilt["SYLLABLE"], False),
+                    self.outputs(var, self.exported["SYLLABLE"], False),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
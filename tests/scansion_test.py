@@ -1,7 +1,8 @@
 """Unit tests for scansion.py."""
 
-import functools
 import logging
+import os
+import tempfile
 import unittest
 
 import pynini
@@ -13,16 +14,7 @@ class ScansionTest(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        with pynini.Far("grammars/all.far", "r") as far:
-            cls.scan_verse = functools.partial(
-                latin_scansion.scan_verse,
-                far["NORMALIZE"],
-                far["PRONOUNCE"],
-                far["VARIABLE"],
-                far["SYLLABLE"],
-                far["WEIGHT"],
-                far["HEXAMETER"],
-            )
+        cls.scan_verse = latin_scansion.Scanner("grammars/all.far").scan
 
     # Tests all features of the first verse's markup.
     def test_aen_1_1(self):
@@ -458,6 +450,281 @@ class ScansionTest(unittest.TestCase):
         )
 
 
+class CascadeScansionTest(ScansionTest):
+    """Reruns the scansion tests using the pre-composed cascade."""
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "cascade.far")
+            latin_scansion.cascade.write_far("grammars/all.far", path)
+            scanner = latin_scansion.Scanner(path, use_cascade=True)
+        assert scanner.cascade is not None
+        cls.scan_verse = scanner.scan
+
+
+class ScanDocumentTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Hic cursus fuit,",
+        "exciderant animō; manet altā mente repostum",
+        "Ipsa Jovis rapidum jaculāta ē nūbibus ignem",
+        "bis medium amplexī, bis collō squāmea circum",
+    ]
+
+    def test_parallel_matches_serial(self):
+        serial = self.scanner.scan_document(self.verses, "aen")
+        parallel = self.scanner.scan_document(self.verses, "aen", jobs=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(
+            [verse.number for verse in parallel.verse], [1, 2, 3, 4, 5]
+        )
+
+    def test_scan_many_matches_scan_document(self):
+        document = latin_scansion.scan_document(
+            *self.scanner.rules, self.verses
+        )
+        self.assertEqual(
+            list(self.scanner.scan_many(self.verses)), list(document.verse)
+        )
+
+    def test_scan_batch_matches_scan(self):
+        # The repeated verses are scanned only once.
+        verses = self.verses + self.verses[:2]
+        self.assertEqual(
+            self.scanner.scan_batch(verses, start=10),
+            [
+                self.scanner.scan(verse, number)
+                for number, verse in enumerate(verses, 10)
+            ],
+        )
+
+    def test_scan_batch_counts_no_uncached_misses(self):
+        # Without a cache of its own, the scanner only shares words across
+        # the batch, which are not counted as cache lookups.
+        stats = latin_scansion.ScanStats()
+        scanner = latin_scansion.Scanner("grammars/all.far", stats=stats)
+        scanner.scan_batch(self.verses)
+        self.assertEqual(stats.counters["verses"], len(self.verses))
+        self.assertFalse(
+            [counter for counter in stats.counters if "cache" in counter]
+        )
+
+    def test_scan_pattern_matches_scan(self):
+        for text in self.verses:
+            verse = self.scanner.scan(text)
+            expected = (
+                None
+                if verse.defective
+                else "".join(chr(foot.type) for foot in verse.foot)
+            )
+            self.assertEqual(self.scanner.scan_pattern(text), expected)
+
+    def test_parallel_patterns_match_serial(self):
+        serial = list(self.scanner.scan_patterns(self.verses))
+        parallel = list(self.scanner.scan_patterns(self.verses, jobs=2))
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial[:2], ["DDSSDS", None])
+
+    def test_nbest(self):
+        scanner = latin_scansion.Scanner("grammars/all.far", nbest=5)
+        verse = scanner.scan(self.verses[0])
+        self.assertEqual(verse.foot, self.scanner.scan(self.verses[0]).foot)
+        patterns = [
+            "".join(chr(foot.type) for foot in scansion.foot)
+            for scansion in verse.scansion
+        ]
+        self.assertEqual(patterns, ["DDSSDS", "DDDSDS"])
+        self.assertEqual(verse.scansion[0].foot, verse.foot)
+        self.assertEqual(verse.scansion[0].var_pron, verse.var_pron)
+        self.assertLess(verse.scansion[0].cost, verse.scansion[1].cost)
+        # The scansion field is only populated in n-best mode.
+        self.assertFalse(self.scanner.scan(self.verses[0]).scansion)
+        self.assertFalse(scanner.scan(self.verses[1]).scansion)
+
+    def test_limits_mark_verse_incomplete(self):
+        stats = latin_scansion.ScanStats()
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far",
+            stats=stats,
+            limits=latin_scansion.ScanLimits(max_states=10),
+        )
+        verse = scanner.scan(self.verses[0])
+        self.assertTrue(verse.incomplete)
+        self.assertFalse(verse.defective)
+        self.assertFalse(verse.foot)
+        self.assertIsNone(scanner.scan_pattern(self.verses[0]))
+        self.assertEqual(stats.counters["incomplete_verses"], 2)
+        self.assertEqual(stats.counters["variable_limit_exceeded"], 2)
+
+    def test_generous_limits_match_unlimited(self):
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far",
+            limits=latin_scansion.ScanLimits(
+                threshold=100000, max_states=1000, max_arcs=1000
+            ),
+        )
+        for text in self.verses:
+            self.assertEqual(scanner.scan(text), self.scanner.scan(text))
+
+
+class CascadeTest(unittest.TestCase):
+    # Aeneid 5 contains a verse, 5.402, whose best scansions are tied, and
+    # which the cascade would otherwise break differently.
+    book = "data/Aeneid/Aeneid05.txt"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(cls.book, "r") as source:
+            cls.verses = [line.rstrip() for line in source]
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.tempdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tempdir.name, "cascade.far")
+        latin_scansion.cascade.write_far("grammars/all.far", cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tempdir.cleanup()
+        super().tearDownClass()
+
+    def test_cascade_is_opt_in(self):
+        self.assertIsNone(latin_scansion.Scanner(self.path).cascade)
+        with self.assertRaises(ValueError):
+            latin_scansion.Scanner("grammars/all.far", use_cascade=True)
+
+    def test_book_matches_stepwise(self):
+        stats = latin_scansion.ScanStats()
+        scanner = latin_scansion.Scanner(
+            self.path, stats=stats, use_cascade=True
+        )
+        for verse, expected in zip(
+            scanner.scan_many(self.verses),
+            self.scanner.scan_many(self.verses),
+        ):
+            self.assertEqual(verse, expected, verse.text)
+        self.assertGreater(stats.counters["cascade_ties"], 0)
+
+    def test_book_patterns_match_stepwise(self):
+        scanner = latin_scansion.Scanner(self.path, use_cascade=True)
+        self.assertEqual(
+            list(scanner.scan_patterns(self.verses)),
+            list(self.scanner.scan_patterns(self.verses)),
+        )
+
+    def test_nbest_matches_stepwise(self):
+        cascade_scanner = latin_scansion.Scanner(
+            self.path, nbest=5, use_cascade=True
+        )
+        scanner = latin_scansion.Scanner("grammars/all.far", nbest=5)
+        for text in ScanDocumentTest.verses:
+            expected = scanner.scan(text)
+            verse = cascade_scanner.scan(text)
+            self.assertEqual(verse.foot, expected.foot)
+            self.assertEqual(len(verse.scansion), len(expected.scansion))
+            for scansion, expected_scansion in zip(
+                verse.scansion, expected.scansion
+            ):
+                self.assertEqual(scansion.foot, expected_scansion.foot)
+                self.assertAlmostEqual(
+                    scansion.cost, expected_scansion.cost, places=1
+                )
+
+
+class MetersTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.hexameter_scanner = latin_scansion.Scanner(
+            "grammars/all.far", meters=["hexameter"]
+        )
+        # These rules are only present in FARs built from the current
+        # grammars.
+        with pynini.Far("grammars/all.far", "r") as far:
+            cls.rules = {
+                rule
+                for rule in ("PENTAMETER", "HENDECASYLLABLE")
+                if far.find(rule)
+            }
+
+    verses = ScanDocumentTest.verses
+
+    def test_hexameter_matches_scan(self):
+        self.assertEqual(self.hexameter_scanner.meters, ["hexameter"])
+        for text in self.verses:
+            expected = self.scanner.scan(text)
+            if not expected.defective:
+                expected.meter = "hexameter"
+            self.assertEqual(self.hexameter_scanner.scan(text), expected)
+            self.assertEqual(
+                self.hexameter_scanner.scan_pattern(text),
+                self.scanner.scan_pattern(text),
+            )
+
+    def test_ties_go_to_earlier_meter(self):
+        latin_scansion.meters.register(
+            latin_scansion.Meter("heroic", "HEXAMETER", 12, 17)
+        )
+        try:
+            scanner = latin_scansion.Scanner(
+                "grammars/all.far", meters=["heroic", "hexameter"]
+            )
+        finally:
+            del latin_scansion.meters.METERS["heroic"]
+        verse = scanner.scan(self.verses[0])
+        self.assertEqual(verse.meter, "heroic")
+        self.assertEqual(verse.foot, self.scanner.scan(self.verses[0]).foot)
+
+    def test_unknown_meter(self):
+        with self.assertRaises(ValueError):
+            latin_scansion.Scanner("grammars/all.far", meters=["sapphic"])
+
+    def test_pentameter(self):
+        if "PENTAMETER" not in self.rules:
+            self.skipTest("Grammar FAR has no PENTAMETER rule")
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far", meters=["hexameter", "pentameter"]
+        )
+        verse = scanner.scan("et nova fēcērunt sīdera prīma deī")
+        self.assertEqual(verse.meter, "pentameter")
+        self.assertEqual(
+            "".join(chr(foot.type) for foot in verse.foot), "DSXDDX"
+        )
+        # Propertius 1.1.1-2.
+        verse = scanner.scan("Cynthia prīma suīs miserum mē cēpit ocellīs,")
+        self.assertEqual(verse.meter, "hexameter")
+        verse = scanner.scan("contactum nullīs ante cupīdinibus.")
+        self.assertEqual(verse.meter, "pentameter")
+        self.assertEqual(
+            "".join(chr(foot.type) for foot in verse.foot), "SSXDDX"
+        )
+        self.assertEqual(scanner.scan(self.verses[0]).meter, "hexameter")
+
+    def test_hendecasyllable(self):
+        if "HENDECASYLLABLE" not in self.rules:
+            self.skipTest("Grammar FAR has no HENDECASYLLABLE rule")
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far", meters=["hexameter", "hendecasyllable"]
+        )
+        verse = scanner.scan("Cui dōnō lepidum novum libellum")
+        self.assertEqual(verse.meter, "hendecasyllable")
+        self.assertEqual(
+            "".join(chr(foot.type) for foot in verse.foot), "SDTTS"
+        )
+        # Catullus 5.1, with elision.
+        verse = scanner.scan("Vīvāmus, mea Lesbia, atque amēmus,")
+        self.assertEqual(verse.meter, "hendecasyllable")
+        self.assertEqual(
+            "".join(chr(foot.type) for foot in verse.foot), "SDTTS"
+        )
+
+
 if __name__ == "__main__":
     logging.disable("CRITICAL")
     unittest.main()
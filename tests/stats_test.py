@@ -0,0 +1,61 @@
+"""Unit tests for stats.py."""
+
+import json
+import unittest
+
+import latin_scansion
+
+
+class ScanStatsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stats = latin_scansion.ScanStats()
+        scanner = latin_scansion.Scanner(
+            "grammars/all.far", cache_size=8, stats=cls.stats
+        )
+        cls.document = scanner.scan_document(
+            [
+                "Arma virumque canō, Trojae quī prīmus ab ōris",
+                "Hic cursus fuit,",
+                "Arma virumque canō, Trojae quī prīmus ab ōris",
+            ]
+        )
+
+    def test_stages(self):
+        stages = self.stats.as_dict()["stages"]
+        self.assertEqual(stages["verse"]["calls"], 3)
+        # The repeated verse is looked up in the cache.
+        self.assertEqual(stages["normalize"]["calls"], 2)
+        self.assertEqual(stages["prefilter"]["calls"], 2)
+        # The defective verse is too short to be a hexameter, so no rules are
+        # composed for it.
+        self.assertEqual(stages["variable"]["calls"], 1)
+        self.assertEqual(stages["shortestpath"]["calls"], 1)
+
+    def test_lattices(self):
+        lattices = self.stats.as_dict()["lattices"]
+        self.assertEqual(lattices["variable"]["count"], 1)
+        self.assertGreater(lattices["variable"]["max_states"], 0)
+
+    def test_counters(self):
+        counters = self.stats.as_dict()["counters"]
+        self.assertEqual(counters["verses"], 3)
+        self.assertEqual(counters["defective_verses"], 1)
+        self.assertEqual(counters["prefiltered_verses"], 1)
+        self.assertEqual(counters["pronunciation_cache_hits"], 1)
+        self.assertEqual(counters["pronunciation_cache_misses"], 2)
+
+    def test_json_serializable(self):
+        json.dumps(self.stats.as_dict())
+
+    def test_stats_do_not_change_scansion(self):
+        scanner = latin_scansion.Scanner("grammars/all.far", cache_size=8)
+        document = scanner.scan_document(
+            verse.text for verse in self.document.verse
+        )
+        self.assertEqual(document, self.document)
+
+
+if __name__ == "__main__":
+    unittest.main()
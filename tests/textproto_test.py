@@ -0,0 +1,49 @@
+"""Unit tests for textproto.py."""
+
+import os
+import tempfile
+import unittest
+
+from google.protobuf import text_format  # type: ignore
+
+import latin_scansion
+
+
+class TextprotoTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.document = scanner.scan_document(
+            [
+                "Arma virumque canō, Trojae quī prīmus ab ōris",
+                "Hic cursus fuit,",
+                "exciderant animō; manet altā mente repostum",
+            ],
+            "aen",
+        )
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_stream_document_matches_printed_document(self):
+        path = os.path.join(self.tempdir.name, "aen.textproto")
+        with open(path, "w") as sink:
+            latin_scansion.textproto.stream_document(
+                self.document.verse, sink, self.document.name
+            )
+        with open(path, "r") as source:
+            self.assertEqual(
+                source.read(),
+                text_format.MessageToString(self.document, as_utf8=True),
+            )
+        self.assertEqual(
+            latin_scansion.textproto.read_document(path), self.document
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
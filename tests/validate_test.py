@@ -0,0 +1,136 @@
+"""Unit tests for validate.py."""
+
+import glob
+import logging
+import os
+import tempfile
+import unittest
+
+import latin_scansion
+
+from latin_scansion import validate
+
+
+class ValidateTest(unittest.TestCase):
+    verses = [
+        "Arma virumque canō, Trojae quī prīmus ab ōris",
+        "Ītaliam fātō profugus Lāvīniaque vēnit",
+        "Hic cursus fuit,",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scanner = latin_scansion.Scanner("grammars/all.far")
+        cls.document = cls.scanner.scan_document(cls.verses, name="test")
+
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = tempdir.name
+        self.valid = os.path.join(self.tempdir, "valid.textproto")
+        latin_scansion.write_document(self.document, self.valid)
+        self.invalid = os.path.join(self.tempdir, "invalid.binpb")
+        with open(self.invalid, "wb") as sink:
+            sink.write(b"\x12\xff")
+
+    def test_expand(self):
+        # Index files are not documents.
+        with open(self.valid + ".idx", "wb"):
+            pass
+        self.assertEqual(
+            validate._expand([self.tempdir]), [self.invalid, self.valid]
+        )
+
+    def test_validate_documents(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                results = list(
+                    validate.validate_documents(
+                        [self.valid, self.invalid], jobs=jobs
+                    )
+                )
+                self.assertEqual(
+                    [path for path, _ in results], [self.valid, self.invalid]
+                )
+                (_, valid), (_, invalid) = results
+                self.assertEqual(valid, (None, 3))
+                error, verses = invalid
+                self.assertIsNotNone(error)
+                self.assertEqual(verses, 0)
+
+    def test_canonicalize(self):
+        # Writes a non-canonical (but valid) document.
+        with open(self.valid, "w") as sink:
+            sink.write('name: "test" verse { number: 1 text: "a" }\n')
+        os.chmod(self.valid, 0o640)
+        ((_, (error, verses)),) = validate.validate_documents(
+            [self.valid], canonicalize=True
+        )
+        self.assertIsNone(error)
+        self.assertEqual(verses, 1)
+        with open(self.valid, "r") as source:
+            self.assertEqual(
+                source.read(),
+                'name: "test"\nverse {\n  number: 1\n  text: "a"\n}\n',
+            )
+        self.assertEqual(os.stat(self.valid).st_mode & 0o777, 0o640)
+        # No temporary file is left behind.
+        self.assertEqual(len(os.listdir(self.tempdir)), 2)
+
+    def test_rescan_documents(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                results = list(
+                    validate.rescan_documents(
+                        self.scanner, [self.valid, self.valid], jobs=jobs
+                    )
+                )
+                self.assertEqual(len(results), 6)
+                for (path, stored, rescanned), expected in zip(
+                    results, list(self.document.verse) * 2
+                ):
+                    self.assertEqual(path, self.valid)
+                    self.assertEqual(stored, expected)
+                    self.assertIsNone(validate.diff_verse(stored, rescanned))
+
+    def test_diff_verse(self):
+        stored = self.document.verse[0]
+        rescanned = self.scanner.scan(stored.text, stored.number)
+        self.assertIsNone(validate.diff_verse(stored, rescanned))
+        changed = latin_scansion.Verse()
+        changed.CopyFrom(stored)
+        changed.foot[0].syllable[0].coda = ""
+        self.assertEqual(
+            validate.diff_verse(changed, rescanned),
+            "syllables of foot 1 differ",
+        )
+        changed.foot[0].type = latin_scansion.Foot.SPONDEE
+        self.assertEqual(
+            validate.diff_verse(changed, rescanned),
+            "feet are SDSSDS, but rescanned as DDSSDS",
+        )
+        defective = self.document.verse[2]
+        self.assertIn("defective", validate.diff_verse(defective, rescanned))
+        incomplete = latin_scansion.Verse()
+        incomplete.CopyFrom(stored)
+        incomplete.incomplete = True
+        self.assertEqual(
+            validate.diff_verse(incomplete, rescanned),
+            "incomplete is True, but rescanned as False",
+        )
+
+
+class DataTest(unittest.TestCase):
+    def test_data_is_valid(self):
+        # Mirrors the CI step which runs `latin_validate data/*/*.textproto`.
+        paths = sorted(glob.glob("data/*/*.textproto"))
+        self.assertTrue(paths)
+        for path, (error, _) in validate.validate_documents(paths):
+            with self.subTest(path=path):
+                self.assertIsNone(error)
+
+
+if __name__ == "__main__":
+    logging.disable("CRITICAL")
+    unittest.main()